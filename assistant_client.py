@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Thin client for the assistant daemon (standard library only, starts instantly)
+
+Usage:
+    python assistant_client.py "create notes.txt in ab2"
+    python assistant_client.py --unix /tmp/assistant.sock "open google.com"
+    python assistant_client.py --no-execute "search for AI news"   # intent only
+    python assistant_client.py --health
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+TOKEN_HEADER = "X-Assistant-Token"
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".assistant_daemon.token")
+
+
+def read_token(unix_path: str = None) -> str:
+    """The daemon's per-install token (same file daemon.token_path() uses)"""
+    try:
+        with open(unix_path + ".token" if unix_path else DEFAULT_TOKEN_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP over a Unix domain socket"""
+
+    def __init__(self, path: str, timeout: float = None):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def request(method: str, path: str, body: dict = None, host: str = DEFAULT_HOST,
+            port: int = DEFAULT_PORT, unix_path: str = None, timeout: float = 300) -> dict:
+    """Send one JSON request to the daemon and return the decoded response"""
+    if unix_path:
+        conn = UnixHTTPConnection(unix_path, timeout=timeout)
+    else:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    try:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {TOKEN_HEADER: read_token(unix_path)}
+        if data:
+            headers["Content-Type"] = "application/json"
+        conn.request(method, path, body=data, headers=headers)
+        return json.loads(conn.getresponse().read() or b"{}")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to the assistant daemon")
+    parser.add_argument("command", nargs="*", help="Command text")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Daemon Unix socket path")
+    parser.add_argument("--health", action="store_true", help="Check the daemon is up")
+    parser.add_argument("--no-execute", action="store_true", help="Only return the intent")
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON response")
+    args = parser.parse_args()
+
+    target = {"host": args.host, "port": args.port, "unix_path": args.unix}
+    try:
+        if args.health:
+            response = request("GET", "/health", **target)
+        else:
+            command = " ".join(args.command) or sys.stdin.read().strip()
+            response = request("POST", "/command", {"command": command, "execute": not args.no_execute}, **target)
+    except (OSError, http.client.HTTPException) as e:
+        print(f"❌ Cannot reach assistant daemon: {e}", file=sys.stderr)
+        print("   Start it with: python daemon.py", file=sys.stderr)
+        return 2
+
+    if args.json or args.health or args.no_execute:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    elif not response.get("ok"):
+        print(f"❌ {response.get('error')}", file=sys.stderr)
+    else:
+        for message in response.get("messages", []):
+            print(message)
+
+    if not response.get("ok"):
+        return 1
+    return 0 if response.get("success", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
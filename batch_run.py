@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Headless batch runner - replay a file of commands without the interactive loop
+
+Reads commands from JSONL (or plain text) and writes one JSONL result per
+command, in input order, with timings. LLM intent extraction goes through the
+inference scheduler (identical commands coalesced, concurrency capped) so
+later commands are analysed while earlier ones execute. Execution keeps
+per-target ordering: two commands touching the same file (or the shared
+browser/clipboard) run in input order; unrelated commands may run in parallel.
+Wildcard bulk commands ('delete_files *.log') order against every file in the
+folders they search. Successful intents are learned from like interactive ones.
+
+Usage:
+    python batch_run.py commands.jsonl -o results.jsonl --parallel 4
+    cat commands.txt | python batch_run.py - --dry-run
+
+Input lines may be {"command": "..."} objects (also "text" / "input", with an
+optional "id"), JSON strings, or plain text.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+sys.path.append('.')
+
+from controller.llm import learn
+from controller.scheduler import get_scheduler
+from executors import file_exec
+from log_setup import setup as setup_logging
+
+
+def read_commands(stream):
+    """Yield (id, command) pairs from JSONL/plain-text lines"""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            item = line
+
+        if isinstance(item, dict):
+            command = item.get("command") or item.get("text") or item.get("input")
+            command_id = item.get("id", line_no)
+        else:
+            command, command_id = str(item), line_no
+
+        if command:
+            yield command_id, command
+
+
+def _file_key(path: str) -> str:
+    return "file:" + path.lower()
+
+
+def _folder_key(folder: str) -> str:
+    return "folder:" + os.path.join(file_exec.AUTOBOX_DIR, folder).lower()
+
+
+def bulk_keys(action: str, pattern: str, destination=None) -> set:
+    """Keys for a create/write/move/delete_files pattern"""
+    try:
+        folder, name = file_exec._split_folder(pattern)
+        folders = [folder] if folder else list(file_exec.AUTOBOX_FOLDERS)
+        if any(ch in name for ch in "*?["):
+            # Matches files earlier commands may still create: order against whole folders
+            keys = {_folder_key(f) for f in folders}
+        elif action == "create_files":
+            keys = {_file_key(p) for p in file_exec._targets(pattern)}
+        else:
+            keys = {_file_key(os.path.join(file_exec.AUTOBOX_DIR, f, n))
+                    for f in folders for n in file_exec.expand_range(name)}
+    except ValueError:
+        return set()  # the command fails without touching anything
+    if action == "move_files" and destination:
+        dst = file_exec.normalize_folder(str(destination))
+        for k in list(keys):
+            keys.add(_file_key(os.path.join(file_exec.AUTOBOX_DIR, dst, os.path.basename(k)))
+                     if k.startswith("file:") else _folder_key(dst))
+    return keys
+
+
+def _step_keys(action: str, target: str, content) -> set:
+    if action in ("create_files", "write_files", "move_files", "delete_files"):
+        return bulk_keys(action, target, content)
+    if "file" in action:
+        path = file_exec.get_full_path(target) or target
+        keys = {_file_key(path)}
+        if action in ("move_file", "file_move") and content:
+            dst = file_exec.normalize_folder(str(content))
+            keys.add(_file_key(os.path.join(file_exec.AUTOBOX_DIR, dst, os.path.basename(path))))
+        return keys
+    if action in ("open_url", "web_open", "search_web", "web_search", "search", "extract_web", "web_extract"):
+        return {"web"}  # one shared browser driver
+    if "clip" in action or action in ("copy", "paste"):
+        return {"clipboard"}
+    if "app" in action:
+        return {"app:" + target.lower()}
+    if action in ("system_info", "info"):
+        return {"file:system_info"}
+    return set()
+
+
+def ordering_keys(intent: dict) -> set:
+    """Resources an intent touches; commands sharing a key execute in input order"""
+    keys = set()
+    for step in intent.get("steps", []):
+        action = (step.get("action") or "").lower()
+        target = step.get("target") or ""
+        # The model sometimes lists several files in one step
+        for t in (target if isinstance(target, list) else [target]):
+            keys |= _step_keys(action, str(t), step.get("content"))
+    return keys
+
+
+def dependencies(keys: set, last_by_key: dict) -> list:
+    """Futures to wait for: the same keys, plus folder keys against the files inside them"""
+    deps = {last_by_key[k] for k in keys if k in last_by_key}
+    for k in keys:
+        if k.startswith("file:"):
+            folder = "folder:" + os.path.dirname(k[len("file:"):])
+            if folder in last_by_key:
+                deps.add(last_by_key[folder])
+        elif k.startswith("folder:"):
+            folder = k[len("folder:"):]
+            deps.update(f for key, f in last_by_key.items()
+                        if key.startswith("file:") and os.path.dirname(key[len("file:"):]) == folder)
+    return list(deps)
+
+
+def extract_intent(future) -> dict:
+    """Wait for a scheduled LLM extraction and parse it"""
+    raw = future.result()
+    try:
+        intent = json.loads(raw)
+    except (TypeError, json.JSONDecodeError):
+        intent = None
+    return {
+        "intent": intent,
+        "raw": None if intent else raw,
+        "json": raw,
+        "llm_ms": future.timings.get("run_ms", 0.0),
+        "queue_ms": future.timings.get("wait_ms", 0.0),
+    }
+
+
+def run_batch(commands, output, assistant=None, parallel: int = 4, exec_workers: int = 4):
+    """Process (id, command) pairs and write JSONL results to output; returns summary dict"""
+    batch_start = time.perf_counter()
+    scheduler = get_scheduler(parallel)
+    exec_pool = ThreadPoolExecutor(max_workers=exec_workers, thread_name_prefix="exec")
+
+    submitted = time.perf_counter()
+    items = [(cid, cmd, scheduler.submit(cmd)) for cid, cmd in commands]
+
+    def execute(intent, command, json_response, deps):
+        wait(deps)
+        start = time.perf_counter()
+        success = assistant.execute_intent(intent, command)
+        if success:
+            learn(command, json_response)
+        return bool(success), round((time.perf_counter() - start) * 1000, 2)
+
+    # Dispatch executions in input order; each waits for earlier commands on the same keys
+    last_by_key = {}
+    pending = []
+    for cid, cmd, llm_future in items:
+        extracted = extract_intent(llm_future)
+        intent = extracted["intent"]
+        exec_future = None
+
+        if assistant is not None and intent is not None:
+            keys = ordering_keys(intent)
+            deps = dependencies(keys, last_by_key)
+            exec_future = exec_pool.submit(execute, intent, cmd, extracted["json"], deps)
+            for k in keys:
+                last_by_key[k] = exec_future
+
+        pending.append((cid, cmd, extracted, exec_future))
+
+    summary = {"commands": 0, "succeeded": 0, "failed": 0, "unparsed": 0}
+    llm_times = []
+    for cid, cmd, extracted, exec_future in pending:
+        result = {"id": cid, "command": cmd, "intent": extracted["intent"]}
+        timings = {"queue_ms": extracted["queue_ms"], "llm_ms": extracted["llm_ms"]}
+
+        if extracted["intent"] is None:
+            result["raw"] = extracted["raw"]
+            result["success"] = False
+            summary["unparsed"] += 1
+        elif exec_future is not None:
+            try:
+                result["success"], timings["exec_ms"] = exec_future.result()
+            except Exception as e:
+                result["success"], result["error"] = False, str(e)
+        timings["done_ms"] = round((time.perf_counter() - submitted) * 1000, 2)
+        result["timings"] = timings
+
+        summary["commands"] += 1
+        if result.get("success"):
+            summary["succeeded"] += 1
+        elif "success" in result:
+            summary["failed"] += 1
+        llm_times.append(extracted["llm_ms"])
+
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+
+    exec_pool.shutdown()
+
+    elapsed = time.perf_counter() - batch_start
+    llm_times.sort()
+    summary["elapsed_s"] = round(elapsed, 3)
+    summary["commands_per_s"] = round(summary["commands"] / elapsed, 2) if elapsed else 0.0
+    summary["llm_p50_ms"] = llm_times[len(llm_times) // 2] if llm_times else 0.0
+    summary["scheduler"] = scheduler.stats()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run assistant commands from a file")
+    parser.add_argument("input", help="JSONL/text file of commands, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Results JSONL file (default: stdout)")
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent LLM requests (global limit)")
+    parser.add_argument("--exec-workers", type=int, default=4, help="Concurrent intent executions")
+    parser.add_argument("--dry-run", action="store_true", help="Only extract intents, don't execute")
+    parser.add_argument("--web", action="store_true", help="Allow web actions (starts a headless browser)")
+    args = parser.parse_args()
+
+    # Results own stdout; progress prints from the assistant go to stderr
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    sys.stdout = sys.stderr
+    setup_logging()
+
+    assistant = None
+    if not args.dry_run:
+        import run
+        assistant = run.AdvancedAssistant({
+            "VOICE_OUTPUT": False,
+            "INTERACTIVE": False,
+            "WAKE_WORD_ENABLED": False,
+            "BROWSER_VISIBLE": False,
+            "ENABLE_WEB": args.web and run.WEB_ENABLED,
+        })
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+
+    try:
+        summary = run_batch(read_commands(source), output, assistant, args.parallel, args.exec_workers)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.__stdout__:
+            output.close()
+        if assistant and assistant.web:
+            assistant.web.close()
+
+    print(f"📊 Batch summary: {json.dumps(summary)}", file=sys.stderr)
+    return 0 if summary["failed"] == 0 and summary["unparsed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmarks with offline stand-ins
+
+Runs without Ollama, Chrome, a microphone or speakers: the LLM is a local fake
+server with configurable latency and token rate, web extraction reads a local
+fixture site, the voice path uses generated (or your own) WAV clips and TTS
+plays into a null sink. Stages whose libraries aren't installed are reported
+as skipped.
+
+Usage:
+    python -m benchmarks.bench                       # all suites
+    python -m benchmarks.bench --suite rules,files
+    python -m benchmarks.bench --suite bulk --bulk-files 10000
+    python -m benchmarks.bench --suite writes --write-dir /mnt/disk   # fsync is free on tmpfs
+    python -m benchmarks.bench --suite clipboard --clipboard pyperclip   # default: auto
+    python -m benchmarks.bench --save-baseline       # store results as the baseline
+    python -m benchmarks.bench --compare             # exit 1 on >50% p50 regressions, 2 without a baseline
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append('.')
+
+from benchmarks.harness import (BENCH_DIR, DEFAULT_THRESHOLD, compare, load_baseline, measure,
+                                print_results, quiet, save_baseline, skipped)
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+SUITES = ["rules", "llm", "files", "bulk", "writes", "clipboard", "web", "voice"]
+# CPU-bound benchmarks run REPEATS times for at least MIN_TIME seconds each (p50 is the best repeat)
+REPEATS = 5
+MIN_TIME = 0.3
+
+COMMANDS = [
+    "create notes.txt in ab2",
+    "write 'buy milk' to todo.txt",
+    "read report.txt from ab1",
+    "open google.com",
+    "search for local llm benchmarks",
+    "delete old.txt in ab3",
+    "open notepad",
+    "hello how are you",
+    "create meeting.txt in ab1 and write agenda",
+    "system info",
+]
+
+
+def bench_rules(args) -> dict:
+    from controller.llm import fallback_parser
+
+    commands = iter(COMMANDS * 100000)
+    with quiet():
+        return {"rules.fallback_parser": measure(lambda: fallback_parser(next(commands)),
+                                                 iterations=len(COMMANDS) * 50, min_time=MIN_TIME, repeats=REPEATS)}
+
+
+def bench_llm(args) -> dict:
+    import controller.llm as llm
+    from benchmarks.fake_ollama import FakeOllama
+    from config import override
+    from controller.scheduler import InferenceScheduler
+
+    results = {}
+    with FakeOllama(latency=args.llm_latency, tokens_per_s=args.tokens_per_s) as server, quiet():
+        with override(OLLAMA_URL=server.url):
+            commands = iter(COMMANDS * 1000)
+            results["llm.round_trip"] = measure(lambda: llm.generate_intent(next(commands)),
+                                                iterations=args.llm_iterations)
+
+            # Concurrent distinct commands through the scheduler (one op = a burst of 8)
+            scheduler = InferenceScheduler(func=lambda c: json.dumps(llm.generate_intent(c)), max_concurrency=4)
+            burst = iter(range(100000))
+
+            def run_burst():
+                n = next(burst)
+                futures = [scheduler.submit(f"{c} #{n}") for c in COMMANDS[:8]]
+                for future in futures:
+                    future.result()
+
+            results["llm.scheduler_burst8"] = measure(run_burst, iterations=args.llm_iterations, warmup=1)
+            scheduler.shutdown()
+    return results
+
+
+def bench_files(args) -> dict:
+    from executors import file_exec, fs_watch
+
+    autobox = tempfile.mkdtemp(prefix="bench_autobox_")
+    original = file_exec.AUTOBOX_DIR
+    file_exec.AUTOBOX_DIR = autobox
+    counter = iter(range(10 ** 9))
+    results = {}
+    try:
+        def cycle():
+            name = f"bench_{next(counter)}.txt"
+            file_exec.create_file(f"AB1/{name}")
+            file_exec.write_file(f"AB1/{name}", "benchmark content\n" * 20)
+            file_exec.read_file(f"AB1/{name}")
+            file_exec.move_file(f"AB1/{name}", "ab2")
+            file_exec.delete_file(f"AB2/{name}")
+
+        with quiet():
+            file_exec.write_file("AB3/read_me.txt", "line of text\n" * 5000)
+            results["files.cycle"] = measure(cycle, iterations=200, min_time=MIN_TIME, repeats=REPEATS)
+            results["files.read_64k"] = measure(lambda: file_exec.read_file("AB3/read_me.txt"), iterations=500,
+                                                 min_time=MIN_TIME, repeats=REPEATS)
+    finally:
+        file_exec.AUTOBOX_DIR = original
+        fs_watch.forget(autobox)
+        shutil.rmtree(autobox, ignore_errors=True)
+    return results
+
+
+def bench_bulk(args) -> dict:
+    """Bulk create/move/delete of args.bulk_files files vs the one-file-per-call loop"""
+    from executors import file_exec, fs_watch
+
+    autobox = tempfile.mkdtemp(prefix="bench_autobox_")
+    original = file_exec.AUTOBOX_DIR
+    file_exec.AUTOBOX_DIR = autobox
+    n = args.bulk_files
+    results = {}
+    try:
+        def single_files():
+            for i in range(n):
+                file_exec.create_file(f"AB1/day{i}.txt")
+            for i in range(n):
+                file_exec.move_file(f"AB1/day{i}.txt", "ab2")
+            for i in range(n):
+                file_exec.delete_file(f"AB2/day{i}.txt")
+
+        def bulk():
+            file_exec.create_files(f"AB1/day0..day{n - 1}.txt")
+            file_exec.move_files("AB1/day*.txt", "ab2")
+            file_exec.delete_files("AB2/day*.txt")
+
+        with quiet():
+            results[f"bulk.single_calls_{n}"] = measure(single_files, iterations=3, warmup=0)
+            results[f"bulk.batched_{n}"] = measure(bulk, iterations=3, warmup=0)
+            file_exec.create_files(f"AB3/log0..log{n - 1}.txt")
+            results[f"bulk.select_glob_{n}"] = measure(lambda: file_exec.select_files("AB3/log1*.txt"), iterations=20)
+    finally:
+        file_exec.AUTOBOX_DIR = original
+        fs_watch.forget(autobox)
+        shutil.rmtree(autobox, ignore_errors=True)
+    return results
+
+
+def bench_writes(args) -> dict:
+    """Small-file write throughput per durability mode, one writer and WRITERS concurrent writers"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from executors import atomic_write as aw
+
+    writers = 8
+    folder = tempfile.mkdtemp(prefix="bench_writes_", dir=args.write_dir or BENCH_DIR)
+    counter = iter(range(10 ** 9))
+    payload = b"small note written by the benchmark\n" * 4
+    pool = ThreadPoolExecutor(max_workers=writers)
+    results = {}
+
+    def direct():
+        with open(os.path.join(folder, f"direct_{next(counter) % 1000}.txt"), "wb") as f:
+            f.write(payload)
+
+    try:
+        results["writes.direct"] = measure(direct, iterations=500, min_time=0.5)
+        for mode in aw.DURABILITY_MODES:
+            def write(mode=mode):
+                aw.atomic_write(os.path.join(folder, f"{mode}_{next(counter) % 1000}.txt"), payload, mode)
+
+            def burst(write=write):
+                for future in [pool.submit(write) for _ in range(writers)]:
+                    future.result()
+
+            # group commit holds each lone write for the batch window, so it is only timed concurrently
+            if mode != "group":
+                results[f"writes.{mode}"] = measure(write, iterations=50, min_time=0.5)
+            results[f"writes.{mode}_x{writers}"] = measure(burst, iterations=20, min_time=0.5)
+
+        for name, r in results.items():
+            r["files_per_s"] = round(r["ops_per_s"] * (writers if name.endswith(f"_x{writers}") else 1), 1)
+            print(f"   {name:24} {r['files_per_s']:>10.1f} files/s")
+        committer = aw.get_committer().stats()
+        print(f"   group commit: {committer['files']} files in {committer['batches']} batches "
+              f"({committer['syncs']} syncs, avg batch {committer['avg_batch']})")
+    finally:
+        pool.shutdown()
+        shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+
+def bench_clipboard(args) -> dict:
+    """copy+paste round trip and a lone paste (what the monitor does each poll) on a real backend"""
+    from executors.clipboard_backend import ClipboardUnavailable, get_backend
+
+    try:
+        backend = get_backend(args.clipboard)
+    except ClipboardUnavailable as e:
+        return {"clipboard.roundtrip": skipped(str(e)), "clipboard.paste": skipped(str(e))}
+    print(f"   backend: {backend.name}")
+    saved = backend.paste()
+    counter = iter(range(10 ** 9))
+    try:
+        results = {
+            "clipboard.roundtrip": measure(lambda: backend.copy(f"bench {next(counter)}") or backend.paste(),
+                                           iterations=50, min_time=0.5),
+            "clipboard.paste": measure(backend.paste, iterations=50, min_time=0.5),
+        }
+    finally:
+        backend.copy(saved)
+    return results
+
+
+def bench_web(args) -> dict:
+    try:
+        from executors.web_exec import WebExecutor
+    except ImportError as e:
+        return {"web.extract": skipped(f"{e.name} not installed")}
+    from benchmarks.fixtures import FixtureSite
+
+    web = WebExecutor(headless=True)
+    pages = iter(range(10 ** 9))
+    with FixtureSite() as site, quiet():
+        result = measure(lambda: web.get_page_content(f"{site.url}/page/{next(pages) % 50}"), iterations=100)
+    return {"web.extract": result}
+
+
+def bench_voice(args) -> dict:
+    from benchmarks.fixtures import make_audio_fixtures, null_player
+    from wake_word.wake import evaluate, load_detector, load_wav, _wav_files
+
+    results = {}
+    audio_dir = args.audio or tempfile.mkdtemp(prefix="bench_audio_")
+    folders = make_audio_fixtures(audio_dir)
+    positives = [load_wav(f) for f in _wav_files(folders["positive"])]
+
+    detector = load_detector(folders["templates"])
+    clips = iter(positives * 10000)
+    results["voice.wake_detect"] = measure(lambda: detector.detect(next(clips)), iterations=30,
+                                           min_time=MIN_TIME, repeats=REPEATS)
+    accuracy = evaluate(detector, _wav_files(folders["positive"]), _wav_files(folders["negative"]))
+    print(f"🎙️ Wake word on fixtures: FRR {accuracy['false_reject_rate']:.0%}, "
+          f"FAR {accuracy['false_accept_rate']:.0%}")
+
+    try:
+        import whisper  # noqa: F401
+        from voice.stt import SpeechToText
+    except ImportError as e:
+        results["voice.stt_transcribe"] = skipped(f"{e.name} not installed")
+    else:
+        stt = SpeechToText(args.whisper_model)
+        with quiet():
+            results["voice.stt_transcribe"] = measure(lambda: stt.transcribe(positives[0]), iterations=5, warmup=1)
+
+    try:
+        from voice import tts
+    except ImportError as e:
+        results["voice.tts_cached"] = skipped(f"{e.name} not installed")
+    else:
+        tts.set_player(null_player)
+        phrase = "All tasks completed successfully!"
+        with quiet():
+            if tts.synthesize_cached(phrase):  # first call needs edge-tts to reach its service
+                results["voice.tts_cached"] = measure(lambda: tts.speak(phrase), iterations=200)
+            else:
+                results["voice.tts_cached"] = skipped("edge-tts synthesis unavailable")
+
+    if not args.audio:
+        shutil.rmtree(audio_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the assistant pipeline offline")
+    parser.add_argument("--suite", default=",".join(SUITES), help=f"Comma-separated: {','.join(SUITES)}")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM time to first token (s)")
+    parser.add_argument("--tokens-per-s", type=float, default=200.0, help="Fake LLM token rate")
+    parser.add_argument("--llm-iterations", type=int, default=20)
+    parser.add_argument("--bulk-files", type=int, default=10000, help="Files per bulk benchmark batch")
+    parser.add_argument("--write-dir", help="Folder on the disk to test for the writes suite (default: benchmarks/)")
+    parser.add_argument("--clipboard", default="auto", help="Clipboard backend for the clipboard suite")
+    parser.add_argument("--whisper-model", default="tiny")
+    parser.add_argument("--audio", help="Folder with templates/ positive/ negative/ WAVs (generated if empty)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed p50 slowdown (0.5 = 50%%)")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.suite.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    for suite in suites:
+        print(f"⏱️ Running {suite} benchmarks...")
+        results.update(globals()[f"bench_{suite}"](args))
+
+    comparison = None
+    if args.compare:
+        baseline = load_baseline(args.baseline)
+        if not baseline:
+            print(f"\n❌ No baseline at {args.baseline} (record one with --save-baseline)")
+            return 2
+        comparison = compare(results, baseline, args.threshold)
+    print()
+    print_results(results, comparison)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "comparison": comparison}, f, indent=2)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+
+    if args.compare and not comparison:
+        print(f"\n❌ None of these benchmarks are in {args.baseline}; nothing was compared")
+        return 2
+    if comparison and any(c["regressed"] for c in comparison.values()):
+        print(f"\n❌ Regression beyond {args.threshold:.0%} against {args.baseline}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
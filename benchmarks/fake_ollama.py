@@ -0,0 +1,156 @@
+"""
+Fake Ollama server for offline benchmarks
+
+Speaks enough of the /api/generate protocol (streamed NDJSON) for
+controller.llm: the answer is the rule-based fallback_parser's intent for
+the command at the end of the prompt, emitted token by token after a
+configurable time-to-first-token and at a configurable token rate.
+
+Standalone (point the assistant at it with OLLAMA_HOST):
+    python -m benchmarks.fake_ollama --port 11434 --latency 0.2 --tokens-per-s 40
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append('.')
+
+CHARS_PER_TOKEN = 3
+_COMMAND_RE = re.compile(r'User: "([^\n]*)"\s*Output:\s*$')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeOllama/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._json({"models": [{"name": m} for m in self.server.models]})
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._json({"error": "not found"}, 404)
+            return
+
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        self.server.count_request()
+
+        prompt = payload.get("prompt") or ""
+        if not prompt:  # warm-up request just loads the model
+            self._json({"model": payload.get("model"), "response": "", "done": True})
+            return
+
+        text = self.server.answer(prompt)
+        tokens = [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+        time.sleep(self.server.latency)
+        if not payload.get("stream", True):
+            time.sleep(len(tokens) / self.server.tokens_per_s)
+            self._json({"model": payload.get("model"), "response": text, "done": True,
+                        "eval_count": len(tokens)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(1 / self.server.tokens_per_s)
+                self._chunk({"model": payload.get("model"), "response": token, "done": False})
+            self._chunk({"model": payload.get("model"), "response": "", "done": True,
+                         "eval_count": len(tokens)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cancelled mid-generation
+
+    def _chunk(self, body: dict):
+        self.wfile.write((json.dumps(body) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def _json(self, body: dict, status: int = 200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeOllama(ThreadingHTTPServer):
+    """In-process fake LLM server; use as a context manager or start()/stop()"""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.05, tokens_per_s: float = 200.0,
+                 host: str = "127.0.0.1", port: int = 0, models=("gemma3:1b", "gemma3:4b")):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.tokens_per_s = tokens_per_s
+        self.models = list(models)
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests += 1
+
+    def answer(self, prompt: str) -> str:
+        """Model output for a prompt: the rule-based intent for its command"""
+        from controller.llm import fallback_parser
+
+        match = _COMMAND_RE.search(prompt)
+        command = match.group(1) if match else prompt.strip().splitlines()[-1]
+        return fallback_parser(command)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server for offline runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-s", type=float, default=200.0)
+    args = parser.parse_args()
+
+    server = FakeOllama(args.latency, args.tokens_per_s, args.host, args.port)
+    print(f"🧪 Fake Ollama on {server.url} (ttft {args.latency}s, {args.tokens_per_s} tok/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Offline fixtures for benchmarks: a local web site, audio clips and a null audio sink
+"""
+
+import os
+import threading
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# ================== WEB ==================
+_WORDS = ("assistant local model latency file folder browser voice command "
+          "cache index search memory token prompt intent schedule").split()
+
+
+def fixture_page(index: int, paragraphs: int = 40) -> str:
+    """Deterministic article-like HTML with the clutter get_page_content strips"""
+    body = []
+    for p in range(paragraphs):
+        words = [_WORDS[(index * 7 + p * 3 + w) % len(_WORDS)] for w in range(60)]
+        body.append(f"<p>{' '.join(words).capitalize()}.</p>")
+    return (
+        "<!doctype html><html><head><title>Fixture page {0}</title>"
+        "<style>body {{ font-family: sans-serif; }}</style>"
+        "<script>var analytics = {{ page: {0} }};</script></head><body>"
+        "<nav><a href='/'>Home</a> <a href='/page/1'>Next</a></nav>"
+        "<article><h1>Fixture page {0}</h1>{1}</article>"
+        "<aside>Related links</aside><footer>Footer text</footer>"
+        "</body></html>"
+    ).format(index, "".join(body))
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts[0] == "page" and len(parts) == 2 and parts[1].isdigit():
+            page = fixture_page(int(parts[1]), self.server.paragraphs)
+        elif parts == [""]:
+            page = fixture_page(0, self.server.paragraphs)
+        else:
+            self.send_error(404)
+            return
+
+        data = page.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FixtureSite(ThreadingHTTPServer):
+    """Local HTTP site serving /page/<n>; use as a context manager"""
+
+    daemon_threads = True
+
+    def __init__(self, paragraphs: int = 40, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _SiteHandler)
+        self.paragraphs = paragraphs
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name="fixture-site", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+# ================== AUDIO ==================
+# Vowel-like syllables as (first formant, second formant) in Hz
+WAKE_WORD = [(730, 1090), (270, 2290), (570, 840)]
+OTHER_WORDS = [
+    [(300, 870), (660, 1720)],
+    [(440, 1020), (490, 1350), (270, 2290), (730, 1090)],
+    [(390, 1990), (640, 1190)],
+]
+
+
+def synth_word(syllables, seed: int = 0, pitch: float = 130.0, syllable_s: float = 0.18,
+               noise: float = 0.01, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Voiced formant syllables with per-take pitch/tempo jitter, padded with quiet noise"""
+    rng = np.random.default_rng(seed)
+    pitch *= 1 + rng.uniform(-0.05, 0.05)
+    tempo = 1 + rng.uniform(-0.1, 0.1)
+
+    pieces = []
+    for f1, f2 in syllables:
+        n = int(syllable_s * tempo * sample_rate)
+        t = np.arange(n) / sample_rate
+        harmonics = np.arange(1, int(4000 // pitch))
+        freqs = harmonics * pitch
+        # Harmonic amplitudes shaped by two formant resonances
+        gains = (np.exp(-((freqs - f1) / 120) ** 2) + 0.6 * np.exp(-((freqs - f2) / 160) ** 2) + 0.02)
+        wave_ = (gains[:, None] * np.sin(2 * np.pi * freqs[:, None] * t)).sum(axis=0)
+        wave_ *= np.hanning(n)
+        pieces.append(wave_ / (np.abs(wave_).max() or 1) * 0.5)
+
+    pad = np.zeros(int(0.3 * sample_rate))
+    signal = np.concatenate([pad, *pieces, pad])
+    signal += rng.normal(0, noise, len(signal))
+    return signal.astype(np.float32)
+
+
+def write_wav(path: str, signal: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+def make_audio_fixtures(directory: str, templates: int = 3, positives: int = 10, negatives: int = 10) -> dict:
+    """
+    Write templates/, positive/ and negative/ WAV folders for the wake word path.
+
+    Folders that already contain WAV files are left alone, so real recordings
+    can be dropped in instead of the synthetic ones.
+    """
+    plan = {
+        "templates": [synth_word(WAKE_WORD, seed=i) for i in range(templates)],
+        "positive": [synth_word(WAKE_WORD, seed=100 + i) for i in range(positives)],
+        "negative": [synth_word(OTHER_WORDS[i % len(OTHER_WORDS)], seed=200 + i)
+                     for i in range(negatives)],
+    }
+    folders = {}
+    for name, signals in plan.items():
+        folder = os.path.join(directory, name)
+        os.makedirs(folder, exist_ok=True)
+        if not any(f.endswith(".wav") for f in os.listdir(folder)):
+            for i, signal in enumerate(signals):
+                write_wav(os.path.join(folder, f"{name}_{i:02d}.wav"), signal)
+        folders[name] = folder
+    return folders
+
+
+def null_player(path: str):
+    """Audio sink that plays nothing (install with voice.tts.set_player)"""
+    return None
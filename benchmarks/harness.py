@@ -0,0 +1,161 @@
+"""
+Timing helpers shared by the benchmark scripts
+
+measure() runs a callable repeatedly and reports throughput and latency
+percentiles; compare() checks results against a stored baseline JSON.
+
+One machine's timings drift between runs (CPU frequency, other processes,
+for minutes at a time), so the gate doesn't trust absolute numbers alone:
+p50 is the fastest of several repeats' medians (noise only ever adds
+time), a fixed reference loop is timed next to every repeat (ref_ms) and a
+benchmark that ran while the machine was slower is judged relative to it,
+and benchmarks timed fewer than MIN_GATE_ITERATIONS calls are shown but
+never fail the gate.
+"""
+
+import contextlib
+import json
+import os
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Fail when p50 gets more than 50% slower than the baseline. Tighter gates flake: file I/O
+# timings alone move that much between runs on a busy machine
+DEFAULT_THRESHOLD = 0.50
+MIN_GATE_ITERATIONS = 20  # fewer timed calls than this are too noisy to gate on
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _reference_loop():
+    table = {str(i): i * 7 % 1000 for i in range(2000)}
+    return sorted(table, key=table.get)
+
+
+def reference_time(calls: int = 10) -> float:
+    """Median seconds of a fixed pure-Python loop: how fast the machine is right now"""
+    times = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        _reference_loop()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return percentile(times, 50)
+
+
+def measure(func, iterations: int = 100, warmup: int = 3, min_time: float = 0.0, repeats: int = 1) -> dict:
+    """
+    Call func() repeatedly and summarize per-call latency.
+
+    Runs at least `iterations` calls, and keeps going until min_time seconds
+    have passed so very fast functions still get a stable sample. With
+    repeats > 1 that's done several times: p50 is the lowest repeat median,
+    p95/p99 are over every call. ref_ms is the reference loop's time, taken
+    the same way right before each repeat.
+    """
+    for _ in range(warmup):
+        func()
+
+    times, medians, references, elapsed = [], [], [], 0.0
+    for _ in range(repeats):
+        references.append(reference_time())
+        run = []
+        start = time.perf_counter()
+        while len(run) < iterations or time.perf_counter() - start < min_time:
+            t0 = time.perf_counter()
+            func()
+            run.append(time.perf_counter() - t0)
+        elapsed += time.perf_counter() - start
+        run.sort()
+        medians.append(percentile(run, 50))
+        times.extend(run)
+
+    times.sort()
+    return {
+        "iterations": len(times),
+        "repeats": repeats,
+        "ops_per_s": round(len(times) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(min(medians) * 1000, 4),
+        "p95_ms": round(percentile(times, 95) * 1000, 4),
+        "p99_ms": round(percentile(times, 99) * 1000, 4),
+        "ref_ms": round(min(references) * 1000, 4),
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the executors' progress prints while timing them"""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def skipped(reason: str) -> dict:
+    return {"skipped": reason}
+
+
+def print_results(results: dict, comparison: dict = None):
+    print(f"{'benchmark':32} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'vs base':>9}")
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:32} {'skipped: ' + r['skipped']}")
+            continue
+        delta = ""
+        if comparison and name in comparison:
+            delta = f"{comparison[name]['change'] * 100:+.1f}%"
+            if comparison[name]["regressed"]:
+                delta += " ❌"
+            elif not comparison[name]["gated"]:
+                delta += " ~"
+        print(f"{name:32} {r['ops_per_s']:>10.1f} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {delta:>9}")
+    if comparison and not all(c["gated"] for c in comparison.values()):
+        print(f"~ fewer than {MIN_GATE_ITERATIONS} timed calls: shown, not gated")
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: dict):
+    measured = {name: r for name, r in results.items() if "skipped" not in r}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(measured, f, indent=2, sort_keys=True)
+    print(f"💾 Baseline saved to {path} ({len(measured)} benchmarks)")
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD, metric: str = "p50_ms",
+            min_iterations: int = MIN_GATE_ITERATIONS, normalize: bool = True) -> dict:
+    """
+    Relative change of `metric` per benchmark; regressed when slower by more than threshold.
+
+    Only gated when both runs timed at least min_iterations calls. With
+    normalize, a benchmark whose reference loop ran slower than in the
+    baseline has its time scaled down by that much; never up, so waits that
+    don't depend on the CPU (the fake LLM's latency) can't look slower.
+    Pass min_iterations=0, normalize=False for metrics like allocated bytes.
+    """
+    comparison = {}
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base or "skipped" in r or not base.get(metric):
+            continue
+        current = r[metric]
+        if normalize and r.get("ref_ms") and base.get("ref_ms"):
+            current *= min(1.0, base["ref_ms"] / r["ref_ms"])
+        change = (current - base[metric]) / base[metric]
+        gated = min(r.get("iterations", 0), base.get("iterations", 0)) >= min_iterations
+        comparison[name] = {
+            "baseline": base[metric],
+            "current": r[metric],
+            "change": round(change, 4),
+            "gated": gated,
+            "regressed": gated and change > threshold,
+        }
+    return comparison
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks and regression gate for the per-command hot paths
+
+Times fallback_parser over a synthetic command corpus, and resolve_reference /
+find_closest_file over generated AutoBox trees of 10 to 100k files (the file
+watcher's initial scan falls in the warm-up call). Each
+benchmark reports median ns/op and the peak bytes allocated during one call
+(tracemalloc). Every case runs REPEATS times for at least MIN_TIME seconds
+and ns/op is the best repeat's median. With --compare the run fails when
+ns/op or allocations regress beyond their thresholds against the stored
+baseline; allocations don't depend on machine load, so theirs is tighter.
+
+Usage:
+    python -m benchmarks.microbench --save-baseline
+    python -m benchmarks.microbench --compare --threshold 0.5 --alloc-threshold 0.2
+    python -m benchmarks.microbench --max-files 10000      # skip the 100k tree
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.append('.')
+
+from benchmarks.harness import (BENCH_DIR, DEFAULT_THRESHOLD, MIN_GATE_ITERATIONS, compare, load_baseline, measure,
+                                quiet, save_baseline)
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "microbench_baseline.json")
+TREE_SIZES = [10, 100, 1000, 10000, 100000]
+CORPUS_SIZE = 2000
+SEED = 1234
+REPEATS = 3
+MIN_TIME = 0.2  # seconds per repeat
+ALLOC_THRESHOLD = 0.20  # peak bytes allowed to grow 20%
+
+_STEMS = ["notes", "todo", "report", "meeting", "budget", "ideas", "log", "draft", "house", "letter"]
+_EXTS = [".txt", ".py", ".json", ".md"]
+
+
+def command_corpus(size: int = CORPUS_SIZE, seed: int = SEED) -> list:
+    """Commands covering every fallback_parser branch, in a fixed random order"""
+    rng = random.Random(seed)
+    folders = ["ab1", "ab2", "ab3", "av2", "a3"]
+
+    def name():
+        return f"{rng.choice(_STEMS)}{rng.randint(0, 999)}{rng.choice(_EXTS)}"
+
+    makers = [
+        lambda: f"create {name()} in {rng.choice(folders)}",
+        lambda: f"make a new file in {rng.choice(folders)}",
+        lambda: f'write "{rng.choice(_STEMS)} {rng.randint(0, 99)}" to {name()}',
+        lambda: f"write buy milk to {name()}",
+        lambda: f"read {name()}",
+        lambda: f"read {rng.choice(_STEMS)}",
+        lambda: f"open www.{rng.choice(_STEMS)}.com",
+        lambda: f"open https://{rng.choice(_STEMS)}.org/page",
+        lambda: f"open {rng.choice(['notepad', 'chrome', 'calculator', 'vscode'])}",
+        lambda: f"search for {rng.choice(_STEMS)} {rng.choice(_STEMS)}",
+        lambda: f"move {name()} to {rng.choice(folders)}",
+        lambda: rng.choice(["hello", "hi there", "how are you", "good morning"]),
+        lambda: f"schedule {rng.choice(_STEMS)} tomorrow at {rng.randint(1, 12)}",
+    ]
+    return [rng.choice(makers)() for _ in range(size)]
+
+
+def build_tree(root: str, files: int, seed: int = SEED) -> list:
+    """Spread `files` empty files over AB1-AB3 (with some subfolders); returns the names"""
+    rng = random.Random(seed)
+    names = []
+    for i in range(files):
+        folder = os.path.join(root, f"AB{i % 3 + 1}")
+        if files > 1000:
+            folder = os.path.join(folder, f"sub{i % 20}")
+        os.makedirs(folder, exist_ok=True)
+        name = f"{rng.choice(_STEMS)}_{i}{rng.choice(_EXTS)}"
+        open(os.path.join(folder, name), "w").close()
+        names.append(name)
+    return names
+
+
+def peak_bytes(func, runs: int = 3) -> int:
+    """Smallest peak traced allocation over a few calls (first call may warm caches)"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(runs):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return min(peaks)
+
+
+def bench(func, iterations: int) -> dict:
+    result = measure(func, iterations=iterations, warmup=1, min_time=MIN_TIME, repeats=REPEATS)
+    result["ns_per_op"] = round(result["p50_ms"] * 1e6)  # best median is steadier than the mean
+    result["peak_bytes"] = peak_bytes(func)
+    return result
+
+
+def bench_fallback_parser() -> dict:
+    from controller.llm import fallback_parser
+
+    corpus = command_corpus()
+    commands = iter(corpus * 10000)
+    with quiet():
+        return {"fallback_parser": bench(lambda: fallback_parser(next(commands)), iterations=len(corpus))}
+
+
+def bench_memory(sizes: list) -> dict:
+    from executors import fs_watch
+    from memory import memory
+
+    results = {}
+    saved = (memory.BASE_DIR, memory.AUTOBOX_DIR, memory.MEMORY_FILE)
+    workdir = tempfile.mkdtemp(prefix="microbench_")
+    try:
+        # The project directory is searched too; keep it empty so only the tree size varies
+        memory.BASE_DIR = os.path.join(workdir, "project")
+        os.makedirs(memory.BASE_DIR)
+        memory.MEMORY_FILE = os.path.join(workdir, "state.json")
+        with open(memory.MEMORY_FILE, "w", encoding="utf-8") as f:
+            json.dump({"last_created_file": "AB1/notes_1.txt", "last_folder": "AB1"}, f)
+
+        for size in sizes:
+            memory.AUTOBOX_DIR = os.path.join(workdir, f"autobox_{size}")
+            print(f"🌳 Building {size}-file tree...")
+            names = build_tree(memory.AUTOBOX_DIR, size)
+            rng = random.Random(size)
+            # Misspelled names, as they come out of speech recognition
+            queries = [n.replace("_", " ", 1)[:-1] for n in rng.sample(names, min(len(names), 50))]
+            queries = iter(queries * 100000)
+            # Enough calls on the big trees for --compare to gate them
+            iterations = max(math.ceil(MIN_GATE_ITERATIONS / REPEATS), min(200, 20000 // size))
+
+            results[f"find_closest_file/{size}"] = bench(
+                lambda: memory.find_closest_file(next(queries)), iterations)
+            exact = iter(rng.sample(names, min(len(names), 50)) * 100000)
+            results[f"find_closest_file/{size}/exact"] = bench(
+                lambda: memory.find_closest_file(next(exact)), iterations=500)
+            results[f"resolve_reference/{size}/memory"] = bench(
+                lambda: memory.resolve_reference("that file"), iterations=500)
+            results[f"resolve_reference/{size}/fuzzy"] = bench(
+                lambda: memory.resolve_reference(next(queries)), iterations)
+            fs_watch.forget(memory.AUTOBOX_DIR)  # don't time the watcher draining 100k delete events
+            shutil.rmtree(memory.AUTOBOX_DIR, ignore_errors=True)
+    finally:
+        fs_watch.forget(memory.BASE_DIR)
+        memory.BASE_DIR, memory.AUTOBOX_DIR, memory.MEMORY_FILE = saved
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def print_table(results: dict, comparisons: dict):
+    print(f"{'benchmark':36} {'ns/op':>14} {'peak KB':>10} {'Δ time':>9} {'Δ alloc':>9}")
+    for name, r in results.items():
+        cells = []
+        for metric in ("ns_per_op", "peak_bytes"):
+            c = comparisons.get(metric, {}).get(name)
+            mark = " ❌" if c and c["regressed"] else " ~" if c and not c["gated"] else ""
+            cells.append(f"{c['change'] * 100:+.1f}%{mark}" if c else "")
+        print(f"{name:36} {r['ns_per_op']:>14,} {r['peak_bytes'] / 1024:>10.1f} {cells[0]:>9} {cells[1]:>9}")
+    if any(not c["gated"] for c in comparisons.get("ns_per_op", {}).values()):
+        print(f"~ fewer than {MIN_GATE_ITERATIONS} timed calls: shown, not gated")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for fallback_parser and memory resolution")
+    parser.add_argument("--max-files", type=int, default=TREE_SIZES[-1], help="Largest AutoBox tree to build")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed ns/op slowdown (0.5 = 50%%)")
+    parser.add_argument("--alloc-threshold", type=float, default=ALLOC_THRESHOLD, help="Allowed peak bytes growth")
+    args = parser.parse_args()
+
+    results = bench_fallback_parser()
+    results.update(bench_memory([s for s in TREE_SIZES if s <= args.max_files]))
+
+    comparisons = {}
+    if args.compare:
+        baseline = load_baseline(args.baseline)
+        if not baseline:
+            print(f"\n❌ No baseline at {args.baseline} (record one with --save-baseline)")
+            return 2
+        comparisons = {"ns_per_op": compare(results, baseline, args.threshold, metric="ns_per_op"),
+                       "peak_bytes": compare(results, baseline, args.alloc_threshold, metric="peak_bytes",
+                                             min_iterations=0, normalize=False)}
+        if not any(comparisons.values()):
+            print(f"\n❌ None of these benchmarks are in {args.baseline}; nothing was compared")
+            return 2
+    print()
+    print_table(results, comparisons)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+
+    regressed = sorted({name for c in comparisons.values() for name, r in c.items() if r["regressed"]})
+    if regressed:
+        print(f"\n❌ Regressed beyond {args.threshold:.0%} time / {args.alloc_threshold:.0%} allocations: "
+              f"{', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
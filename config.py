@@ -1,41 +1,334 @@
+"""
+Assistant configuration
+
+One typed Config, built from (later wins):
+
+    the defaults below -> config/assistant.json -> ASSISTANT_<NAME> environment variables
+
+and validated when it is built. Importing this module reads no files and
+creates no folders; run.py creates the AutoBox it needs.
+
+get_config() returns the current Config (immutable, safe to share between
+threads). At most every RELOAD_INTERVAL seconds it stats config/assistant.json
+and reloads when the mtime moved, so models, timeouts and voices can be
+retuned while the assistant runs and its models stay warm. An edit that
+doesn't validate is reported and the previous config kept. Read settings
+through get_config() when they are used, not into module constants at import.
+
+    python -m config             # effective configuration and where it comes from
+    python -m config --write     # save the defaults to config/assistant.json to edit them
+"""
+
+import argparse
+import json
 import os
-from dataclasses import dataclass
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields, replace
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(BASE_DIR, "config", "assistant.json")
+RELOAD_INTERVAL = 1.0  # seconds between mtime checks
+ENV_PREFIX = "ASSISTANT_"
+# Older environment variable names, used when the ASSISTANT_<NAME> one isn't set
+ENV_ALIASES = {
+    "OLLAMA_HOST": "OLLAMA_URL",
+    "ASSISTANT_DURABILITY": "WRITE_DURABILITY",
+    "ASSISTANT_CLIPBOARD": "CLIPBOARD_BACKEND",
+}
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+AUTOBOX_FOLDERS = ("AB1", "AB2", "AB3")  # fixed: prompts, aliases and the intent cache name them
+DURABILITY_MODES = ("none", "fsync", "group")
 
-@dataclass
+
+class ConfigError(ValueError):
+    """Invalid configuration (bad value, wrong type or unknown setting)"""
+
+
+@dataclass(frozen=True)
 class Config:
     # LLM Settings
-    LLM_MODEL: str = "gemma:4b"  # or "mistral:latest", "llama2:latest"
-    LLM_TIMEOUT: int = 30
-    
+    LLM_MODEL: str = "gemma3:1b"  # first routing tier, see controller/router.py
+    LLM_ESCALATION_MODELS: list = field(default_factory=lambda: ["gemma3:4b"])  # tried on low confidence
+    LLM_TIMEOUT: float = 20
+    LLM_KEEP_ALIVE: str = "30m"  # how long Ollama keeps a model loaded between commands
+    OLLAMA_URL: str = "http://localhost:11434"
+
     # Voice Settings
     VOICE_ENABLED: bool = True
     VOICE_OUTPUT: bool = True
     ALWAYS_VOICE: bool = False
-    
+    TTS_VOICE: str = "en-US-AriaNeural"  # or "en-US-GuyNeural", "en-IN-PrabhatNeural"
+    WHISPER_MODEL: str = "base"
+    SPECULATIVE_INTENT: bool = True  # start the LLM on partial voice transcripts
+    WAKE_WORD_ENABLED: bool = True  # needs recordings in wake_word/templates/*.wav
+
     # Execution Settings
     STOP_ON_FAILURE: bool = False
     AUTO_SAVE_WEB_CONTENT: bool = True
-    MAX_FILE_SIZE_MB: int = 10
-    
+    INTERACTIVE: bool = True  # False = never prompt (batch/headless use)
+    MAX_FILE_SIZE_MB: float = 10  # read_file refuses bigger files; use open_view
+    WRITE_DURABILITY: str = "fsync"  # none | fsync | group, see executors/atomic_write.py
+    GROUP_COMMIT_MS: float = 2.0
+    BULK_CONFIRM_OVER: int = 10  # ask before a bulk delete touching more files than this
+
     # Sandbox Settings
-    SANDBOX_PATH: str = "AutoBox"
-    ALLOWED_FOLDERS: list = None
-    
+    SANDBOX_PATH: str = "AutoBox"  # relative paths are next to the project folder; read at startup
+
+    # Output Settings
+    READ_PREVIEW_BYTES: int = 64 * 1024  # files up to this size are shown whole
+    READ_PREVIEW_LINES: int = 40  # bigger files show only their first lines
+    SEARCH_RESULTS: int = 5  # matches listed by search_files
+
+    # Clipboard Settings
+    CLIPBOARD_BACKEND: str = "auto"  # see executors/clipboard_backend.py
+    CLIPBOARD_MONITOR: bool = True  # remember what is copied in other apps too (kept in memory only)
+    CLIPBOARD_HISTORY: int = 50  # clips kept in memory
+    CLIPBOARD_POLL_S: float = 0.5  # monitor polling interval (backs off to 4x when idle)
+
     # Web Settings
-    HEADLESS_BROWSER: bool = True
-    WEB_TIMEOUT: int = 30
-    
+    HEADLESS_BROWSER: bool = False  # run.py shows the browser unless this is set
+    WEB_TIMEOUT: float = 30
+
+    # Resource Settings (see resource_governor.py)
+    MEMORY_HIGH_PERCENT: float = 85  # RAM use at which idle Whisper models / the browser are unloaded
+    MEMORY_TARGET_PERCENT: float = 75  # ...until use is back under this
+    RSS_LIMIT_MB: float = 0  # memory the assistant and its browser may use together (0 = no limit)
+    UNLOAD_MIN_IDLE_S: float = 60  # components used more recently are never unloaded
+    VISIBLE_BROWSER_MIN_IDLE_S: float = 1800  # same for a browser the user can see (0 = never unload it)
+    LLM_THREADS: int = 0  # Ollama num_thread (0 = its default; half the cores while Whisper runs alongside)
+    WHISPER_THREADS: int = 0  # torch threads for Whisper (0 = its default; half the cores alongside the LLM)
+
     # Logging
-    LOG_LEVEL: str = "INFO"
-    LOG_FILE: str = "logs/assistant.log"
-    
+    LOG_LEVEL: str = "INFO"  # diagnostics below this are skipped, see log_setup.py
+    LOG_FILE: str = "logs/assistant.jsonl"  # one JSON record per line
+
     def __post_init__(self):
-        if self.ALLOWED_FOLDERS is None:
-            self.ALLOWED_FOLDERS = ["AB1", "AB2", "AB3"]
-        
-        # Create necessary directories
-        os.makedirs(self.SANDBOX_PATH, exist_ok=True)
-        for folder in self.ALLOWED_FOLDERS:
-            os.makedirs(os.path.join(self.SANDBOX_PATH, folder), exist_ok=True)
-        
-        os.makedirs("logs", exist_ok=True)
\ No newline at end of file
+        problems = []
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if not _has_type(value, f.type):
+                problems.append(f"{f.name} should be {f.type.__name__}, got {value!r}")
+        if problems:
+            raise ConfigError("; ".join(problems))
+
+        positive = ["LLM_TIMEOUT", "MAX_FILE_SIZE_MB", "READ_PREVIEW_BYTES", "READ_PREVIEW_LINES",
+                    "SEARCH_RESULTS", "CLIPBOARD_HISTORY", "CLIPBOARD_POLL_S", "WEB_TIMEOUT"]
+        problems += [f"{name} must be > 0, got {getattr(self, name)}" for name in positive if getattr(self, name) <= 0]
+        problems += [f"{name} must be >= 0, got {getattr(self, name)}"
+                     for name in ("GROUP_COMMIT_MS", "BULK_CONFIRM_OVER", "RSS_LIMIT_MB", "UNLOAD_MIN_IDLE_S",
+                                  "VISIBLE_BROWSER_MIN_IDLE_S", "LLM_THREADS", "WHISPER_THREADS") if getattr(self, name) < 0]
+        if not 0 < self.MEMORY_TARGET_PERCENT <= self.MEMORY_HIGH_PERCENT <= 100:
+            problems.append("need 0 < MEMORY_TARGET_PERCENT <= MEMORY_HIGH_PERCENT <= 100")
+        if self.WRITE_DURABILITY not in DURABILITY_MODES:
+            problems.append(f"WRITE_DURABILITY must be one of {', '.join(DURABILITY_MODES)}")
+        if self.LOG_LEVEL.upper() not in LOG_LEVELS:
+            problems.append(f"LOG_LEVEL must be one of {', '.join(LOG_LEVELS)}")
+        if not self.SANDBOX_PATH.strip():
+            problems.append("SANDBOX_PATH is empty")
+        if not self.LLM_MODEL.strip():
+            problems.append("LLM_MODEL is empty")
+        if not all(isinstance(m, str) and m for m in self.LLM_ESCALATION_MODELS):
+            problems.append("LLM_ESCALATION_MODELS must be a list of model names")
+        if problems:
+            raise ConfigError("; ".join(problems))
+
+        if not self.OLLAMA_URL.startswith(("http://", "https://")):
+            object.__setattr__(self, "OLLAMA_URL", "http://" + self.OLLAMA_URL)  # OLLAMA_HOST style "host:port"
+        object.__setattr__(self, "OLLAMA_URL", self.OLLAMA_URL.rstrip("/"))
+        object.__setattr__(self, "LOG_LEVEL", self.LOG_LEVEL.upper())
+
+    @property
+    def autobox_dir(self) -> str:
+        """Absolute AutoBox folder (holds AUTOBOX_FOLDERS)"""
+        path = os.path.expanduser(self.SANDBOX_PATH)
+        return os.path.abspath(path if os.path.isabs(path) else os.path.join(os.path.dirname(BASE_DIR), path))
+
+    @property
+    def model_tiers(self) -> list:
+        """LLM models in routing order, smallest first"""
+        return [self.LLM_MODEL] + [m for m in self.LLM_ESCALATION_MODELS if m != self.LLM_MODEL]
+
+
+FIELD_TYPES = {f.name: f.type for f in fields(Config)}
+
+
+def _has_type(value, kind) -> bool:
+    if kind is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, kind)
+
+
+def _from_env(name: str, raw: str):
+    """Environment string -> value of the setting's type"""
+    kind = FIELD_TYPES[name]
+    raw = raw.strip()
+    try:
+        if kind is bool:
+            if raw.lower() in ("1", "true", "yes", "on"):
+                return True
+            if raw.lower() in ("0", "false", "no", "off", ""):
+                return False
+            raise ValueError(raw)
+        if kind is int:
+            return int(raw)
+        if kind is float:
+            return float(raw)
+        if kind is list:
+            return [part.strip() for part in raw.split(",") if part.strip()]
+        return raw
+    except ValueError:
+        raise ConfigError(f"{name} should be {kind.__name__}, got {raw!r} from the environment") from None
+
+
+def load_config(path: str = None, environ=None) -> Config:
+    """Defaults, then the JSON file (if it exists), then the environment; ConfigError if invalid"""
+    path = path or CONFIG_FILE
+    environ = os.environ if environ is None else environ
+    values = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Can't read {path}: {e}") from e
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path} must hold a JSON object")
+    unknown = sorted(set(data) - set(FIELD_TYPES))
+    if unknown:
+        raise ConfigError(f"Unknown setting(s) in {path}: {', '.join(unknown)}")
+    values.update(data)
+
+    for alias, name in ENV_ALIASES.items():
+        if alias in environ and ENV_PREFIX + name not in environ:
+            values[name] = _from_env(name, environ[alias])
+    for name in FIELD_TYPES:
+        if ENV_PREFIX + name in environ:
+            values[name] = _from_env(name, environ[ENV_PREFIX + name])
+    return Config(**values)
+
+
+# ================== SHARED CONFIG ==================
+_lock = threading.Lock()
+_loaded = None  # Config from file + environment
+_current = None  # _loaded with overrides applied
+_overrides = {}
+_mtime = None
+_checked_at = 0.0
+_generation = 0
+
+
+def _file_mtime():
+    try:
+        return os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _publish():
+    global _current, _generation
+    _current = replace(_loaded, **_overrides) if _overrides else _loaded
+    _generation += 1
+
+
+def get_config() -> Config:
+    """The current configuration, reloaded if config/assistant.json changed"""
+    global _loaded, _mtime, _checked_at
+    current = _current
+    if current is not None and time.monotonic() - _checked_at < RELOAD_INTERVAL:
+        return current
+
+    with _lock:
+        _checked_at = time.monotonic()
+        mtime = _file_mtime()
+        if _current is not None and mtime == _mtime:
+            return _current
+        try:
+            _loaded = load_config()
+        except ConfigError as e:
+            if _current is None:
+                raise
+            from log_setup import get_logger
+            get_logger("config").error("Config not reloaded, keeping the previous one: %s", e)
+        else:
+            if _current is not None:
+                from log_setup import get_logger
+                get_logger("config").info("Reloaded %s", CONFIG_FILE)
+            _publish()
+        _mtime = mtime
+        return _current
+
+
+def generation() -> int:
+    """Bumped whenever get_config() starts returning a different Config"""
+    get_config()
+    return _generation
+
+
+@contextmanager
+def override(**values):
+    """Temporarily replace settings in-process (benchmarks, tests); they survive reloads"""
+    unknown = set(values) - set(FIELD_TYPES)
+    if unknown:
+        raise ConfigError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+    get_config()
+    with _lock:
+        previous = dict(_overrides)
+        _overrides.update(values)
+        _publish()
+    try:
+        yield _current
+    finally:
+        with _lock:
+            _overrides.clear()
+            _overrides.update(previous)
+            _publish()
+
+
+def write_defaults(path: str = None, force: bool = False) -> bool:
+    """Save the default settings as an editable JSON file (False if one exists and not force)"""
+    path = path or CONFIG_FILE
+    if os.path.exists(path) and not force:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(asdict(Config()), f, indent=2)
+        f.write("\n")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or initialize the assistant configuration")
+    parser.add_argument("--write", action="store_true", help=f"Write the defaults to {CONFIG_FILE}")
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing file with --write")
+    args = parser.parse_args()
+
+    if args.write:
+        if write_defaults(force=args.force):
+            print(f"✅ Wrote defaults to {CONFIG_FILE}")
+        else:
+            print(f"⚠️ {CONFIG_FILE} already exists (use --force to overwrite)")
+            return 1
+    try:
+        config = load_config()
+    except ConfigError as e:
+        print(f"❌ {e}")
+        return 1
+
+    defaults = Config()
+    source = "file" if os.path.exists(CONFIG_FILE) else "defaults only"
+    print(f"⚙️ {CONFIG_FILE} ({source})")
+    for f in fields(config):
+        value = getattr(config, f.name)
+        changed = "" if value == getattr(defaults, f.name) else "  *"
+        print(f"  {f.name:24} {value!r}{changed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
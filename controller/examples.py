@@ -0,0 +1,204 @@
+"""
+Few-shot example store for prompt construction.
+
+Solved commands (command -> intent) are embedded as hashed character/word
+n-gram vectors in a numpy matrix, and only the k most similar ones are put
+into the prompt. That keeps the prompt short (faster prefill) and relevant.
+
+Benchmark:
+    python controller/examples.py --bench
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+DIM = 1024
+EXAMPLES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "memory", "examples.jsonl")
+DEFAULT_K = 3
+
+# Shipped examples, used until real history accumulates
+SEED_EXAMPLES = [
+    ("create hello.txt in ab2",
+     {"steps": [{"action": "create_file", "target": "AB2/hello.txt", "content": None}]}),
+    ("write 'test content' to file.txt",
+     {"steps": [{"action": "write_file", "target": "file.txt", "content": "test content"}]}),
+    ("hello how are you",
+     {"steps": [{"action": "none", "target": None, "content": None}]}),
+    ("open google.com",
+     {"steps": [{"action": "open_url", "target": "https://google.com", "content": None}]}),
+    ("search for AI news",
+     {"steps": [{"action": "search_web", "target": "AI news", "content": None}]}),
+    ("read notes.txt from ab1",
+     {"steps": [{"action": "read_file", "target": "AB1/notes.txt", "content": None}]}),
+    ("move report.txt to ab3",
+     {"steps": [{"action": "move_file", "target": "report.txt", "content": "AB3"}]}),
+    ("delete old.txt in ab2",
+     {"steps": [{"action": "delete_file", "target": "AB2/old.txt", "content": None}]}),
+    ("create day1..day30.txt in ab2",
+     {"steps": [{"action": "create_files", "target": "AB2/day1..day30.txt", "content": None}]}),
+    ("delete all log files in ab3",
+     {"steps": [{"action": "delete_files", "target": "AB3/*.log", "content": None}]}),
+    ("find where i wrote meeting notes",
+     {"steps": [{"action": "search_files", "target": "meeting notes", "content": None}]}),
+    ("paste the github link i copied earlier",
+     {"steps": [{"action": "paste_link", "target": "github", "content": None}]}),
+    ("open notepad",
+     {"steps": [{"action": "open_app", "target": "notepad", "content": None}]}),
+    ("create todo.txt in ab1 and write buy milk",
+     {"steps": [{"action": "create_file", "target": "AB1/todo.txt", "content": None},
+                {"action": "write_file", "target": "AB1/todo.txt", "content": "buy milk"}]}),
+]
+
+
+def _features(text: str):
+    """Character 3/4-grams plus word unigrams of the normalized text"""
+    text = " " + re.sub(r"\s+", " ", text.lower().strip()) + " "
+    for n in (3, 4):
+        for i in range(len(text) - n + 1):
+            yield text[i:i + n]
+    for word in text.split():
+        yield "w:" + word
+
+
+def embed(text: str, dim: int = DIM) -> np.ndarray:
+    """L2-normalized hashed n-gram vector (crc32 keeps buckets stable across runs)"""
+    buckets = [zlib.crc32(f.encode("utf-8")) % dim for f in _features(text)]
+    vec = np.bincount(buckets, minlength=dim).astype(np.float32) if buckets else np.zeros(dim, np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class ExampleStore:
+    """Solved commands with a cosine-similarity index over their embeddings"""
+
+    def __init__(self, path: str = EXAMPLES_FILE, dim: int = DIM, seed: bool = True):
+        self.path = path
+        self.dim = dim
+        self.commands = []
+        self.intents = []
+        self.index = {}  # normalized command -> row
+        self.matrix = np.zeros((64, dim), dtype=np.float32)
+        self.lock = threading.Lock()
+
+        if seed:
+            for command, intent in SEED_EXAMPLES:
+                self._add(command, intent)
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self):
+        return len(self.commands)
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                    self._add(item["command"], item["intent"])
+                except (ValueError, KeyError):
+                    continue
+
+    def _add(self, command: str, intent: dict):
+        key = " ".join(command.lower().split())
+        vec = embed(command, self.dim)
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.commands)
+            if row == len(self.matrix):
+                self.matrix = np.vstack([self.matrix, np.zeros_like(self.matrix)])
+            self.commands.append(command)
+            self.intents.append(intent)
+            self.index[key] = row
+        else:
+            self.intents[row] = intent  # newer solution wins
+        self.matrix[row] = vec
+
+    def add(self, command: str, intent: dict, persist: bool = True) -> bool:
+        """Record a solved command (and append it to the history file); False if it's already known"""
+        with self.lock:
+            if " ".join(command.lower().split()) in self.index:
+                return False  # keeps the history file from growing with repeats
+            self._add(command, intent)
+            if persist and self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"command": command, "intent": intent}, ensure_ascii=False) + "\n")
+            return True
+
+    def query(self, text: str, k: int = DEFAULT_K) -> list:
+        """The k most similar solved commands as (similarity, command, intent), best first"""
+        with self.lock:
+            n = len(self.commands)
+            if n == 0:
+                return []
+            scores = self.matrix[:n] @ embed(text, self.dim)
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self.commands[i], self.intents[i]) for i in top]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ExampleStore:
+    """Shared example store, loaded on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ExampleStore()
+        return _store
+
+
+def format_examples(examples: list) -> str:
+    """Render retrieved examples in the prompt's User/Output style"""
+    lines = ["EXAMPLES:"]
+    for _, command, intent in examples:
+        lines.append(f'User: "{command}"')
+        lines.append(f"Output: {json.dumps(intent, ensure_ascii=False)}")
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+def benchmark(sizes=(100, 1000, 10000, 50000), queries: int = 200):
+    """Time index build and top-k queries over synthetic command histories"""
+    verbs = ["create", "write", "read", "move", "delete", "open", "search for"]
+    nouns = ["notes", "todo", "report", "meeting", "budget", "ideas", "log", "draft"]
+    folders = ["ab1", "ab2", "ab3"]
+
+    def command(i):
+        return f"{verbs[i % 7]} {nouns[(i // 7) % 8]}{i}.txt in {folders[i % 3]}"
+
+    print(f"{'examples':>10} {'build ms':>10} {'per add us':>11} {'query us':>9}")
+    for size in sizes:
+        store = ExampleStore(path=None, seed=False)
+        intent = {"steps": [{"action": "none", "target": None, "content": None}]}
+
+        start = time.perf_counter()
+        for i in range(size):
+            store.add(command(i), intent, persist=False)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(queries):
+            store.query(command(i * 31 + 5), k=DEFAULT_K)
+        query = (time.perf_counter() - start) / queries
+
+        print(f"{size:>10} {build * 1000:>10.1f} {build / size * 1e6:>11.1f} {query * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        for score, cmd, intent in get_store().query(" ".join(sys.argv[1:]) or "create notes.txt in ab2"):
+            print(f"{score:.3f}  {cmd}  ->  {json.dumps(intent)}")
@@ -0,0 +1,359 @@
+"""
+Semantic intent cache.
+
+Intents that executed successfully are stored as templates: filenames,
+folders and URLs in the command are replaced by slots ({file0}, {folder0},
+{url0}) both in the command and in the intent. Lookups canonicalize the new command the same
+way, find the nearest cached template by cosine similarity (numpy matrix of
+hashed n-gram vectors, see controller/examples.py) and fill the slots, so
+"make a file called notes.txt in ab2" reuses the intent learned from
+"create todo.txt in AB1" without running the LLM.
+
+A near match is only served when the command has no words the cached one
+lacks ("undo", "not", "later" change what it means), and deletes and moves
+are only served for the same canonical command.
+
+Evaluation:
+    python -m controller.intent_cache --bench
+"""
+
+import copy
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from controller.examples import DIM, embed
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "memory", "intent_cache.json")
+CAPACITY = 500
+THRESHOLD = 0.9
+HIT_HALF_LIFE = 3 * 24 * 3600  # seconds unused after which an entry's hits count half for eviction
+
+FOLDER_ALIASES = {
+    "ab1": "AB1", "a1": "AB1", "av1": "AB1",
+    "ab2": "AB2", "a2": "AB2", "av2": "AB2",
+    "ab3": "AB3", "a3": "AB3", "av3": "AB3",
+}
+
+URL_RE = re.compile(
+    r"\b(?:https?://\S+|www\.\S+|[\w-]+(?:\.[\w-]+)*\.(?:com|org|net|io|dev|edu|gov|co|ai|app|info)(?:/\S*)?)",
+    re.IGNORECASE
+)
+FILE_RE = re.compile(r"\b[\w-]+\.[A-Za-z0-9]{1,5}\b")
+FOLDER_RE = re.compile(r"\b(" + "|".join(FOLDER_ALIASES) + r")\b", re.IGNORECASE)
+
+# Canonical verbs and filler so paraphrases map to the same template text
+SYNONYMS = {
+    "make": "create", "generate": "create", "new": "create", "touch": "create",
+    "remove": "delete", "erase": "delete", "trash": "delete",
+    "show": "read", "display": "read", "view": "read", "cat": "read",
+    "launch": "open", "start": "open", "visit": "open", "browse": "open",
+    "google": "search", "transfer": "move", "put": "move", "inside": "in", "into": "in",
+}
+STOPWORDS = {"a", "an", "the", "file", "called", "named", "please", "me", "for", "can",
+             "you", "could", "would", "folder", "directory", "go", "to", "from", "in"}
+
+# Served only on an exact canonical match: a wrong near hit would lose data
+DESTRUCTIVE_ACTIONS = {"delete_file", "delete_files", "move_file", "move_files"}
+
+# Words an intent may contain without having copied them from the command
+ACTION_WORDS = {"ab1", "ab2", "ab3", "https", "http", "www", "none"}
+
+
+def extract_slots(text: str):
+    """Return (template text, slots) with URLs, filenames and folders replaced by {kindN}"""
+    slots = {}
+    counters = {"url": 0, "file": 0, "folder": 0}
+
+    def replace(kind, normalize):
+        def sub(match):
+            name = f"{kind}{counters[kind]}"
+            counters[kind] += 1
+            slots[name] = normalize(match.group(0))
+            return " {" + name + "} "
+        return sub
+
+    text = URL_RE.sub(replace("url", lambda v: re.sub(r"^https?://", "", v).rstrip(".,")), text)
+    text = FILE_RE.sub(replace("file", lambda v: v), text)
+    text = FOLDER_RE.sub(replace("folder", lambda v: FOLDER_ALIASES[v.lower()]), text)
+    return text, slots
+
+
+def canonicalize(template: str) -> str:
+    """Lowercase, map verb synonyms, drop filler words"""
+    words = re.findall(r"\{\w+\}|[\w']+", template.lower())
+    words = [SYNONYMS.get(w, w) for w in words]
+    words = [w for w in words if w not in STOPWORDS]
+    # "create a new file" -> "create create" -> "create"
+    return " ".join(w for i, w in enumerate(words) if i == 0 or w != words[i - 1])
+
+
+def _templatize_value(value: str, slots: dict) -> str:
+    # Longest values first so "AB2/notes.txt" isn't half-replaced by a shorter slot
+    for name, slot_value in sorted(slots.items(), key=lambda kv: -len(kv[1])):
+        value = re.sub(re.escape(slot_value), "{" + name + "}", value, flags=re.IGNORECASE)
+    return value
+
+
+def templatize_intent(command: str, intent: dict, slots: dict):
+    """Replace slot values inside the intent; None if it copies other words from the command"""
+    slot_free_command = command
+    for value in slots.values():
+        slot_free_command = re.sub(re.escape(value), " ", slot_free_command, flags=re.IGNORECASE)
+    command_words = {w for w in re.findall(r"[a-z0-9']+", slot_free_command.lower()) if len(w) > 2}
+
+    template = copy.deepcopy(intent)
+    for step in template.get("steps", []):
+        for field in ("target", "content"):
+            value = step.get(field)
+            if not isinstance(value, str):
+                continue
+            value = _templatize_value(value, slots)
+            leftover = set(re.findall(r"[a-z0-9']+", re.sub(r"\{\w+\}", " ", value).lower()))
+            if (leftover & command_words) - ACTION_WORDS:
+                return None  # free text (content, query, app name) we can't substitute safely
+            step[field] = value
+    return template
+
+
+def fill_intent(template: dict, slots: dict) -> dict:
+    """Substitute slot values into a cached intent template"""
+    intent = copy.deepcopy(template)
+    for step in intent.get("steps", []):
+        for field in ("target", "content"):
+            value = step.get(field)
+            if isinstance(value, str):
+                for name, slot_value in slots.items():
+                    value = value.replace("{" + name + "}", slot_value)
+                step[field] = value
+    return intent
+
+
+class SemanticIntentCache:
+    """Nearest-neighbor cache of intent templates with LFU eviction, hit counts aged by last use"""
+
+    def __init__(self, path: str = CACHE_FILE, capacity: int = CAPACITY, threshold: float = THRESHOLD):
+        self.path = path
+        self.capacity = capacity
+        self.threshold = threshold
+        self.lock = threading.Lock()
+
+        self.matrix = np.zeros((capacity, DIM), dtype=np.float32)
+        self.keys = []           # canonical template text per row
+        self.signatures = []     # sorted slot names per row
+        self.templates = []      # intent template per row
+        self.hits = np.zeros(capacity, dtype=np.int64)
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.rows = {}           # canonical template text -> row
+        self.stats = {"lookups": 0, "hits": 0, "stores": 0, "evictions": 0, "uncacheable": 0}
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, command: str):
+        """Return a filled intent for a command similar to a cached one, else None"""
+        template_text, slots = extract_slots(command)
+        key = canonicalize(template_text)
+        signature = sorted(slots)
+
+        with self.lock:
+            self.stats["lookups"] += 1
+            n = len(self.keys)
+            if n == 0:
+                return None
+
+            row = self.rows.get(key)
+            if row is None:
+                scores = self.matrix[:n] @ embed(key)
+                row = int(np.argmax(scores))
+                if scores[row] < self.threshold:
+                    return None
+                if set(key.split()) - set(self.keys[row].split()):
+                    return None  # "undo delete x", "delete x later": extra words change the meaning
+                if any(step.get("action") in DESTRUCTIVE_ACTIONS for step in self.templates[row]["steps"]):
+                    return None
+            if self.signatures[row] != signature:
+                return None
+
+            self.hits[row] += 1
+            self.last_used[row] = time.time()
+            self.stats["hits"] += 1
+            return fill_intent(self.templates[row], slots)
+
+    def store(self, command: str, intent: dict, persist: bool = True) -> bool:
+        """Cache a validated intent as a template; False if it can't be templated safely"""
+        template_text, slots = extract_slots(command)
+        template = templatize_intent(command, intent, slots)
+        if template is None:
+            self.stats["uncacheable"] += 1
+            return False
+
+        key = canonicalize(template_text)
+        with self.lock:
+            # Storing counts as a use, so a newcomer isn't the next victim by default
+            row = self.rows.get(key)
+            hits = int(self.hits[row]) + 1 if row is not None else 1
+            self._insert(key, sorted(slots), template, hits=hits, last_used=time.time())
+            self.stats["stores"] += 1
+            if persist and self.path:
+                self._save()
+        return True
+
+    def _insert(self, key, signature, template, hits, last_used):
+        row = self.rows.get(key)
+        if row is None:
+            if len(self.keys) >= self.capacity:
+                self._evict()
+            row = len(self.keys)
+            self.keys.append(key)
+            self.signatures.append(signature)
+            self.templates.append(template)
+            self.rows[key] = row
+            self.matrix[row] = embed(key)
+        else:
+            self.signatures[row] = signature
+            self.templates[row] = template
+        self.hits[row] = hits
+        self.last_used[row] = last_used
+
+    def _evict(self):
+        """
+        Drop the entry with the fewest aged hits (least recently used among ties); move
+        the last row into its slot. Hits halve every HIT_HALF_LIFE seconds without use,
+        so entries that were popular once don't stay forever.
+        """
+        n = len(self.keys)
+        age = np.maximum(time.time() - self.last_used[:n], 0.0)
+        aged_hits = self.hits[:n] * np.exp2(-age / HIT_HALF_LIFE)
+        order = np.lexsort((self.last_used[:n], aged_hits))
+        victim, last = int(order[0]), n - 1
+
+        del self.rows[self.keys[victim]]
+        if victim != last:
+            self.keys[victim] = self.keys[last]
+            self.signatures[victim] = self.signatures[last]
+            self.templates[victim] = self.templates[last]
+            self.matrix[victim] = self.matrix[last]
+            self.hits[victim] = self.hits[last]
+            self.last_used[victim] = self.last_used[last]
+            self.rows[self.keys[victim]] = victim
+        self.keys.pop()
+        self.signatures.pop()
+        self.templates.pop()
+        self.stats["evictions"] += 1
+
+    def _save(self):
+        entries = [
+            {"key": k, "signature": s, "template": t, "hits": int(h), "last_used": float(u)}
+            for k, s, t, h, u in zip(self.keys, self.signatures, self.templates, self.hits, self.last_used)
+        ]
+        tmp = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for e in entries[-self.capacity:]:
+            self._insert(e["key"], e["signature"], e["template"], e.get("hits", 0), e.get("last_used", 0.0))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SemanticIntentCache:
+    """Shared intent cache, loaded on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticIntentCache()
+        return _cache
+
+
+# ================== EVALUATION ==================
+def _step(action, target=None, content=None):
+    return {"steps": [{"action": action, "target": target, "content": content}]}
+
+
+# (command used to fill the cache, its intent)
+LABELLED_SEED = [
+    ("create todo.txt in ab1", _step("create_file", "AB1/todo.txt")),
+    ("delete old.log in ab3", _step("delete_file", "AB3/old.log")),
+    ("read report.txt from ab2", _step("read_file", "AB2/report.txt")),
+    ("move draft.txt to ab3", _step("move_file", "draft.txt", "AB3")),
+    ("open google.com", _step("open_url", "https://google.com")),
+    ("search for AI news", _step("search_web", "AI news")),          # free text: uncacheable
+    ("write hello to notes.txt", _step("write_file", "notes.txt", "hello")),  # free text: uncacheable
+]
+
+# (query, expected intent or None when no cached template applies)
+LABELLED_QUERIES = [
+    ("make a file called notes.txt in ab2", _step("create_file", "AB2/notes.txt")),
+    ("create notes.txt in AB2", _step("create_file", "AB2/notes.txt")),
+    ("please create a new file named list.md in a3", _step("create_file", "AB3/list.md")),
+    ("remove temp.txt from av1", _step("delete_file", "AB1/temp.txt")),
+    ("erase the file data.csv in ab2", _step("delete_file", "AB2/data.csv")),
+    ("show me report.txt in ab1", _step("read_file", "AB1/report.txt")),
+    ("display the file ideas.txt from ab3", _step("read_file", "AB3/ideas.txt")),
+    ("move house.py to ab1", _step("move_file", "house.py", "AB1")),
+    ("put budget.xlsx into ab2", _step("move_file", "budget.xlsx", "AB2")),
+    ("open github.com", _step("open_url", "https://github.com")),
+    ("visit https://python.org", _step("open_url", "https://python.org")),
+    ("search for weather today", None),
+    ("write goodbye to notes.txt", None),
+    ("open notepad", None),
+    ("hello how are you", None),
+    ("create notes.txt and write hi in it", None),
+    ("copy notes.txt to ab2", None),
+    ("what time is it", None),
+    ("undo delete notes.txt in ab2", None),
+    ("delete notes.txt in ab2 later", None),
+    ("do not move draft.txt to ab1", None),
+]
+
+
+def benchmark(thresholds=(0.7, 0.8, 0.9, 0.95)):
+    """Precision/recall of cache hits on the labelled command set at several thresholds"""
+    print(f"{'threshold':>9} {'hits':>5} {'correct':>8} {'precision':>9} {'recall':>7} {'lookup us':>10}")
+    expected_hits = sum(1 for _, expected in LABELLED_QUERIES if expected is not None)
+
+    for threshold in thresholds:
+        cache = SemanticIntentCache(path=None, threshold=threshold)
+        for command, intent in LABELLED_SEED:
+            cache.store(command, intent, persist=False)
+
+        hits = correct = 0
+        start = time.perf_counter()
+        for query, expected in LABELLED_QUERIES:
+            result = cache.lookup(query)
+            if result is not None:
+                hits += 1
+                correct += 1 if result == expected else 0
+        per_lookup = (time.perf_counter() - start) / len(LABELLED_QUERIES)
+
+        precision = correct / hits if hits else 1.0
+        recall = correct / expected_hits if expected_hits else 1.0
+        print(f"{threshold:>9.2f} {hits:>5} {correct:>8} {precision:>9.2f} {recall:>7.2f} {per_lookup * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        command = " ".join(sys.argv[1:]) or "create notes.txt in ab2"
+        print(extract_slots(command), "->", get_cache().lookup(command))
@@ -1,9 +1,174 @@
-import subprocess
+import threading
 import json
-import re
+import math
 import os
+import time
+from collections import OrderedDict
 
-MODEL = "gemma3:1b"
+import requests
+
+from config import get_config
+from log_setup import get_logger
+from resource_governor import thread_budget
+from tracing import record, span
+
+log = get_logger(__name__)
+
+ACTIONS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "actions.json")
+
+# Limits baked into the output schema; they also bound the token budget
+MAX_STEPS = 5
+MAX_TARGET_CHARS = 200
+MAX_CONTENT_CHARS = 500
+CHARS_PER_TOKEN = 3  # conservative for JSON-heavy output
+
+# Similar solved commands included in each prompt (see controller/examples.py)
+FEW_SHOT_K = 3
+
+# Intents the model produced, by command, until they run; only these are learned from (and cached)
+PENDING_MAX = 64
+_pending = OrderedDict()  # command -> (JSON response, router confidence)
+_pending_lock = threading.Lock()
+
+
+class LLMCancelled(Exception):
+    """Raised when an in-flight generation is cancelled by the caller"""
+
+
+# ================== OUTPUT SCHEMA ==================
+_allowed_actions = None
+
+def load_allowed_actions() -> list:
+    """Allowed intent actions from config/actions.json"""
+    global _allowed_actions
+    if _allowed_actions is None:
+        with open(ACTIONS_FILE, 'r', encoding='utf-8') as f:
+            _allowed_actions = json.load(f)["allowed_actions"]
+    return _allowed_actions
+
+def build_intent_schema(actions: list = None) -> dict:
+    """JSON schema the model's output is constrained to"""
+    actions = actions or load_allowed_actions()
+    return {
+        "type": "object",
+        "properties": {
+            "steps": {
+                "type": "array",
+                "minItems": 1,
+                "maxItems": MAX_STEPS,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "action": {"type": "string", "enum": actions},
+                        "target": {"type": ["string", "null"], "maxLength": MAX_TARGET_CHARS},
+                        "content": {"type": ["string", "null"], "maxLength": MAX_CONTENT_CHARS},
+                    },
+                    "required": ["action", "target", "content"],
+                },
+            },
+        },
+        "required": ["steps"],
+    }
+
+def schema_token_budget(schema: dict) -> int:
+    """Upper bound on output tokens for a document matching the intent schema"""
+    steps = schema["properties"]["steps"]
+    fields = steps["items"]["properties"]
+    longest_action = max(len(a) for a in fields["action"]["enum"])
+    
+    # {"action": "...", "target": "...", "content": "..."} plus separators/whitespace
+    step_chars = 60 + longest_action + fields["target"]["maxLength"] + fields["content"]["maxLength"]
+    total_chars = 20 + steps["maxItems"] * step_chars
+    return math.ceil(total_chars / CHARS_PER_TOKEN)
+
+def validate_intent(data, actions: list = None) -> bool:
+    """Check that parsed model output has the intent shape and only allowed actions"""
+    actions = actions or load_allowed_actions()
+    if not isinstance(data, dict) or not isinstance(data.get("steps"), list) or not data["steps"]:
+        return False
+    return all(isinstance(step, dict) and step.get("action") in actions for step in data["steps"])
+
+
+# ================== OLLAMA ==================
+def _close_on_cancel(response, cancel_event, done):
+    """Abort the streaming response as soon as the cancel event fires"""
+    while not done.is_set():
+        if cancel_event.wait(0.05):
+            response.close()
+            return
+
+def llm_options() -> dict:
+    """Runner options for every request (empty = Ollama's defaults)"""
+    # num_thread only changes when Whisper loads/unloads: each change makes Ollama reload the model once
+    threads = thread_budget()["llm"]
+    return {"num_thread": threads} if threads else {}
+
+def run_model(prompt: str, timeout: float = None, cancel_event: threading.Event = None,
+              schema: dict = None, num_predict: int = None, model: str = None) -> str:
+    """
+    Run the local model through the Ollama API and return its raw output.
+
+    With a schema the server constrains decoding to it (Ollama `format`).
+    Generation streams, so setting cancel_event aborts it mid-way.
+    """
+    cfg = get_config()  # model, server and timeouts follow config reloads
+    payload = {"model": model or cfg.LLM_MODEL, "prompt": prompt, "stream": True, "keep_alive": cfg.LLM_KEEP_ALIVE}
+    if schema is not None:
+        payload["format"] = schema
+    payload["options"] = llm_options()
+    if num_predict is not None:
+        payload["options"].update({"num_predict": num_predict, "temperature": 0})
+    
+    chunks = []
+    done = threading.Event()
+    model_name = payload["model"]
+    start = time.perf_counter()
+    with span("llm.total", model=model_name) as attrs:
+        with requests.post(f"{cfg.OLLAMA_URL}/api/generate", json=payload, stream=True,
+                           timeout=timeout or cfg.LLM_TIMEOUT) as response:
+            response.raise_for_status()
+            if cancel_event is not None:
+                threading.Thread(target=_close_on_cancel, args=(response, cancel_event, done), daemon=True).start()
+            try:
+                for line in response.iter_lines():
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+                    if not chunks:
+                        record("llm.ttft", time.perf_counter() - start, start, model=model_name)
+                    chunks.append(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        attrs["tokens"] = chunk.get("eval_count", len(chunks))
+                        break
+            except Exception:
+                if not (cancel_event is not None and cancel_event.is_set()):
+                    raise
+            finally:
+                done.set()
+    
+    if cancel_event is not None and cancel_event.is_set():
+        raise LLMCancelled()
+    return "".join(chunks)
+
+def warm_up() -> bool:
+    """Load the model into Ollama ahead of the first command"""
+    cfg = get_config()
+    try:
+        # An empty prompt just loads the model
+        response = requests.post(
+            f"{cfg.OLLAMA_URL}/api/generate",
+            json={"model": cfg.LLM_MODEL, "prompt": "", "keep_alive": cfg.LLM_KEEP_ALIVE, "options": llm_options()},
+            timeout=120
+        )
+        response.raise_for_status()
+        return True
+    except Exception as e:
+        log.warning("LLM warm-up failed: %s", e)
+        return False
 
 def load_prompt():
     """Load the prompt from prompt.txt file"""
@@ -40,6 +205,16 @@ move_file
 search_web
 schedule_event
 delete_file
+create_files
+write_files
+move_files
+delete_files
+search_files
+paste_link
+extract_web
+copy_clipboard
+paste_clipboard
+system_info
 none
 
 JSON FORMAT:
@@ -59,107 +234,178 @@ RULES:
 3. For create_file: if content is list, convert to comma-separated string
 4. For greetings (hello, hi, how are you), use action: "none"
 5. For questions, use action: "none"
+6. For many files at once (ranges like day1..day30.txt, wildcards like *.log) use ONE
+   create_files/write_files/move_files/delete_files step with the pattern as target
+   (move_files: destination folder as content)
+7. To find files by what they contain ("where did I write meeting notes"), use
+   search_files with the words to look for as target
+8. "Paste the link I copied earlier" is paste_link; target is a word describing the
+   link ("github") or null for the most recent one
+9. extract_web: target is the URL to read the text of; copy_clipboard: target is the
+   text to copy; paste_clipboard and system_info take no target
+"""
 
-EXAMPLES:
-User: "create hello.txt in ab2"
-Output: {"steps": [{"action": "create_file", "target": "AB2/hello.txt", "content": null}]}
-
-User: "write 'test content' to file.txt"
-Output: {"steps": [{"action": "write_file", "target": "file.txt", "content": "test content"}]}
-
-User: "hello how are you"
-Output: {"steps": [{"action": "none", "target": null, "content": null}]}
-
-User: "open google.com"
-Output: {"steps": [{"action": "open_url", "target": "https://google.com", "content": null}]}
+def build_prompt(user_input: str, k: int = FEW_SHOT_K) -> str:
+    """Full model prompt: instructions, the k most similar solved commands, then the command"""
+    from controller.examples import get_store, format_examples
+    
+    with span("llm.prompt_build"):
+        examples = format_examples(get_store().query(user_input, k=k)) if k else ""
+        return f"{load_prompt()}\n\n{examples}\n\nUser: \"{user_input}\"\nOutput:"
 
-User: "search for AI news"
-Output: {"steps": [{"action": "search_web", "target": "AI news", "content": null}]}
+def generate_intent(user_input: str, model: str = None, cancel_event: threading.Event = None):
+    """
+    Run one model on a command and return the parsed intent dict.
 
-Now process this command:"""
+    Returns None if the output doesn't match the intent schema; connection
+    errors, timeouts and LLMCancelled propagate to the caller.
+    """
+    schema = build_intent_schema()
+    output = run_model(
+        build_prompt(user_input),
+        cancel_event=cancel_event,
+        schema=schema,
+        num_predict=schema_token_budget(schema),
+        model=model
+    ).strip()
+    
+    # Debug
+    model = model or get_config().LLM_MODEL
+    log.debug("Raw LLM output from %s (%d chars): %s", model, len(output), output, extra={"model": model})
+    
+    with span("llm.parse"):
+        try:
+            data = json.loads(output)
+        except json.JSONDecodeError:
+            return None
+        return data if validate_intent(data) else None
 
-def ask_llm(user_input: str) -> str:
+def ask_llm(user_input: str, cancel_event: threading.Event = None) -> str:
     """
     Convert natural language command to JSON intent using local LLM.
+
+    Commands that paraphrase a cached one are answered from the semantic
+    intent cache. Otherwise the model router tries the smallest model first
+    and escalates to a larger one only when the result looks unreliable.
+
+    If cancel_event is set while the model is running, generation is
+    aborted and None is returned instead of an intent.
     """
-    # Load and prepare prompt
-    base_prompt = load_prompt()
-    full_prompt = f"{base_prompt}\n\nUser: \"{user_input}\"\nOutput:"
+    from controller.router import route_intent
+    from controller.intent_cache import get_cache
     
-    print(f"🤖 Processing: {user_input[:50]}...")
+    log.info("Processing: %.50s", user_input)
+    
+    # Paraphrases of commands we've already solved skip inference
+    cached = get_cache().lookup(user_input)
+    if cached is not None:
+        log.info("Intent cache hit (%d steps)", len(cached["steps"]))
+        return json.dumps(cached, ensure_ascii=False)
     
     try:
-        # Run Ollama
-        result = subprocess.run(
-            ["ollama", "run", MODEL],
-            input=full_prompt,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            timeout=20
-        )
-        
-        output = result.stdout.strip()
-        
-        # Debug
-        print(f"📥 Raw LLM output ({len(output)} chars): {output[:100]}...")
-        
-        # Clean the output
-        cleaned = output.strip()
+        data, confidence = route_intent(user_input, cancel_event=cancel_event)
+        if data is not None:
+            log.debug("Valid JSON with %d steps", len(data["steps"]))
+            response = json.dumps(data, ensure_ascii=False)
+            with _pending_lock:
+                _pending[user_input] = (response, confidence)
+                _pending.move_to_end(user_input)
+                while len(_pending) > PENDING_MAX:
+                    _pending.popitem(last=False)
+            return response
         
-        # Remove markdown code blocks
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        elif cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        
-        cleaned = cleaned.strip()
-        
-        # Try to parse as JSON
-        try:
-            data = json.loads(cleaned)
-            if isinstance(data, dict) and "steps" in data:
-                print(f"✅ Valid JSON with {len(data['steps'])} steps")
-                return json.dumps(data, ensure_ascii=False)
-        except json.JSONDecodeError:
-            # Try to find JSON in the text
-            pass
-        
-        # Search for JSON pattern
-        json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            try:
-                data = json.loads(json_str)
-                if isinstance(data, dict) and "steps" in data:
-                    print(f"✅ Found JSON in text: {len(data['steps'])} steps")
-                    return json.dumps(data, ensure_ascii=False)
-            except json.JSONDecodeError:
-                pass
-        
-        # If no valid JSON, use fallback
-        print("⚠️ No valid JSON found, using fallback parser")
+        # Only possible if the server ignored the schema (old Ollama) or hit the token cap
+        log.warning("Output did not match the intent schema, using fallback parser")
         return fallback_parser(user_input)
         
-    except subprocess.TimeoutExpired:
-        print("⏰ LLM timeout after 20 seconds")
+    except LLMCancelled:
+        log.info("Cancelled: %.50s", user_input)
+        return None
+    except requests.Timeout:
+        log.error("LLM timeout after %s seconds", get_config().LLM_TIMEOUT)
         return fallback_parser(user_input)
-    except FileNotFoundError:
-        print("❌ Ollama not found. Make sure it's installed and running")
+    except requests.ConnectionError:
+        log.error("Ollama not reachable at %s. Make sure it's running: 'ollama serve'", get_config().OLLAMA_URL)
         return fallback_parser(user_input)
     except Exception as e:
-        print(f"❌ LLM error: {e}")
+        log.error("LLM error: %s", e)
         return fallback_parser(user_input)
 
+def learn(user_input: str, json_response: str) -> bool:
+    """
+    Call after an intent executed successfully: if the model produced it for
+    this command, keep it as a few-shot example and, when the router was
+    confident, in the intent cache. Fallback parser output, cache hits and
+    intents handed in from elsewhere are never learned from.
+    """
+    from controller.examples import get_store
+    from controller.intent_cache import get_cache
+    from controller.router import CONFIDENCE_THRESHOLD
+    
+    with _pending_lock:
+        pending = _pending.get(user_input)
+        if pending is None or pending[0] != json_response:
+            return False
+        del _pending[user_input]
+    
+    intent = json.loads(json_response)
+    if pending[1] >= CONFIDENCE_THRESHOLD:
+        get_cache().store(user_input, intent)
+    if all(step.get("action") in ("none", "chat", "respond") for step in intent.get("steps", [])):
+        return False
+    get_store().add(user_input, intent)
+    return True
+
 def fallback_parser(user_input: str) -> str:
     """Fallback parser when LLM fails"""
-    print(f"🔄 Using fallback parser for: {user_input}")
+    log.info("Using fallback parser for: %s", user_input)
     
     text = user_input.lower().strip()
     
+    # SEARCH FILE CONTENTS (before greetings: "which" contains "hi")
+    import re
+    file_search = re.search(
+        r"(?:where (?:did )?i (?:wrote|write|saved|save|noted|put)|which files? (?:mentions?|contains?|has|have|says?)"
+        r"|files? (?:about|mentioning|containing)|search (?:in )?(?:my |the )?files(?: for)?)\s+(.+)", text)
+    if file_search:
+        return json.dumps({
+            "steps": [{
+                "action": "search_files",
+                "target": file_search.group(1).strip(" ?.!"),
+                "content": None
+            }]
+        })
+    
+    # PASTE A LINK COPIED EARLIER: paste the github link I copied
+    if "link" in text and ("paste" in text or "copied" in text):
+        filler = {"paste", "the", "a", "link", "i", "copied", "earlier", "before", "that", "again", "me",
+                  "my", "last", "from", "please", "give", "url", "which", "you", "back"}
+        words = [w for w in re.findall(r"[\w.-]+", text) if w not in filler]
+        return json.dumps({
+            "steps": [{
+                "action": "paste_link",
+                "target": " ".join(words) or None,
+                "content": None
+            }]
+        })
+    
+    # CLIPBOARD: copy <text> / paste
+    copy_match = re.match(r"copy\s+(.+)", user_input.strip(), re.IGNORECASE)
+    if copy_match:
+        return json.dumps({
+            "steps": [{
+                "action": "copy_clipboard",
+                "target": copy_match.group(1).strip().strip('"\''),
+                "content": None
+            }]
+        })
+    if re.match(r"paste\b", text):
+        return json.dumps({"steps": [{"action": "paste_clipboard", "target": None, "content": None}]})
+    
+    # SYSTEM INFO
+    if "system info" in text or "system status" in text:
+        return json.dumps({"steps": [{"action": "system_info", "target": None, "content": None}]})
+    
     # Check for greetings/chat
     greetings = ["hello", "hi", "hey", "how are you", "what's up", "good morning", "good evening"]
     for greeting in greetings:
@@ -170,6 +416,19 @@ def fallback_parser(user_input: str) -> str:
     if "create" in text or "make" in text:
         # Find filename
         import re
+        folder = "AB2" if ("ab2" in text or "a2" in text) else "AB3" if ("ab3" in text or "a3" in text) else "AB1"
+        
+        # Range of files: create day1..day30.txt
+        range_match = re.search(r'(\S*\d+\.\.\S*\d+\S*)', user_input)
+        if range_match:
+            return json.dumps({
+                "steps": [{
+                    "action": "create_files",
+                    "target": f"{folder}/{range_match.group(1)}",
+                    "content": None
+                }]
+            })
+        
         filename_match = re.search(r'(\w+\.\w+)', user_input)
         if filename_match:
             filename = filename_match.group(1)
@@ -178,13 +437,6 @@ def fallback_parser(user_input: str) -> str:
             import time
             filename = f"file_{int(time.time())}.txt"
         
-        # Find folder
-        folder = "AB1"  # default
-        if "ab2" in text or "a2" in text:
-            folder = "AB2"
-        elif "ab3" in text or "a3" in text:
-            folder = "AB3"
-        
         return json.dumps({
             "steps": [{
                 "action": "create_file",
@@ -236,6 +488,17 @@ def fallback_parser(user_input: str) -> str:
             }]
         })
     
+    # EXTRACT PAGE TEXT
+    elif "extract" in text and re.search(r'(https?://\S+|www\.\S+)', user_input):
+        url = re.search(r'(https?://\S+|www\.\S+)', user_input).group(1)
+        return json.dumps({
+            "steps": [{
+                "action": "extract_web",
+                "target": url if url.startswith("http") else "https://" + url,
+                "content": None
+            }]
+        })
+    
     # OPEN URL
     elif "open" in text and ("http" in text or "www" in text or ".com" in text):
         import re
@@ -0,0 +1,166 @@
+import os
+import re
+import threading
+import time
+
+from config import get_config
+from controller.llm import generate_intent, validate_intent
+from executors.file_exec import (AUTOBOX_FOLDERS, FOLDER_ALIASES, expand_range, get_full_path, locate,
+                                 normalize_folder, select_files)
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
+CONFIDENCE_THRESHOLD = 0.7
+
+# Words in the command that make an action plausible
+ACTION_CUES = {
+    "create_file": ["create", "make", "new", "touch"],
+    "write_file": ["write", "append", "save", "put", "add", "type"],
+    "read_file": ["read", "show", "display", "open", "view", "cat", "what's in", "contents"],
+    "move_file": ["move", "put", "transfer", "to ab", "into", "store", "save"],
+    "delete_file": ["delete", "remove", "erase", "trash"],
+    "create_files": ["create", "make", "new", "touch"],
+    "write_files": ["write", "append", "save", "put", "add", "type"],
+    "move_files": ["move", "put", "transfer", "to ab", "into", "store"],
+    "delete_files": ["delete", "remove", "erase", "trash", "clear", "clean"],
+    "search_files": ["find", "search", "where", "which file", "mention", "about", "wrote", "look for"],
+    "paste_link": ["paste", "link", "copied", "url"],
+    "open_url": ["open", "go to", "visit", "browse", "http", "www", ".com", ".org", ".net", ".io"],
+    "search_web": ["search", "google", "look up", "find", "news", "weather"],
+    "open_app": ["open", "launch", "start", "run"],
+    "close_app": ["close", "quit", "exit", "kill", "stop"],
+    "schedule_event": ["schedule", "remind", "meeting", "calendar", "tomorrow", "at "],
+}
+
+FILE_ACTIONS = {"create_file", "write_file", "read_file", "move_file", "delete_file"}
+BULK_ACTIONS = {"create_files", "write_files", "move_files", "delete_files"}
+URL_PATTERN = re.compile(r"^(https?://)?[\w-]+(\.[\w-]+)+(/\S*)?$")
+
+
+def model_tiers() -> list:
+    """Smallest first; a tier is only tried when the previous one looks unreliable (LLM_MODEL, LLM_ESCALATION_MODELS)"""
+    return get_config().model_tiers
+
+
+def action_plausibility(user_input: str, intent: dict) -> float:
+    """Fraction of steps whose action is supported by words in the command"""
+    text = user_input.lower()
+    steps = intent["steps"]
+    any_cue = any(cue in text for cues in ACTION_CUES.values() for cue in cues)
+
+    plausible = 0
+    for step in steps:
+        action = step["action"]
+        if action == "none":
+            plausible += 0 if any_cue else 1
+        elif any(cue in text for cue in ACTION_CUES.get(action, [])):
+            plausible += 1
+    return plausible / len(steps)
+
+
+def target_resolvability(intent: dict) -> float:
+    """Fraction of steps whose target makes sense for the action"""
+    steps = intent["steps"]
+    resolvable = 0
+    created = set()
+
+    for step in steps:
+        action = step["action"]
+        target = (step.get("target") or "").strip()
+
+        if action == "none":
+            ok = True
+        elif action in FILE_ACTIONS:
+            ok = bool(target) and bool(get_full_path(target))
+            if ok and action == "create_file":
+                created.add(os.path.basename(target).lower())
+            elif ok and action in ("read_file", "move_file", "delete_file"):
+                # Must exist now, or be created by an earlier step of this intent
+                ok = (os.path.basename(target).lower() in created
+                      or os.path.exists(get_full_path(target))
+                      or locate(os.path.basename(target)) is not None)
+            if ok and action == "move_file":
+                destination = (step.get("content") or "").lower().replace(" ", "")
+                ok = destination in FOLDER_ALIASES or destination.upper() in FOLDER_ALIASES.values()
+        elif action in BULK_ACTIONS:
+            try:
+                if action == "create_files":
+                    ok = len(expand_range(target.split("/")[-1])) > 1 or "," in target
+                else:
+                    # Files made by an earlier create_files step of this intent count too
+                    ok = bool(select_files(target)) or target.lower() in created
+                if ok and action == "create_files":
+                    created.add(target.lower())
+                if ok and action == "move_files":
+                    ok = normalize_folder(step.get("content") or "") in AUTOBOX_FOLDERS
+            except ValueError:
+                ok = False
+        elif action == "open_url":
+            ok = bool(URL_PATTERN.match(target))
+        elif action == "paste_link":
+            ok = True  # the target only narrows down which link; none means the latest
+        else:
+            ok = bool(target)
+
+        resolvable += 1 if ok else 0
+    return resolvable / len(steps)
+
+
+def score_intent(user_input: str, intent) -> dict:
+    """Confidence that an intent is a correct reading of the command"""
+    if not validate_intent(intent):
+        return {"confidence": 0.0, "valid": False, "plausibility": 0.0, "resolvability": 0.0}
+
+    plausibility = action_plausibility(user_input, intent)
+    resolvability = target_resolvability(intent)
+    return {
+        "confidence": round(0.5 * plausibility + 0.5 * resolvability, 3),
+        "valid": True,
+        "plausibility": round(plausibility, 3),
+        "resolvability": round(resolvability, 3),
+    }
+
+
+def route_intent(user_input: str, cancel_event: threading.Event = None, tiers: list = None,
+                 threshold: float = CONFIDENCE_THRESHOLD):
+    """
+    Generate an intent with the cheapest model that is confident enough.
+
+    Each tier's result is scored on schema validity, action plausibility and
+    target resolvability; a larger model is tried only when the confidence is
+    below the threshold. Returns (best intent seen or None if no model
+    produced a valid one, its confidence).
+    """
+    tiers = tiers or model_tiers()
+    best, best_score, best_model = None, None, None
+    attempts = []
+    start = time.perf_counter()
+
+    for level, model in enumerate(tiers):
+        tier_start = time.perf_counter()
+        intent = generate_intent(user_input, model=model, cancel_event=cancel_event)
+        score = score_intent(user_input, intent)
+        attempts.append({
+            "model": model,
+            "latency_ms": round((time.perf_counter() - tier_start) * 1000, 1),
+            **score,
+        })
+
+        if best_score is None or score["confidence"] > best_score["confidence"]:
+            best, best_score, best_model = intent, score, model
+        if score["confidence"] >= threshold:
+            break
+        if level + 1 < len(tiers):
+            log.info("Low confidence (%.2f) from %s, escalating", score["confidence"], model)
+
+    # One structured record per decision in LOG_FILE, written by the logging thread
+    log.info("Routed to %s (confidence %.2f)", best_model, best_score["confidence"], extra={
+        "input": user_input,
+        "chosen": best_model,
+        "escalations": len(attempts) - 1,
+        "confidence": best_score["confidence"],
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        "attempts": attempts,
+    })
+    return (best if best_score["valid"] else None), best_score["confidence"]
@@ -0,0 +1,193 @@
+"""
+Inference scheduler for concurrent callers (daemon clients, batch runs).
+
+- Single-flight: identical commands already queued or running share one
+  LLM call instead of each paying for a full prompt.
+- Micro-batching: requests arriving within a short window are dispatched
+  together. With a batch_func (a backend that accepts several prompts at
+  once) they go out as one call; the default Ollama backend has no batch
+  API, so a batch is released as concurrent requests that the server's
+  parallel slots (OLLAMA_NUM_PARALLEL) can batch on its side.
+- A global concurrency limit so a CPU-only box isn't thrashed by more
+  simultaneous generations than it has cores for.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from controller.llm import ask_llm
+
+LLM_CONCURRENCY = int(os.environ.get("ASSISTANT_LLM_CONCURRENCY", "2"))
+BATCH_WINDOW = 0.005  # seconds to wait for more requests to join a batch
+MAX_BATCH = 8
+
+
+class InferenceScheduler:
+    def __init__(self, func=None, max_concurrency: int = LLM_CONCURRENCY, batch_func=None,
+                 batch_window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH):
+        self.func = func or ask_llm
+        self.batch_func = batch_func
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_concurrency = max_concurrency
+
+        self.queue = queue.Queue()
+        self.slots = threading.Semaphore(max_concurrency)
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self.lock = threading.Lock()
+        self.inflight = {}  # normalized command -> Future
+
+        self.waiting = 0
+        self.running = 0
+        self.counts = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0, "batches": 0}
+        self.wait_times = deque(maxlen=1000)
+        self.batch_sizes = deque(maxlen=1000)
+        self.started_at = None
+
+        self.dispatcher = threading.Thread(target=self._dispatch, name="llm-dispatch", daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, user_input: str) -> Future:
+        """Queue a command; the Future resolves to ask_llm's JSON string"""
+        key = " ".join(user_input.lower().split())
+        with self.lock:
+            if self.started_at is None:
+                self.started_at = time.perf_counter()
+
+            future = self.inflight.get(key)
+            if future is not None:
+                self.counts["coalesced"] += 1
+                return future
+
+            future = Future()
+            future.timings = {}
+            self.inflight[key] = future
+            self.counts["submitted"] += 1
+            self.waiting += 1
+
+        self.queue.put((key, user_input, future, time.perf_counter()))
+        return future
+
+    def ask(self, user_input: str, timeout: float = None) -> str:
+        """Blocking submit: drop-in replacement for ask_llm"""
+        return self.submit(user_input).result(timeout)
+
+    def stats(self) -> dict:
+        with self.lock:
+            waits = sorted(self.wait_times)
+            elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+            return {
+                **self.counts,
+                "queue_depth": self.waiting,
+                "running": self.running,
+                "max_concurrency": self.max_concurrency,
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 2) if waits else 0.0,
+                "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else 0.0,
+                "avg_batch": round(sum(self.batch_sizes) / len(self.batch_sizes), 2) if self.batch_sizes else 0.0,
+                "throughput_per_s": round(self.counts["completed"] / elapsed, 3) if elapsed else 0.0,
+            }
+
+    def shutdown(self):
+        self.queue.put(None)
+        self.dispatcher.join()
+        self.pool.shutdown()
+
+    # ================== INTERNALS ==================
+    def _dispatch(self):
+        while True:
+            self.slots.acquire()
+            item = self.queue.get()
+            if item is None:
+                self.slots.release()
+                return
+
+            batch = [item]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    extra = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if extra is None:
+                    self.queue.put(None)  # let the loop see it after this batch
+                    break
+                batch.append(extra)
+
+            with self.lock:
+                self.counts["batches"] += 1
+                self.batch_sizes.append(len(batch))
+
+            if self.batch_func is not None and len(batch) > 1:
+                self.pool.submit(self._run_batch, batch)
+                continue
+
+            for i, entry in enumerate(batch):
+                if i > 0:
+                    self.slots.acquire()
+                self.pool.submit(self._run_one, entry)
+
+    def _started(self, entries):
+        now = time.perf_counter()
+        with self.lock:
+            for _, _, future, queued_at in entries:
+                self.waiting -= 1
+                self.running += 1
+                self.wait_times.append(now - queued_at)
+                future.timings["wait_ms"] = round((now - queued_at) * 1000, 2)
+        return now
+
+    def _finished(self, entry, started, result=None, error=None):
+        key, _, future, _ = entry
+        with self.lock:
+            self.running -= 1
+            self.inflight.pop(key, None)
+            self.counts["failed" if error else "completed"] += 1
+        future.timings["run_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _run_one(self, entry):
+        started = self._started([entry])
+        try:
+            result = self.func(entry[1])
+        except Exception as e:
+            self._finished(entry, started, error=e)
+        else:
+            self._finished(entry, started, result=result)
+        finally:
+            self.slots.release()
+
+    def _run_batch(self, batch):
+        started = self._started(batch)
+        try:
+            results = self.batch_func([entry[1] for entry in batch])
+        except Exception as e:
+            for entry in batch:
+                self._finished(entry, started, error=e)
+        else:
+            for entry, result in zip(batch, results):
+                self._finished(entry, started, result=result)
+        finally:
+            self.slots.release()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(max_concurrency: int = None) -> InferenceScheduler:
+    """Process-wide scheduler so every caller shares one concurrency limit"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = InferenceScheduler(max_concurrency=max_concurrency or LLM_CONCURRENCY)
+        return _scheduler
@@ -0,0 +1,129 @@
+import re
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+from controller.llm import ask_llm
+
+# Words that speech recognition inserts without changing the command
+FILLER_WORDS = {"um", "uh", "er", "ah", "hmm", "please"}
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, drop punctuation and filler words so equivalent transcripts compare equal"""
+    if not text:
+        return ""
+    words = re.findall(r"[\w.\-/:]+", text.lower())
+    words = [w.strip(".") for w in words]
+    return " ".join(w for w in words if w and w not in FILLER_WORDS)
+
+
+def common_prefix(word_lists) -> list:
+    """Leading words all the lists share"""
+    prefix = []
+    for words in zip(*word_lists):
+        if any(w != words[0] for w in words):
+            break
+        prefix.append(words[0])
+    return prefix
+
+
+class SpeculativeIntent:
+    """
+    Start LLM inference on stable partial transcripts while the user is still speaking.
+
+    feed() is called with every partial transcript from the STT stream. The stable
+    prefix is the words the last `stable_hits` (normalized) partials agree on; once
+    it has `min_words` words, inference starts on it in the background. Only a
+    change in that prefix cancels the running inference and restarts it, so a
+    flickering last word doesn't. commit() is called with the final transcript
+    and returns the speculated intent if it matches, otherwise None.
+    """
+
+    def __init__(self, infer: Callable = None, min_words: int = 3, stable_hits: int = 2):
+        self.infer = infer or ask_llm
+        self.min_words = min_words
+        self.stable_hits = stable_hits
+
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=stable_hits)  # word lists of the last partials
+        self._text = None          # normalized text being speculated on
+        self._thread = None
+        self._cancel = None
+        self._result = None
+        self.stats = {"started": 0, "cancelled": 0, "committed": 0, "missed": 0}
+
+    def feed(self, partial: str):
+        """Handle a partial transcript from the STT stream"""
+        text = normalize_transcript(partial)
+
+        with self._lock:
+            self._recent.append(text.split())
+            if len(self._recent) < self.stable_hits:
+                return
+            stable = common_prefix(self._recent)
+            if len(stable) < self.min_words or " ".join(stable) == self._text:
+                return
+
+            stable_text = " ".join(stable)
+            self._cancel_locked()
+            # The whole partial when it's stable, otherwise just the agreed words
+            self._start_locked(partial if stable_text == text else stable_text, stable_text)
+
+    def commit(self, final: str, timeout: float = None) -> Optional[str]:
+        """Return the speculated intent if it was computed for this final transcript"""
+        text = normalize_transcript(final)
+
+        with self._lock:
+            thread = self._thread
+            matches = thread is not None and text == self._text
+            if not matches:
+                self._cancel_locked()
+                self.stats["missed"] += 1
+                return None
+
+        thread.join(timeout)
+
+        with self._lock:
+            if thread.is_alive() or self._result is None:
+                self._cancel_locked()
+                self.stats["missed"] += 1
+                return None
+
+            result = self._result
+            self._reset_locked()
+            self.stats["committed"] += 1
+            return result
+
+    def cancel(self):
+        """Cancel any running speculation"""
+        with self._lock:
+            self._cancel_locked()
+
+    def _start_locked(self, partial: str, text: str):
+        cancel = threading.Event()
+        self._text = text
+        self._cancel = cancel
+        self._result = None
+
+        def run():
+            result = self.infer(partial, cancel_event=cancel)
+            with self._lock:
+                if not cancel.is_set() and self._cancel is cancel:
+                    self._result = result
+
+        self._thread = threading.Thread(target=run, name="speculative-intent", daemon=True)
+        self._thread.start()
+        self.stats["started"] += 1
+
+    def _cancel_locked(self):
+        if self._cancel is not None and self._result is None:
+            self._cancel.set()
+            self.stats["cancelled"] += 1
+        self._reset_locked()
+
+    def _reset_locked(self):
+        self._text = None
+        self._thread = None
+        self._cancel = None
+        self._result = None
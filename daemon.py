@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Assistant daemon - keep models warm and serve commands over a local JSON API
+
+Loads the assistant once (LLM warmed in Ollama, Whisper model, TTS cache,
+browser driver) and serves process_command to local clients over HTTP on
+localhost or over a Unix socket. Requests are handled concurrently: LLM
+analysis goes through the shared inference scheduler (identical in-flight
+commands coalesced, global concurrency limit), execution of intents is
+serialized.
+
+Usage:
+    python daemon.py                         # http://127.0.0.1:8765
+    python daemon.py --unix /tmp/assistant.sock
+    python assistant_client.py "create notes.txt in ab2"
+
+API:
+    GET  /health   -> {"ok": true, "uptime_s": ..., "requests": ..., "scheduler": {...}, "stages": {...}}
+    POST /command  {"command": "...", "execute": true}
+                   -> {"ok": true, "success": bool, "intent": {...}, "messages": [...], "elapsed_ms": ...}
+
+POST needs Content-Type: application/json and the per-install token in the
+X-Assistant-Token header, so a web page can't make the browser submit a
+command (no CORS preflight for text/plain forms). The token is created once
+(mode 0600) in ~/.assistant_daemon.token, or next to the Unix socket as
+<socket>.token; assistant_client.py reads it from the same place.
+"""
+
+import argparse
+import hmac
+import json
+import os
+import secrets
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append('.')
+
+import tracing
+from log_setup import get_logger, setup as setup_logging
+
+log = get_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+TOKEN_HEADER = "X-Assistant-Token"
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".assistant_daemon.token")
+
+
+def token_path(unix_path: str = None) -> str:
+    return unix_path + ".token" if unix_path else DEFAULT_TOKEN_FILE
+
+
+def load_token(path: str) -> str:
+    """The install's client token, created (readable by this user only) on first start"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        os.chmod(path, 0o600)
+        with open(path, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+        if token:
+            return token
+        fd = os.open(path, os.O_WRONLY | os.O_TRUNC)
+    token = secrets.token_urlsafe(32)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+
+class AssistantService:
+    """One warm assistant shared by all daemon clients"""
+
+    def __init__(self, voice: bool = False, web: bool = True):
+        import run
+        from controller.scheduler import get_scheduler
+
+        self.scheduler = get_scheduler()
+        self.assistant = run.AdvancedAssistant({
+            "VOICE_OUTPUT": voice,
+            "INTERACTIVE": False,
+            "WAKE_WORD_ENABLED": False,
+            "ENABLE_WEB": web and run.WEB_ENABLED,
+        })
+        self.started = time.time()
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    def warm_up(self):
+        """Load heavy components in the background so the first command is fast"""
+        from controller.llm import warm_up as warm_llm
+        from voice.stt import get_model
+
+        tasks = [("LLM", warm_llm), ("Whisper", get_model)]
+        if self.assistant.web:
+            tasks.append(("Browser", self.assistant.web.init_driver))
+
+        def run(name, func):
+            start = time.time()
+            try:
+                if func() is not False:
+                    log.info("%s warm (%.1fs)", name, time.time() - start)
+            except Exception as e:
+                log.warning("%s warm-up failed: %s", name, e)
+
+        for name, func in tasks:
+            threading.Thread(target=run, args=(name, func), name=f"warm-{name}", daemon=True).start()
+
+    def health(self) -> dict:
+        return {
+            "ok": True,
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "scheduler": self.scheduler.stats(),
+            "stages": tracing.tracer.stats(),
+        }
+
+    def command(self, payload: dict) -> dict:
+        command = (payload.get("command") or "").strip()
+        if not command:
+            return {"ok": False, "error": "missing 'command'"}
+
+        with self._count_lock:
+            self.requests += 1
+
+        start = time.perf_counter()
+        json_response = self.scheduler.ask(command)  # coalesced/limited across clients
+        try:
+            intent = json.loads(json_response)
+        except (TypeError, json.JSONDecodeError):
+            intent = None
+
+        result = {"ok": True, "command": command, "intent": intent}
+        if payload.get("execute", True):
+            with self.assistant.command_lock, self.assistant.collect_messages() as messages:
+                result["success"] = self.assistant.process_command(command, json_response)
+            result["messages"] = messages
+
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    def close(self):
+        if self.assistant.web:
+            self.assistant.web.close()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    service = None  # set by serve()
+    token = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, self.service.health())
+        else:
+            self._send(404, {"ok": False, "error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/command":
+            self._send(404, {"ok": False, "error": "not found"})
+            return
+
+        if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.token):
+            self._send(401, {"ok": False, "error": f"missing or wrong {TOKEN_HEADER}"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._send(415, {"ok": False, "error": "Content-Type must be application/json"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, {"ok": False, "error": "request too large"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("body must be a JSON object")
+        except ValueError as e:
+            self._send(400, {"ok": False, "error": f"invalid JSON: {e}"})
+            return
+
+        try:
+            result = self.service.command(payload)
+            self._send(200 if result.get("ok") else 400, result)
+        except Exception as e:
+            self._send(500, {"ok": False, "error": str(e)})
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        log.info("%s %s", self.address_string(), format % args)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_path: str = None,
+          voice: bool = False, web: bool = True):
+    service = AssistantService(voice=voice, web=web)
+    RequestHandler.service = service
+    RequestHandler.token = load_token(token_path(unix_path))
+
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        # Created owner-only: a chmod after bind leaves a window where others can connect
+        umask = os.umask(0o077)
+        try:
+            server = ThreadingUnixHTTPServer(unix_path, RequestHandler)
+        finally:
+            os.umask(umask)
+        print(f"🚀 Assistant daemon listening on unix:{unix_path}")
+    else:
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+        print(f"🚀 Assistant daemon listening on http://{host}:{port}")
+    service.warm_up()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down daemon...")
+    finally:
+        server.server_close()
+        service.close()
+        if unix_path and os.path.exists(unix_path):
+            os.unlink(unix_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the assistant as a local daemon")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Serve on a Unix socket instead of TCP")
+    parser.add_argument("--voice", action="store_true", help="Speak responses on this machine")
+    parser.add_argument("--no-web", action="store_true", help="Don't start the browser")
+    args = parser.parse_args()
+
+    setup_logging()
+    serve(args.host, args.port, args.unix, voice=args.voice, web=not args.no_web)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""
+Application index for open_app
+
+Scans the folders in PATH, and on Linux the XDG .desktop entries (on Windows
+the Start Menu shortcuts), once, then answers "open <name>" from memory. The
+index is rebuilt when one of the scanned folders changes (its mtime moves).
+
+Names resolve through, in order: aliases learned from earlier launches
+(memory/app_aliases.json), APP_ALIASES, the name itself, Linux equivalents
+of Windows names (cmd -> x-terminal-emulator), a whole word of an app's name ("chrome" -> "Google Chrome") and finally difflib. Launching runs
+the program directly (argv list, no shell); Windows shortcuts and names the
+index doesn't know go to os.startfile, which is what "start" did.
+
+    python -m executors.app_index firefox     # show what a name resolves to
+    python -m executors.app_index --list
+"""
+
+import argparse
+import difflib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+sys.path.append('.')
+
+from executors.atomic_write import atomic_write
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
+ALIASES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "memory", "app_aliases.json")
+FUZZY_CUTOFF = 0.8
+WINDOWS = sys.platform.startswith("win")
+
+# Linux terminals able to run Terminal=true entries, with their "run this" flag
+TERMINALS = [("x-terminal-emulator", "-e"), ("gnome-terminal", "--"), ("konsole", "-e"), ("xterm", "-e")]
+
+# APP_ALIASES targets are Windows programs; their nearest Linux equivalents
+LINUX_EQUIVALENTS = {
+    "cmd": "x-terminal-emulator",
+    "terminal": "x-terminal-emulator",
+    "notepad": "text editor",
+    "calc": "calculator",
+    "explorer": "files",
+}
+
+# Known install locations for apps that often aren't on PATH
+WINDOWS_PATHS = {
+    "chrome": [
+        "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+        "C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe"
+    ],
+    "msedge": ["C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe"],
+}
+
+
+@dataclass
+class App:
+    name: str  # display name
+    argv: Optional[list]  # command to exec; None = open path with os.startfile
+    path: str  # executable, .desktop or shortcut file
+    source: str  # "path", "desktop", "shortcut" or "known"
+
+
+def _mtime(folder: str):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _desktop_dirs() -> list:
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(os.pathsep)
+    extra = ["/var/lib/flatpak/exports/share", os.path.expanduser("~/.local/share/flatpak/exports/share"),
+             "/var/lib/snapd/desktop"]
+    return [os.path.join(d, "applications") for d in [data_home, *data_dirs, *extra] if d]
+
+
+def _shortcut_dirs() -> list:
+    roots = [os.environ.get("ProgramData"), os.environ.get("APPDATA")]
+    return [os.path.join(r, "Microsoft", "Windows", "Start Menu", "Programs") for r in roots if r]
+
+
+def parse_desktop_entry(path: str) -> Optional[dict]:
+    """Keys of the [Desktop Entry] group, or None if it isn't a launchable application"""
+    fields, in_group = {}, False
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_group:
+                        break
+                    in_group = line == "[Desktop Entry]"
+                elif in_group and "=" in line and not line.startswith("#"):
+                    key, value = line.split("=", 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    if fields.get("Type", "Application") != "Application" or not fields.get("Exec"):
+        return None
+    if fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+        return None
+    return fields
+
+
+def exec_argv(exec_line: str) -> list:
+    """argv from a .desktop Exec value, with the %f/%u/... field codes dropped"""
+    try:
+        words = shlex.split(exec_line)
+    except ValueError:
+        words = exec_line.split()
+    argv = []
+    for word in words:
+        if len(word) == 2 and word[0] == "%" and word != "%%":
+            continue
+        argv.append(word.replace("%%", "%"))
+    return argv
+
+
+def normalize(name: str) -> str:
+    name = " ".join(name.lower().replace("_", " ").split())
+    for prefix in ("the ",):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    for suffix in (" app", " application", ".exe"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+class AppIndex:
+    def __init__(self, aliases: dict = None, aliases_file: str = ALIASES_FILE):
+        from executors.os_exec import APP_ALIASES  # os_exec imports this module lazily too
+        self.aliases = APP_ALIASES if aliases is None else aliases
+        self.aliases_file = aliases_file
+        self.learned = self._load_learned()
+        self.lock = threading.RLock()
+        self.apps = {}  # normalized name -> App
+        self.words = {}  # word of a multi-word app name -> names containing it
+        self._path = None
+        self._signature = ()  # ((folder, mtime_ns), ...) as of the last scan
+        self.counts = {"scans": 0, "hits": 0, "misses": 0}
+
+    # ================== SCANNING ==================
+    def changed(self) -> bool:
+        """True if PATH or any scanned folder (including ones missing then) changed since the scan"""
+        if os.environ.get("PATH", "") != self._path:
+            return True
+        return any(_mtime(folder) != mtime for folder, mtime in self._signature)
+
+    def refresh(self, force: bool = False):
+        """Rebuild the index if PATH or an app folder changed (a few stat calls when nothing did)"""
+        with self.lock:
+            if force or self._path is None or self.changed():
+                self._scan()
+
+    def _scan(self):
+        apps, scanned = {}, []  # scanned: (folder, mtime_ns) taken just before listing it
+        self._path = os.environ.get("PATH", "")
+        path_dirs = [os.path.abspath(d) for d in self._path.split(os.pathsep) if d]
+        pathext = [e.lower() for e in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD;.COM").split(";") if e]
+
+        # PATH order matters: the first folder with a name wins, as in a shell
+        for folder in dict.fromkeys(path_dirs):
+            scanned.append((folder, _mtime(folder)))
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                name = entry.name
+                if WINDOWS:
+                    stem, ext = os.path.splitext(name)
+                    if ext.lower() not in pathext:
+                        continue
+                    name = stem
+                elif not os.access(entry.path, os.X_OK):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                apps.setdefault(normalize(name), App(name, [entry.path], entry.path, "path"))
+
+        # Desktop entries / shortcuts override bare executables: they carry the app's real name and arguments
+        found = self._scan_shortcuts(scanned) if WINDOWS else self._scan_desktop(scanned, apps)
+        for key, app in found.items():
+            apps[key] = app
+
+        words = {}
+        for key in apps:
+            if " " in key:
+                for word in key.split():
+                    words.setdefault(word, []).append(key)
+        self.apps, self.words = apps, words
+        self._signature = tuple(scanned)
+        self.counts["scans"] += 1
+
+    def _scan_desktop(self, scanned: list, executables: dict) -> dict:
+        found = {}
+        terminal = next(([executables[t].path, flag] for t, flag in TERMINALS if t in executables), None)
+        for top in _desktop_dirs():
+            if not os.path.isdir(top):
+                scanned.append((top, None))  # noticed if it appears later
+                continue
+            for root, dirs, files in os.walk(top):
+                scanned.append((root, _mtime(root)))
+                for file_name in sorted(files):
+                    if not file_name.endswith(".desktop"):
+                        continue
+                    path = os.path.join(root, file_name)
+                    fields = parse_desktop_entry(path)
+                    if fields is None:
+                        continue
+                    argv = exec_argv(fields["Exec"])
+                    if not argv:
+                        continue
+                    if fields.get("Terminal") == "true":
+                        if terminal is None:
+                            continue
+                        argv = terminal + argv
+                    app = App(fields.get("Name", file_name[:-8]), argv, path, "desktop")
+                    keys = [fields.get("Name"), file_name[:-8].rsplit(".", 1)[-1], fields.get("GenericName")]
+                    for key in filter(None, keys):
+                        found.setdefault(normalize(key), app)  # the first folder wins (user's over system)
+        return found
+
+    def _scan_shortcuts(self, scanned: list) -> dict:
+        found = {}
+        for top in _shortcut_dirs():
+            if not os.path.isdir(top):
+                scanned.append((top, None))
+                continue
+            for root, dirs, files in os.walk(top):
+                scanned.append((root, _mtime(root)))
+                for file_name in files:
+                    if file_name.lower().endswith((".lnk", ".url")):
+                        name = os.path.splitext(file_name)[0]
+                        found.setdefault(normalize(name), App(name, None, os.path.join(root, file_name), "shortcut"))
+        return found
+
+    # ================== RESOLVING ==================
+    def resolve(self, name: str) -> Optional[App]:
+        """The app a spoken/typed name refers to, or None"""
+        self.refresh()
+        query = normalize(name)
+        with self.lock:
+            app = self._exact(query) or self._partial(query)
+            self.counts["hits" if app else "misses"] += 1
+            return app
+
+    def _exact(self, query: str) -> Optional[App]:
+        alias = self.aliases.get(query)
+        keys = [self.learned.get(query), alias, query]
+        if not WINDOWS:
+            keys += [LINUX_EQUIVALENTS.get(alias), LINUX_EQUIVALENTS.get(query)]
+        for key in keys:
+            if not key:
+                continue
+            key = normalize(key)
+            if key in self.apps:
+                return self.apps[key]
+            if WINDOWS:
+                for path in WINDOWS_PATHS.get(key, []):
+                    if os.path.exists(path):
+                        return App(key, [path], path, "known")
+        return None
+
+    def _partial(self, query: str) -> Optional[App]:
+        # "chrome" -> "google chrome": shortest app name having all the query's words
+        words = query.split()
+        candidates = set(self.words.get(words[0], [])) if words else set()
+        for word in words[1:]:
+            candidates &= set(self.words.get(word, []))
+        if candidates:
+            return self.apps[min(candidates, key=lambda k: (len(k), k))]
+        close = difflib.get_close_matches(query, list(self.apps), n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return self.apps[close[0]]
+        # "crome" -> "chrome", a word of "google chrome"
+        close = difflib.get_close_matches(query, list(self.words), n=1, cutoff=FUZZY_CUTOFF)
+        return self.apps[min(self.words[close[0]], key=lambda k: (len(k), k))] if close else None
+
+    # ================== LEARNED ALIASES ==================
+    def _load_learned(self) -> dict:
+        try:
+            with open(self.aliases_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def learn(self, name: str, app: App):
+        """Remember that name meant app (after it was resolved by a guess and launched)"""
+        query, key = normalize(name), normalize(app.name)
+        if self.learned.get(query) == key or query == key or key not in self.apps:
+            return
+        with self.lock:
+            self.learned[query] = key
+            try:
+                atomic_write(self.aliases_file, json.dumps(self.learned, indent=2, sort_keys=True), durability="none")
+            except OSError as e:
+                log.warning("Could not save app aliases: %s", e)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"apps": len(self.apps), "folders": len(self._signature),
+                    "learned": len(self.learned), **self.counts}
+
+
+# ================== LAUNCHING ==================
+def launch(app: App) -> Optional[subprocess.Popen]:
+    """Start app without a shell, detached from our console; the Popen, or None for os.startfile"""
+    if app.argv is None:
+        os.startfile(app.path)
+        return None
+    if WINDOWS:
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        return subprocess.Popen(app.argv, creationflags=flags, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+    return subprocess.Popen(app.argv, start_new_session=True, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> AppIndex:
+    """The shared index (scanned on first use)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AppIndex()
+            _index.refresh(force=True)
+        return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how app names resolve")
+    parser.add_argument("names", nargs="*")
+    parser.add_argument("--list", action="store_true", help="List every indexed app")
+    args = parser.parse_args()
+
+    index = get_index()
+    if args.list:
+        for key, app in sorted(index.apps.items()):
+            print(f"{key:32} {app.source:9} {' '.join(app.argv or [app.path])}")
+    for name in args.names:
+        app = index.resolve(name)
+        print(f"{name!r} -> " + (f"{app.name} ({app.source}): {' '.join(app.argv or [app.path])}" if app else "not found"))
+    print(f"📦 {index.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Atomic file replacement with configurable durability
+
+Data goes to a hidden temp file in the target's folder, then os.replace
+swaps it in, so a crash leaves either the old file or the new one and
+never a truncated mix. How much is flushed to disk before returning is
+the durability mode:
+
+- none:  rename only; survives a process crash, not a power cut
+- fsync: fsync the temp file before the rename and the folder after it
+- group: writers hand their temp files to a committer thread that waits
+         a few ms for others to arrive, flushes the whole batch with one
+         syncfs (Linux; one fsync per file elsewhere), renames them all and
+         fsyncs each folder once. Each writer still blocks until its own
+         file is durable, so this only pays off with concurrent writers.
+
+The default mode is WRITE_DURABILITY and the batch window GROUP_COMMIT_MS
+in config.py.
+"""
+
+import ctypes
+import itertools
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+from config import DURABILITY_MODES, get_config
+
+MAX_GROUP = 256
+
+_counter = itertools.count()
+
+
+def _load_syncfs():
+    """libc syncfs(fd) on Linux, else None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):
+        return None
+
+
+_syncfs = _load_syncfs()
+
+
+def _temp_path(path: str) -> str:
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f".{name}.{os.getpid()}.{next(_counter)}.tmp")
+
+
+def _fsync_dir(folder: str):
+    """Make a rename in folder durable (no-op on Windows, which can't open folders)"""
+    if os.name == "nt":
+        return
+    fd = os.open(folder or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_temp(path: str, data: bytes, sync: bool) -> str:
+    """Write data to a fresh temp file next to path (keeping path's permissions); returns its name"""
+    tmp = _temp_path(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)
+    fd = os.open(tmp, flags, 0o644)
+    try:
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass  # new file: keep the default mode
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if sync:
+            os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        _discard(tmp)
+        raise
+    os.close(fd)
+    return tmp
+
+
+def _discard(tmp: str):
+    try:
+        os.remove(tmp)
+    except OSError:
+        pass
+
+
+def atomic_write(path: str, data, durability: str = None):
+    """Replace path with data (str is UTF-8 encoded); raises OSError on failure"""
+    durability = durability or get_config().WRITE_DURABILITY
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f"Unknown durability mode: {durability} (use {', '.join(DURABILITY_MODES)})")
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    tmp = _write_temp(path, data, sync=durability == "fsync")
+    if durability == "group":
+        get_committer().submit(tmp, path).result()
+        return
+
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        _discard(tmp)
+        raise
+    if durability == "fsync":
+        _fsync_dir(os.path.dirname(path))
+
+
+def atomic_write_many(items, durability: str = None) -> dict:
+    """
+    atomic_write for many (path, data) pairs; returns {path: OSError} for the ones that failed.
+
+    fsync and group both hand every temp file to the committer before waiting,
+    so a bulk write costs a few syncfs calls instead of one fsync per file.
+    """
+    durability = durability or get_config().WRITE_DURABILITY
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f"Unknown durability mode: {durability} (use {', '.join(DURABILITY_MODES)})")
+
+    failed, futures = {}, []
+    for path, data in items:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        try:
+            tmp = _write_temp(path, data, sync=False)
+        except OSError as e:
+            failed[path] = e
+            continue
+        if durability == "none":
+            try:
+                os.replace(tmp, path)
+            except OSError as e:
+                _discard(tmp)
+                failed[path] = e
+        else:
+            futures.append((path, get_committer().submit(tmp, path)))
+
+    for path, future in futures:
+        try:
+            future.result()
+        except OSError as e:
+            failed[path] = e
+    return failed
+
+
+# ================== GROUP COMMIT ==================
+class GroupCommitter:
+    def __init__(self, window: float = None, max_batch: int = MAX_GROUP):
+        self.window = get_config().GROUP_COMMIT_MS / 1000 if window is None else window  # seconds a batch stays open
+        self.max_batch = max_batch
+        self.pending = []  # (temp path, final path, Future)
+        self.cond = threading.Condition()
+        self.thread = None
+        self.counts = {"files": 0, "batches": 0, "syncs": 0, "failed": 0}
+
+    def submit(self, tmp: str, path: str) -> Future:
+        """Queue an unsynced temp file; the Future resolves once it is durable at path"""
+        future = Future()
+        with self.cond:
+            self.pending.append((tmp, path, future))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+        return future
+
+    def stats(self) -> dict:
+        with self.cond:
+            counts = dict(self.counts)
+        counts["avg_batch"] = round(counts["files"] / counts["batches"], 2) if counts["batches"] else 0.0
+        return counts
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                deadline = time.monotonic() + self.window
+                while len(self.pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+            self._commit(batch)
+
+    def _commit(self, batch: list):
+        failed, syncs = {}, 0
+        try:
+            syncs = self._sync([tmp for tmp, _, _ in batch])
+        except OSError as e:
+            failed = {tmp: e for tmp, _, _ in batch}
+
+        folders = set()
+        for tmp, path, future in batch:
+            if tmp in failed:
+                continue
+            try:
+                os.replace(tmp, path)
+                folders.add(os.path.dirname(path))
+            except OSError as e:
+                failed[tmp] = e
+
+        # Folder fsync errors make every rename in that folder uncertain
+        for folder in folders:
+            try:
+                _fsync_dir(folder)
+            except OSError as e:
+                failed.update({tmp: e for tmp, path, _ in batch if os.path.dirname(path) == folder})
+
+        for tmp, path, future in batch:
+            if tmp in failed:
+                _discard(tmp)
+                future.set_exception(failed[tmp])
+            else:
+                future.set_result(path)
+
+        with self.cond:
+            self.counts["files"] += len(batch)
+            self.counts["batches"] += 1
+            self.counts["syncs"] += syncs
+            self.counts["failed"] += len(failed)
+
+    def _sync(self, temps: list) -> int:
+        """Flush the temp files' data: one syncfs per filesystem, or one fsync each; returns the call count"""
+        if _syncfs is not None:
+            devices = {}
+            for tmp in temps:
+                devices.setdefault(os.stat(tmp).st_dev, tmp)
+            for tmp in devices.values():
+                fd = os.open(tmp, os.O_RDONLY)
+                try:
+                    if _syncfs(fd) != 0:
+                        error = ctypes.get_errno()
+                        raise OSError(error, os.strerror(error), tmp)
+                finally:
+                    os.close(fd)
+            return len(devices)
+
+        for tmp in temps:
+            fd = os.open(tmp, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return len(temps)
+
+
+_committer = None
+_committer_lock = threading.Lock()
+
+
+def get_committer() -> GroupCommitter:
+    """Shared committer used by the 'group' durability mode"""
+    global _committer
+    with _committer_lock:
+        if _committer is None:
+            _committer = GroupCommitter()
+        return _committer
@@ -0,0 +1,200 @@
+"""
+Content-addressed blob store for captured text (web pages, clipboard, searches)
+
+Blobs live in AutoBox/.blobs/<first 2 hex>/<sha256>.<codec>, compressed with
+zstd when the zstandard package is installed, zlib otherwise (tiny blobs are
+stored raw). Saving content that is already stored costs one stat and no
+write. The visible files in AB1 are one-line pointers ("@blob sha256:<hex>
+<size>") that read_file, open_view and the search index resolve to the
+content. Deleting or overwriting a pointer file through file_exec removes
+its blob once no other pointer refers to it; --gc sweeps anything left over
+(e.g. pointers deleted by other programs).
+
+    python -m executors.blob_store --stats
+    python -m executors.blob_store --gc      # delete blobs no pointer refers to
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import zlib
+
+sys.path.append('.')
+
+from executors.atomic_write import atomic_write
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOB_DIR_NAME = ".blobs"
+CODEC = "zst" if zstandard is not None else "z"
+CODECS = ("zst", "z", "raw")  # lookup order for existing blobs
+RAW_BELOW = 256  # bytes; compressing less than this isn't worth it
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+POINTER_PREFIX = b"@blob sha256:"
+POINTER_MAX_BYTES = 128  # pointer files are always smaller than this
+POINTER_MIN_BYTES = len(POINTER_PREFIX) + 64 + 2  # digest, space, one size digit
+POINTER_RE = re.compile(rb"@blob sha256:([0-9a-f]{64}) (\d+)\n?")
+
+
+def pointer_bytes(digest: str, size: int) -> bytes:
+    return POINTER_PREFIX + f"{digest} {size}\n".encode("ascii")
+
+
+def parse_pointer(data: bytes):
+    """(digest, size) if data is a pointer file's content, else None"""
+    if len(data) > POINTER_MAX_BYTES or not data.startswith(POINTER_PREFIX):
+        return None
+    match = POINTER_RE.fullmatch(data)
+    return (match.group(1).decode("ascii"), int(match.group(2))) if match else None
+
+
+def read_pointer(path: str):
+    """(digest, size) if the file at path is a pointer, else None (one stat, one small read)"""
+    try:
+        if not POINTER_MIN_BYTES <= os.path.getsize(path) <= POINTER_MAX_BYTES:
+            return None  # most files are ruled out without opening them
+        with open(path, "rb") as f:
+            return parse_pointer(f.read(POINTER_MAX_BYTES + 1))
+    except OSError:
+        return None
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == "z":
+        return zlib.compress(data, ZLIB_LEVEL)
+    return data
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise OSError("Blob is zstd-compressed but zstandard isn't installed (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "z":
+        return zlib.decompress(data)
+    return data
+
+
+class BlobStore:
+    def __init__(self, root: str, codec: str = CODEC):
+        self.root = root
+        self.codec = codec
+
+    def _path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.{codec}")
+
+    def find(self, digest: str):
+        """Path of the stored blob, or None"""
+        for codec in CODECS:
+            path = self._path(digest, codec)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, data) -> tuple:
+        """Store data (str is UTF-8 encoded); returns (digest, written) - written is False for a duplicate"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if self.find(digest):
+            return digest, False
+
+        codec = "raw" if len(data) < RAW_BELOW else self.codec
+        path = self._path(digest, codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, _compress(data, codec))
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        """Stored content; OSError if missing or corrupted"""
+        path = self.find(digest)
+        if path is None:
+            raise FileNotFoundError(f"Blob not found: {digest}")
+        with open(path, "rb") as f:
+            data = _decompress(f.read(), path.rsplit(".", 1)[1])
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise OSError(f"Blob {digest} is corrupted")
+        return data
+
+    def remove(self, digest: str) -> bool:
+        """Delete one blob; False if it wasn't stored"""
+        path = self.find(digest)
+        if path is None:
+            return False
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def digests(self) -> dict:
+        """digest -> stored path for every blob"""
+        found = {}
+        if not os.path.isdir(self.root):
+            return found
+        for shard in os.scandir(self.root):
+            if shard.is_dir(follow_symlinks=False):
+                for entry in os.scandir(shard.path):
+                    digest, _, codec = entry.name.partition(".")
+                    if codec in CODECS and len(digest) == 64:
+                        found[digest] = entry.path
+        return found
+
+    def gc(self, referenced: set) -> int:
+        """Delete blobs whose digest isn't in referenced; returns how many went"""
+        removed = 0
+        for digest, path in self.digests().items():
+            if digest not in referenced:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+def pointers_under(top: str) -> dict:
+    """pointer path -> digest for every pointer file below top (blob folder excluded)"""
+    found = {}
+    for root, dirs, files in os.walk(top):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            path = os.path.join(root, name)
+            pointer = read_pointer(path)
+            if pointer:
+                found[path] = pointer[0]
+    return found
+
+
+def main():
+    from executors import file_exec
+
+    parser = argparse.ArgumentParser(description="AutoBox blob store maintenance")
+    parser.add_argument("--stats", action="store_true")
+    parser.add_argument("--gc", action="store_true", help="Delete blobs that no pointer file refers to")
+    args = parser.parse_args()
+
+    store = file_exec.blob_store()
+    pointers = pointers_under(file_exec.AUTOBOX_DIR)
+    if args.gc:
+        removed = store.gc(set(pointers.values()))
+        print(f"🧹 Removed {removed} unreferenced blob(s)")
+    if args.stats or not args.gc:
+        blobs = store.digests()
+        stored = sum(os.path.getsize(p) for p in blobs.values())
+        print(f"📦 {len(blobs)} blob(s), {stored / 1024:.1f} KB on disk, {len(pointers)} pointer file(s), "
+              f"codec {store.codec}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
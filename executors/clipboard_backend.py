@@ -0,0 +1,387 @@
+"""
+Clipboard backends used by ClipboardExecutor
+
+A backend has copy(text), paste() -> str and clear(). change_token() returns a
+number that changes whenever the clipboard does, or None if the platform
+can't tell; the monitor then compares content hashes instead.
+
+pyperclip starts xclip/xsel (or pbcopy/pbpaste) for every call on Linux and
+macOS, tens of milliseconds each. The native backends avoid that:
+
+    win32    user32 calls through ctypes; sequence number as change token
+    macos    NSPasteboard through pyobjc, if installed; changeCount as token
+    x11      a Tk window on its own thread owns/reads the X selection in
+             process (what we copy is lost on exit unless a clipboard
+             manager takes it over, as with any X program)
+    wayland  one long-running "wl-paste --watch" tells us about changes, so
+             paste() only starts wl-paste after something was copied
+    pyperclip  last resort
+
+CLIPBOARD_BACKEND (config, or ASSISTANT_CLIPBOARD) picks one by name ("fake"
+is in memory, for tests and headless runs); "auto" takes the first that
+works here.
+"""
+
+import atexit
+import ctypes
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+CALL_TIMEOUT = 2.0  # seconds to wait for the X11 thread or wl-paste
+
+
+class ClipboardUnavailable(ImportError):
+    """The backend can't work on this machine (missing library, display or tool)"""
+
+
+class FakeClipboard:
+    """In-memory clipboard; other programs' copies are simulated with copy()"""
+
+    name = "fake"
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def copy(self, text: str):
+        with self.lock:
+            self.text = str(text)
+            self.sequence += 1
+
+    def paste(self) -> str:
+        with self.lock:
+            return self.text
+
+    def clear(self):
+        self.copy("")
+
+    def change_token(self):
+        return self.sequence
+
+
+# ================== WINDOWS ==================
+class Win32Clipboard:
+    """user32/kernel32 clipboard calls through ctypes"""
+
+    name = "win32"
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+
+    def __init__(self):
+        if sys.platform != "win32":
+            raise ClipboardUnavailable("the win32 clipboard only exists on Windows")
+        from ctypes import wintypes
+
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        signatures = [
+            (user32.OpenClipboard, [wintypes.HWND], wintypes.BOOL),
+            (user32.CloseClipboard, [], wintypes.BOOL),
+            (user32.EmptyClipboard, [], wintypes.BOOL),
+            (user32.GetClipboardData, [wintypes.UINT], wintypes.HANDLE),
+            (user32.SetClipboardData, [wintypes.UINT, wintypes.HANDLE], wintypes.HANDLE),
+            (user32.GetClipboardSequenceNumber, [], wintypes.DWORD),
+            (kernel32.GlobalAlloc, [wintypes.UINT, ctypes.c_size_t], wintypes.HGLOBAL),
+            (kernel32.GlobalLock, [wintypes.HGLOBAL], wintypes.LPVOID),
+            (kernel32.GlobalUnlock, [wintypes.HGLOBAL], wintypes.BOOL),
+            (kernel32.GlobalFree, [wintypes.HGLOBAL], wintypes.HGLOBAL),
+        ]
+        for func, argtypes, restype in signatures:
+            func.argtypes, func.restype = argtypes, restype
+        self.user32, self.kernel32 = user32, kernel32
+        self.lock = threading.Lock()
+
+    def _open(self):
+        # Another program may be holding the clipboard for a moment
+        for _ in range(20):
+            if self.user32.OpenClipboard(None):
+                return
+            time.sleep(0.005)
+        raise OSError("Clipboard is busy (held by another program)")
+
+    def copy(self, text: str):
+        data = (str(text) + "\0").encode("utf-16-le")
+        with self.lock:
+            self._open()
+            try:
+                self.user32.EmptyClipboard()
+                handle = self.kernel32.GlobalAlloc(self.GMEM_MOVEABLE, len(data))
+                if not handle:
+                    raise ctypes.WinError(ctypes.get_last_error())
+                ctypes.memmove(self.kernel32.GlobalLock(handle), data, len(data))
+                self.kernel32.GlobalUnlock(handle)
+                if not self.user32.SetClipboardData(self.CF_UNICODETEXT, handle):
+                    self.kernel32.GlobalFree(handle)  # still ours only if the clipboard refused it
+                    raise ctypes.WinError(ctypes.get_last_error())
+            finally:
+                self.user32.CloseClipboard()
+
+    def paste(self) -> str:
+        with self.lock:
+            self._open()
+            try:
+                handle = self.user32.GetClipboardData(self.CF_UNICODETEXT)
+                if not handle:
+                    return ""
+                pointer = self.kernel32.GlobalLock(handle)
+                try:
+                    return ctypes.wstring_at(pointer) if pointer else ""
+                finally:
+                    self.kernel32.GlobalUnlock(handle)
+            finally:
+                self.user32.CloseClipboard()
+
+    def clear(self):
+        with self.lock:
+            self._open()
+            try:
+                self.user32.EmptyClipboard()
+            finally:
+                self.user32.CloseClipboard()
+
+    def change_token(self):
+        return self.user32.GetClipboardSequenceNumber()
+
+
+# ================== MACOS ==================
+class MacPasteboard:
+    """The general NSPasteboard through pyobjc"""
+
+    name = "macos"
+
+    def __init__(self):
+        if sys.platform != "darwin":
+            raise ClipboardUnavailable("NSPasteboard only exists on macOS")
+        try:
+            from AppKit import NSPasteboard, NSPasteboardTypeString
+        except ImportError as e:
+            raise ClipboardUnavailable("pyobjc not installed (pip install pyobjc-framework-Cocoa)") from e
+        self.board = NSPasteboard.generalPasteboard()
+        self.type = NSPasteboardTypeString
+
+    def copy(self, text: str):
+        self.board.clearContents()
+        self.board.setString_forType_(str(text), self.type)
+
+    def paste(self) -> str:
+        return self.board.stringForType_(self.type) or ""
+
+    def clear(self):
+        self.board.clearContents()
+
+    def change_token(self):
+        return self.board.changeCount()
+
+
+# ================== X11 ==================
+class TkClipboard:
+    """X11 CLIPBOARD selection served by a hidden Tk window on a dedicated thread
+
+    Tk must only be used from the thread that created it, so calls are queued
+    to that thread and a byte on a pipe wakes its event loop to run them. The
+    loop also answers other programs asking for what we copied.
+    """
+
+    name = "x11"
+
+    def __init__(self):
+        if sys.platform == "win32" or not os.environ.get("DISPLAY"):
+            raise ClipboardUnavailable("no X display (DISPLAY is not set)")
+        try:
+            import tkinter
+        except ImportError as e:
+            raise ClipboardUnavailable("tkinter not installed") from e
+        self._tkinter = tkinter
+        self._calls = queue.Queue()
+        self._wake_r, self._wake_w = os.pipe()
+        self._root = None
+        started = Future()
+        self._thread = threading.Thread(target=self._loop, args=(started,), name="clipboard-x11", daemon=True)
+        self._thread.start()
+        try:
+            started.result(timeout=CALL_TIMEOUT * 5)
+        except Exception as e:
+            raise ClipboardUnavailable(f"can't open the X display: {e}") from e
+
+    def _loop(self, started: Future):
+        try:
+            root = self._tkinter.Tk()
+            root.withdraw()
+            root.createfilehandler(self._wake_r, self._tkinter.READABLE, self._serve)
+        except Exception as e:
+            started.set_exception(e)
+            return
+        self._root = root
+        started.set_result(True)
+        root.mainloop()
+
+    def _serve(self, *_):
+        os.read(self._wake_r, 4096)
+        while True:
+            try:
+                func, args, future = self._calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _call(self, func, *args):
+        future = Future()
+        self._calls.put((func, args, future))
+        os.write(self._wake_w, b"x")
+        return future.result(timeout=CALL_TIMEOUT)
+
+    def _copy(self, text: str):
+        self._root.clipboard_clear()
+        self._root.clipboard_append(text)
+
+    def _paste(self) -> str:
+        for kind in ("UTF8_STRING", "STRING"):
+            try:
+                return self._root.clipboard_get(type=kind)
+            except self._tkinter.TclError:
+                continue  # empty, or the owner doesn't offer this type
+        return ""
+
+    def copy(self, text: str):
+        self._call(self._copy, str(text))
+
+    def paste(self) -> str:
+        return self._call(self._paste)
+
+    def clear(self):
+        self._call(self._copy, "")
+
+    def change_token(self):
+        return None
+
+
+# ================== WAYLAND ==================
+class WaylandClipboard:
+    """wl-clipboard, with one long-running wl-paste --watch reporting changes
+
+    Each change bumps the sequence (the change token); paste() reuses the text
+    it fetched last until the sequence moves, so polling an idle clipboard
+    starts no processes.
+    """
+
+    name = "wayland"
+
+    def __init__(self):
+        if not os.environ.get("WAYLAND_DISPLAY"):
+            raise ClipboardUnavailable("not a Wayland session (WAYLAND_DISPLAY is not set)")
+        if not (shutil.which("wl-copy") and shutil.which("wl-paste")):
+            raise ClipboardUnavailable("wl-clipboard not installed (wl-copy/wl-paste)")
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self._cached = (None, "")  # (sequence, text)
+        self._watch = subprocess.Popen(["wl-paste", "--watch", "echo"], stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        threading.Thread(target=self._follow, name="clipboard-wayland", daemon=True).start()
+        atexit.register(self.close)
+
+    def _follow(self):
+        for _ in self._watch.stdout:  # one line per clipboard change
+            with self.lock:
+                self.sequence += 1
+
+    def close(self):
+        if self._watch.poll() is None:
+            self._watch.terminate()
+
+    def copy(self, text: str):
+        text = str(text)
+        subprocess.run(["wl-copy"], input=text.encode("utf-8"), check=True, timeout=CALL_TIMEOUT)
+        with self.lock:
+            self._cached = (self.sequence, text)  # the watch event for this copy invalidates it
+
+    def paste(self) -> str:
+        with self.lock:
+            sequence, text = self._cached
+            if sequence == self.sequence:
+                return text
+            sequence = self.sequence
+        result = subprocess.run(["wl-paste", "--no-newline", "--type", "text"], capture_output=True,
+                                timeout=CALL_TIMEOUT)
+        text = result.stdout.decode("utf-8", errors="replace") if result.returncode == 0 else ""
+        with self.lock:
+            self._cached = (sequence, text)
+        return text
+
+    def clear(self):
+        subprocess.run(["wl-copy", "--clear"], check=True, timeout=CALL_TIMEOUT)
+
+    def change_token(self):
+        if self._watch.poll() is not None:
+            return None  # the helper died; fall back to comparing contents
+        return self.sequence
+
+
+# ================== PYPERCLIP ==================
+class PyperclipBackend:
+    """The system clipboard through pyperclip"""
+
+    name = "pyperclip"
+
+    def __init__(self):
+        try:
+            import pyperclip
+        except ImportError as e:
+            raise ClipboardUnavailable("pyperclip not installed") from e
+        self._pyperclip = pyperclip
+
+    def copy(self, text: str):
+        self._pyperclip.copy(str(text))
+
+    def paste(self) -> str:
+        return self._pyperclip.paste() or ""
+
+    def clear(self):
+        self._pyperclip.copy("")
+
+    def change_token(self):
+        return None
+
+
+BACKENDS = {
+    "fake": FakeClipboard,
+    "win32": Win32Clipboard,
+    "macos": MacPasteboard,
+    "x11": TkClipboard,
+    "wayland": WaylandClipboard,
+    "pyperclip": PyperclipBackend,
+}
+
+
+def auto_order() -> list:
+    """Backend names to try on this platform, fastest first"""
+    if sys.platform == "win32":
+        return ["win32", "pyperclip"]
+    if sys.platform == "darwin":
+        return ["macos", "pyperclip"]
+    return ["wayland", "x11", "pyperclip"]  # X11 also works under XWayland
+
+
+def get_backend(name: str = None):
+    """Backend by name (default: CLIPBOARD_BACKEND); ClipboardUnavailable (an ImportError) if none works"""
+    from config import get_config
+    name = name or get_config().CLIPBOARD_BACKEND
+    if name != "auto" and name not in BACKENDS:
+        raise ValueError(f"Unknown clipboard backend: {name} (use auto, {', '.join(BACKENDS)})")
+
+    reasons = []
+    for candidate in (auto_order() if name == "auto" else [name]):
+        try:
+            return BACKENDS[candidate]()
+        except ClipboardUnavailable as e:
+            reasons.append(f"{candidate}: {e}")
+    raise ClipboardUnavailable("; ".join(reasons))
@@ -1,48 +1,182 @@
-import pyperclip
-import subprocess
-import platform
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Optional
 
+from config import get_config
+from executors.clipboard_backend import get_backend
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
+IDLE_BACKOFF = 4  # idle polling slows down to this many times the interval
+MAX_ENTRY_CHARS = 1_000_000  # longer clips are kept truncated
+URL_RE = re.compile(r"\b(?:https?://|www\.)[^\s<>\"'`]+", re.IGNORECASE)
+
+
+def clip_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=8).digest()
+
+
+@dataclass
+class ClipEntry:
+    text: str
+    digest: bytes
+    time: float
+    source: str  # "assistant" (copied by us) or "monitor" (copied anywhere)
+    lower: str = field(default="", repr=False)
+    links: tuple = ()
+
+
+class ClipboardHistory:
+    """Last `size` distinct clips in a ring buffer (deque), with substring and link search"""
+
+    def __init__(self, size: int = None):
+        self.entries = deque(maxlen=size or get_config().CLIPBOARD_HISTORY)
+        self.lock = threading.Lock()
+
+    def add(self, text: str, source: str, digest: bytes = None) -> Optional[ClipEntry]:
+        """Record a clip (None if it repeats the newest one)"""
+        text = text[:MAX_ENTRY_CHARS]
+        digest = digest or clip_digest(text)
+        with self.lock:
+            if self.entries and self.entries[-1].digest == digest:
+                return None
+            links = tuple(url.rstrip(".,;:!?)]") for url in URL_RE.findall(text))
+            entry = ClipEntry(text, digest, time.time(), source, text.lower(), links)
+            self.entries.append(entry)  # the oldest falls off the other end
+            return entry
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Clips containing query (any case), newest first, each text once"""
+        needle = query.lower()
+        found, seen = [], set()
+        with self.lock:
+            entries = list(self.entries)
+        for entry in reversed(entries):
+            if entry.digest not in seen and needle in entry.lower:
+                seen.add(entry.digest)
+                found.append(entry)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def last_link(self, query: str = None) -> Optional[str]:
+        """Most recently copied URL (whose URL or clip mentions query, if given)"""
+        needle = (query or "").lower()
+        with self.lock:
+            entries = list(self.entries)
+        for entry in reversed(entries):
+            for url in reversed(entry.links):
+                if not needle or needle in url.lower() or needle in entry.lower:
+                    return url
+        return None
+
+    def texts(self) -> list:
+        with self.lock:
+            return [entry.text for entry in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+
 class ClipboardExecutor:
-    def __init__(self):
-        self.system = platform.system()
-        self.history = []
-    
+    def __init__(self, backend=None, history_size: int = None):
+        self.backend = backend or get_backend()
+        self.history = ClipboardHistory(history_size)
+        self._last_digest = None
+        self._last_token = None
+        self._monitor = None
+        self._stop = threading.Event()
+
     def copy(self, text: str) -> bool:
         """Copy text to clipboard"""
         try:
-            pyperclip.copy(str(text))
-            self.history.append(text)
-            if len(self.history) > 10:
-                self.history.pop(0)
+            text = str(text)
+            self.backend.copy(text)
+            self._record(text, "assistant")
             return True
         except Exception as e:
-            print(f"❌ Copy failed: {e}")
+            log.error("Copy failed: %s", e)
             return False
-    
+
     def paste(self) -> Optional[str]:
         """Get text from clipboard"""
         try:
-            text = pyperclip.paste()
+            text = self.backend.paste()
             return text if text else None
         except Exception as e:
-            print(f"❌ Paste failed: {e}")
+            log.error("Paste failed: %s", e)
             return None
-    
+
     def clear(self) -> bool:
         """Clear clipboard"""
         try:
-            if self.system == "Windows":
-                subprocess.run(['clip'], shell=True, input='', text=True)
-            elif self.system == "Darwin":  # macOS
-                subprocess.run(['pbcopy'], input='', text=True)
-            else:  # Linux
-                subprocess.run(['xclip', '-selection', 'c'], input='', text=True)
+            self.backend.clear()
+            self._record("", "assistant")
             return True
         except Exception as e:
-            print(f"❌ Clear clipboard failed: {e}")
+            log.error("Clear clipboard failed: %s", e)
             return False
-    
+
     def get_history(self) -> list:
-        """Get clipboard history"""
-        return self.history.copy()
\ No newline at end of file
+        """Get clipboard history (oldest first)"""
+        return self.history.texts()
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Past clips containing query, newest first"""
+        return self.history.search(query, limit)
+
+    def last_link(self, query: str = None) -> Optional[str]:
+        """Most recently copied link, optionally one matching query"""
+        return self.history.last_link(query)
+
+    # ================== MONITOR ==================
+    def _record(self, text: str, source: str):
+        digest = clip_digest(text[:MAX_ENTRY_CHARS])
+        self._last_digest = digest
+        if text:
+            self.history.add(text, source, digest)
+
+    def poll_once(self) -> bool:
+        """Check the clipboard once; True if it changed and was recorded"""
+        token = self.backend.change_token()
+        if token is not None:
+            if token == self._last_token:
+                return False  # nothing copied since last time; content not even fetched
+            self._last_token = token
+
+        text = self.backend.paste() or ""
+        if clip_digest(text[:MAX_ENTRY_CHARS]) == self._last_digest:
+            return False
+        self._record(text, "monitor")
+        return True
+
+    def start_monitor(self, interval: float = None):
+        """Record copies made in any program, polling in a background thread (every CLIPBOARD_POLL_S by default)"""
+        if self._monitor and self._monitor.is_alive():
+            return
+        self._stop.clear()
+        self._monitor = threading.Thread(target=self._watch, args=(interval,), name="clipboard-monitor", daemon=True)
+        self._monitor.start()
+
+    def stop_monitor(self):
+        self._stop.set()
+        if self._monitor:
+            self._monitor.join(timeout=2)
+            self._monitor = None
+
+    def _watch(self, pinned: float = None):
+        # Poll fast right after a change, then back off while the clipboard is idle
+        delay = pinned or get_config().CLIPBOARD_POLL_S
+        while not self._stop.wait(delay):
+            try:
+                changed = self.poll_once()
+            except Exception as e:
+                log.warning("Clipboard monitor: %s", e)
+                changed = False
+            interval = pinned or get_config().CLIPBOARD_POLL_S  # follows config reloads
+            delay = interval if changed else min(delay * 1.5, IDLE_BACKOFF * interval)
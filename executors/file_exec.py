@@ -1,8 +1,20 @@
+import fnmatch
 import os
+import re
 import shutil
 
+from config import AUTOBOX_FOLDERS, get_config
+from executors import fs_watch
+from executors.atomic_write import atomic_write, atomic_write_many
+from executors.blob_store import (BLOB_DIR_NAME, POINTER_MAX_BYTES, BlobStore, parse_pointer, pointer_bytes,
+                                  pointers_under, read_pointer)
+from executors.file_view import FileView
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-AUTOBOX_DIR = os.path.join(os.path.dirname(BASE_DIR), "AutoBox")
+AUTOBOX_DIR = get_config().autobox_dir  # once: the file map and search index watch this folder
 
 FOLDER_ALIASES = {
     "ab1": "AB1",
@@ -33,7 +45,7 @@ def get_full_path(path: str) -> str:
     path = path.replace('\\', '/')
     
     # Check if path already includes AutoBox folder
-    if path.startswith(('AB1/', 'AB2/', 'AB3/')):
+    if path.startswith(tuple(f + '/' for f in AUTOBOX_FOLDERS)):
         return os.path.join(AUTOBOX_DIR, path)
     
     # Check if path starts with folder alias
@@ -46,31 +58,67 @@ def get_full_path(path: str) -> str:
     # Default to AB1
     return os.path.join(AUTOBOX_DIR, "AB1", path)
 
+def find_existing(path: str) -> str:
+    """Like get_full_path, but a bare name that exists in AB1/AB2/AB3 resolves to it (read sources only)"""
+    if path and "/" not in path.replace("\\", "/"):
+        existing = locate(path)
+        if existing:
+            return existing
+    return get_full_path(path)
+
+def locate(name: str) -> str:
+    """Absolute path of a file directly in AB1/AB2/AB3 (first folder wins), or None"""
+    folders = [os.path.join(AUTOBOX_DIR, f) for f in AUTOBOX_FOLDERS]
+    for path in fs_watch.get_watcher(AUTOBOX_DIR).lookup(name):
+        if os.path.dirname(path) in folders and os.path.basename(path) == name:
+            return path
+    
+    # Not in the map yet (created by another program a moment ago): probe the disk
+    for folder in folders:
+        candidate = os.path.join(folder, name)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def _changed(*paths):
+    """Update the file map now and have the search index re-read these files on its next search"""
+    from memory import search_index
+    fs_watch.touch(*paths)
+    search_index.mark_dirty(*paths)
+
+def _release_blobs(*pointers):
+    """Delete the blobs of removed or overwritten pointer files that no pointer refers to any more"""
+    digests = {pointer[0] for pointer in pointers if pointer}
+    if not digests:
+        return
+    referenced = set(pointers_under(AUTOBOX_DIR).values())
+    store = blob_store()
+    for digest in digests - referenced:
+        if store.remove(digest):
+            log.info("Removed unreferenced blob %s", digest[:12])
+
 def create_file(path: str, content: str = None) -> bool:
     """Create a file with optional content - FIXED to accept 2 arguments"""
     try:
         full_path = get_full_path(path)
         if not full_path:
-            print(f"❌ Could not resolve path: {path}")
+            log.warning("Could not resolve path: %s", path)
             return False
         
         # Ensure parent directory exists
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         
         # Write content if provided, otherwise create empty file
+        atomic_write(full_path, content or "")
+        _changed(full_path)
         if content:
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"✅ Created file with content: {full_path}")
+            log.info("Created file with content: %s", full_path)
         else:
-            # Create empty file
-            with open(full_path, 'w', encoding='utf-8'):
-                pass
-            print(f"✅ Created empty file: {full_path}")
+            log.info("Created empty file: %s", full_path)
         
         return True
     except Exception as e:
-        print(f"❌ Create file error: {e}")
+        log.error("Create file error: %s", e)
         return False
 
 def delete_file(path: str) -> bool:
@@ -78,13 +126,16 @@ def delete_file(path: str) -> bool:
     try:
         full_path = get_full_path(path)
         if full_path and os.path.exists(full_path):
+            pointer = read_pointer(full_path)
             os.remove(full_path)
-            print(f"✅ Deleted: {full_path}")
+            _changed(full_path)
+            _release_blobs(pointer)
+            log.info("Deleted: %s", full_path)
             return True
-        print(f"❌ File not found: {path}")
+        log.warning("File not found: %s", path)
         return False
     except Exception as e:
-        print(f"❌ Delete file error: {e}")
+        log.error("Delete file error: %s", e)
         return False
 
 def write_file(path: str, content: str) -> bool:
@@ -92,37 +143,92 @@ def write_file(path: str, content: str) -> bool:
     try:
         full_path = get_full_path(path)
         if not full_path:
-            print(f"❌ Could not resolve path: {path}")
+            log.warning("Could not resolve path: %s", path)
             return False
         
         # Ensure parent directory exists
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(content or "")
+        pointer = read_pointer(full_path)
+        atomic_write(full_path, content or "")  # a crash leaves the old or new file, never half of it
+        _changed(full_path)
+        _release_blobs(pointer)
         
-        print(f"✅ Wrote to file: {full_path}")
+        log.info("Wrote to file: %s", full_path)
         return True
     except Exception as e:
-        print(f"❌ Write file error: {e}")
+        log.error("Write file error: %s", e)
         return False
 
 def read_file(path: str) -> str:
-    """Read content from a file"""
+    """Read content from a file (up to MAX_FILE_SIZE_MB; larger files need open_view)"""
     try:
-        full_path = get_full_path(path)
+        full_path = find_existing(path)
         if not full_path or not os.path.exists(full_path):
-            print(f"❌ File not found: {path}")
+            log.warning("File not found: %s", path)
+            return None
+        
+        size = os.path.getsize(full_path)
+        limit_mb = get_config().MAX_FILE_SIZE_MB
+        if size > limit_mb * 1024 * 1024:
+            log.warning("File too large to read whole: %s (%.1f MB > %s MB)", path, size / 1024 / 1024, limit_mb)
             return None
         
         with open(full_path, "r", encoding="utf-8") as f:
             content = f.read()
         
-        print(f"✅ Read file: {full_path} ({len(content)} chars)")
+        # Captures are stored once in the blob store; the file only points there
+        pointer = parse_pointer(content.encode("utf-8")) if size <= POINTER_MAX_BYTES else None
+        if pointer:
+            if pointer[1] > limit_mb * 1024 * 1024:
+                log.warning("File too large to read whole: %s (%.1f MB > %s MB)", path, pointer[1] / 1024 / 1024, limit_mb)
+                return None
+            content = blob_store().get(pointer[0]).decode("utf-8", errors="replace")
+        
+        log.info("Read file: %s (%d chars)", full_path, len(content))
         return content
     except Exception as e:
-        print(f"❌ Read file error: {e}")
+        log.error("Read file error: %s", e)
+        return None
+
+def open_view(path: str):
+    """Lazy FileView of a file (None if it doesn't exist); close it when done"""
+    full_path = find_existing(path)
+    if not full_path or not os.path.isfile(full_path):
+        log.warning("File not found: %s", path)
         return None
+    pointer = read_pointer(full_path)
+    if pointer:
+        return FileView(full_path, data=blob_store().get(pointer[0]))
+    return FileView(full_path)
+
+def blob_store() -> BlobStore:
+    """Content-addressed store for captures, in AutoBox/.blobs"""
+    return BlobStore(os.path.join(AUTOBOX_DIR, BLOB_DIR_NAME))
+
+def save_capture(content: str, name: str = None, prefix: str = "capture", folder: str = "AB1") -> tuple:
+    """
+    Save captured text (web page, clipboard, search) as a pointer file to a deduplicated blob.
+
+    Without a name the file is called <prefix>_<hash>.txt, so the same content
+    always lands on the same file. Returns (relative path, written); written is
+    False when the content was already saved there and nothing touched the disk.
+    """
+    data = content.encode("utf-8")
+    digest, _ = blob_store().put(data)
+    name = name or f"{prefix}_{digest[:12]}.txt"
+    _check_name(name)
+    rel = f"{normalize_folder(folder)}/{name}"
+    full_path = get_full_path(rel)
+    
+    current = read_pointer(full_path)
+    if current and current[0] == digest:
+        return rel, False
+    
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    atomic_write(full_path, pointer_bytes(digest, len(data)))
+    _changed(full_path)
+    return rel, True
 
 def move_file(source: str, destination: str) -> bool:
     """Move a file between AutoBox folders"""
@@ -133,13 +239,8 @@ def move_file(source: str, destination: str) -> bool:
         if "/" in source:
             src_path = get_full_path(source)
         else:
-            # CASE 2: search AutoBox for the file
-            src_path = None
-            for folder in ["AB1", "AB2", "AB3"]:
-                candidate = os.path.join(AUTOBOX_DIR, folder, source)
-                if os.path.exists(candidate):
-                    src_path = candidate
-                    break
+            # CASE 2: look the name up in the AutoBox file map
+            src_path = locate(source)
 
             # fallback to BASE_DIR
             if not src_path:
@@ -155,10 +256,242 @@ def move_file(source: str, destination: str) -> bool:
 
         dst_path = os.path.join(dst_dir, os.path.basename(src_path))
         shutil.move(src_path, dst_path)
+        _changed(src_path, dst_path)
         
-        print(f"✅ Moved: {src_path} -> {dst_path}")
+        log.info("Moved: %s -> %s", src_path, dst_path)
         return True
         
     except Exception as e:
-        print(f"❌ Move file error: {e}")
-        return False
\ No newline at end of file
+        log.error("Move file error: %s", e)
+        return False
+
+# ================== BULK OPERATIONS ==================
+# One call handles many files: the folder is resolved once, directories are
+# created once, listing uses os.scandir, and progress is printed per batch.
+RANGE_PATTERN = re.compile(r"^(.*?)(\d+)\.\.(\D*?)(\d+)(.*)$")  # day1..day30.txt, day1..30.txt
+MAX_BULK_FILES = 100000
+
+
+def expand_range(name: str) -> list:
+    """'day1..day30.txt' -> ['day1.txt', ..., 'day30.txt'] (zero padding kept); other names unchanged"""
+    match = RANGE_PATTERN.match(name)
+    if not match:
+        return [name]
+    prefix, start, prefix2, end, suffix = match.groups()
+    if prefix2 and prefix2 != prefix:
+        return [name]
+
+    first, last = int(start), int(end)
+    if abs(last - first) >= MAX_BULK_FILES:
+        raise ValueError(f"Range {first}..{last} is larger than {MAX_BULK_FILES} files")
+    width = len(start) if start.startswith("0") else 0
+    step = 1 if last >= first else -1
+    return [f"{prefix}{n:0{width}d}{suffix}" for n in range(first, last + step, step)]
+
+
+def _split_folder(pattern: str):
+    """'ab2/day*.txt' -> ('AB2', 'day*.txt'); no folder prefix -> (None, pattern)"""
+    pattern = pattern.replace("\\", "/").strip()
+    if "/" in pattern:
+        folder, name = pattern.split("/", 1)
+        folder = normalize_folder(folder)
+        if folder not in AUTOBOX_FOLDERS or "/" in name:
+            raise ValueError(f"Bulk operations only work directly inside {', '.join(AUTOBOX_FOLDERS)}: {pattern}")
+        return folder, name
+    return None, pattern
+
+
+def _check_name(name: str):
+    if not name or name in (".", "..") or "/" in name or "\\" in name or "\0" in name:
+        raise ValueError(f"Invalid file name: {name!r}")
+
+
+def in_sandbox(path: str) -> bool:
+    """True if path resolves (symlinks included) to AB1-AB3 or a place inside them"""
+    real = os.path.realpath(path)
+    for folder in AUTOBOX_FOLDERS:
+        root = os.path.realpath(os.path.join(AUTOBOX_DIR, folder))
+        if os.path.commonpath([real, root]) == root:
+            return True
+    return False
+
+
+def _scan(root: str) -> dict:
+    """name -> DirEntry for one folder (a single directory read)"""
+    if not os.path.isdir(root):
+        return {}
+    if not in_sandbox(root):
+        raise ValueError(f"{root} resolves outside AutoBox")
+    with os.scandir(root) as entries:
+        return {entry.name: entry for entry in entries}
+
+
+def select_files(pattern: str, folders=AUTOBOX_FOLDERS) -> list:
+    """
+    Existing files matching a glob or range pattern, as absolute paths.
+
+    'AB2/*.log' looks in AB2 only; '*.log' searches every AutoBox folder.
+    Only regular files directly inside the folders are matched.
+    """
+    folder, name = _split_folder(pattern)
+    search = [folder] if folder else list(folders)
+    names = expand_range(name)
+    wildcard = any(ch in name for ch in "*?[")
+
+    # Symlinks are never matched, so nothing outside the sandbox can be reached
+    matches = []
+    for folder_name in search:
+        entries = _scan(os.path.join(AUTOBOX_DIR, folder_name))
+        if wildcard:
+            regex = re.compile(fnmatch.translate(name), re.IGNORECASE)
+            candidates = [entry for n, entry in entries.items() if regex.match(n)]
+        else:
+            candidates = [entries[n] for n in names if n in entries]
+        matches.extend(entry.path for entry in candidates if entry.is_file(follow_symlinks=False))
+    return sorted(matches)
+
+
+def _targets(pattern: str, default_folder: str = "AB1") -> list:
+    """Paths to create/write for a range or list pattern (files need not exist)"""
+    folder, name = _split_folder(pattern)
+    folder = folder or default_folder
+    names = [n.strip() for part in name.split(",") for n in expand_range(part.strip()) if n.strip()]
+    for n in names:
+        _check_name(n)
+    root = os.path.join(AUTOBOX_DIR, folder)
+    return [os.path.join(root, n) for n in names]
+
+
+def _write_bytes(path: str, data: bytes, mode_flag: int):
+    # O_NOFOLLOW (where available) refuses a symlink swapped in after the scan
+    flags = os.O_WRONLY | os.O_CREAT | mode_flag | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _report(verb: str, done: list, failed: dict):
+    folders = sorted({os.path.basename(os.path.dirname(p)) for p in done})
+    if done:
+        log.info("%s %d file(s) in %s", verb, len(done), ", ".join(folders))
+    if failed:
+        log.error("%d file(s) failed, e.g. %s", len(failed), next(iter(failed.items())))
+    return {"done": done, "failed": failed}
+
+
+def create_files(pattern: str, content: str = None, default_folder: str = "AB1") -> dict:
+    """Create every file named by a range/comma pattern, e.g. 'AB2/day1..day30.txt'"""
+    done, failed = [], {}
+    try:
+        paths = _targets(pattern, default_folder)
+    except ValueError as e:
+        return _report("Created", done, {pattern: str(e)})
+
+    existing = {}
+    if paths:
+        root = os.path.dirname(paths[0])
+        os.makedirs(root, exist_ok=True)
+        existing = _scan(root)
+    data = (content or "").encode("utf-8")  # encoded once, written with raw os calls
+    for path in paths:
+        # Never truncate: existing files are reported, like create_file's callers expect
+        if os.path.basename(path) in existing:
+            failed[path] = "already exists"
+            continue
+        try:
+            _write_bytes(path, data, os.O_EXCL)
+            done.append(path)
+        except FileExistsError:
+            failed[path] = "already exists"
+        except OSError as e:
+            failed[path] = str(e)
+    _changed(*done)
+    return _report("Created", done, failed)
+
+
+def write_files(pattern: str, content: str, append: bool = False) -> dict:
+    """Write (or append) the same content to every existing file matching pattern"""
+    done, failed = [], {}
+    try:
+        paths = select_files(pattern)
+    except ValueError as e:
+        return _report("Wrote", done, {pattern: str(e)})
+
+    data = (content or "").encode("utf-8")
+    pointers = {path: read_pointer(path) for path in paths}  # captures: the content is in a blob
+    if append:
+        for path in paths:
+            try:
+                if pointers[path]:
+                    # Appending after the "@blob" line would break it: write the whole text out
+                    atomic_write(path, blob_store().get(pointers[path][0]) + data)
+                else:
+                    _write_bytes(path, data, os.O_APPEND)
+                done.append(path)
+            except OSError as e:
+                failed[path] = str(e)
+    else:
+        # Replaced whole, so a crash leaves each file old or new, never truncated
+        errors = atomic_write_many((path, data) for path in paths)
+        done = [path for path in paths if path not in errors]
+        failed = {path: str(e) for path, e in errors.items()}
+    _changed(*done)
+    _release_blobs(*(pointers[path] for path in done))
+    return _report("Appended to" if append else "Wrote", done, failed)
+
+
+def move_files(pattern: str, destination: str) -> dict:
+    """Move every file matching pattern into another AutoBox folder"""
+    done, failed = [], {}
+    destination = normalize_folder(destination)
+    if destination not in AUTOBOX_FOLDERS:
+        return _report("Moved", done, {pattern: f"Unknown destination folder: {destination}"})
+    try:
+        paths = select_files(pattern)
+    except ValueError as e:
+        return _report("Moved", done, {pattern: str(e)})
+
+    dst_dir = os.path.join(AUTOBOX_DIR, destination)
+    os.makedirs(dst_dir, exist_ok=True)
+    moved = []
+    for path in paths:
+        dst_path = os.path.join(dst_dir, os.path.basename(path))
+        if os.path.dirname(path) == dst_dir:
+            continue
+        if os.path.lexists(dst_path):
+            failed[path] = f"{os.path.basename(path)} already exists in {destination}"
+            continue
+        try:
+            os.replace(path, dst_path)  # same filesystem: a rename, no copy
+            done.append(dst_path)
+            moved.append(path)
+        except OSError as e:
+            failed[path] = str(e)
+    _changed(*moved, *done)
+    return _report("Moved", done, failed)
+
+
+def delete_files(pattern: str) -> dict:
+    """Delete every file matching pattern"""
+    done, failed = [], {}
+    try:
+        paths = select_files(pattern)
+    except ValueError as e:
+        return _report("Deleted", done, {pattern: str(e)})
+
+    pointers = []
+    for path in paths:
+        try:
+            pointer = read_pointer(path)
+            os.remove(path)
+            done.append(path)
+            pointers.append(pointer)
+        except OSError as e:
+            failed[path] = str(e)
+    _changed(*done)
+    _release_blobs(*pointers)
+    return _report("Deleted", done, failed)
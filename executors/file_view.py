@@ -0,0 +1,175 @@
+"""
+Lazy, memory-mapped view of a file
+
+Opening a view costs one stat; nothing is read until asked for. head/tail/range
+touch only the pages they return through an mmap, and line_count/search stream
+the file in fixed-size blocks, so a multi-GB log can be inspected without
+loading it (or mapping all of it into the process).
+"""
+
+import io
+import mmap
+import os
+import re
+
+CHUNK = 1024 * 1024
+DEFAULT_MAX_BYTES = 64 * 1024  # cap on bytes decoded by head/tail/range
+
+
+class FileView:
+    def __init__(self, path: str, encoding: str = "utf-8", data: bytes = None):
+        self.path = path
+        self.encoding = encoding
+        self._data = data  # content already in memory (e.g. a decompressed blob)
+        self.size = len(data) if data is not None else os.path.getsize(path)
+        self._file = None
+        self._map = None
+        self._lines = None
+
+    # ================== LIFECYCLE ==================
+    def _mapped(self):
+        """The mmap (b"" for empty files, which can't be mapped)"""
+        if self._data is not None:
+            return self._data
+        if self._map is None:
+            if self.size == 0:
+                return b""
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _decode(self, data: bytes) -> str:
+        return data.decode(self.encoding, errors="replace")
+
+    # ================== READING ==================
+    def text(self, max_bytes: int) -> str:
+        """Whole file as text; ValueError if it is larger than max_bytes"""
+        if self.size > max_bytes:
+            raise ValueError(f"{self.path} is {self.size} bytes (limit {max_bytes})")
+        return self._decode(self._mapped()[:])
+
+    def range(self, start: int, end: int = None) -> str:
+        """Decoded bytes [start, end), capped at DEFAULT_MAX_BYTES"""
+        end = self.size if end is None else min(end, self.size)
+        start = max(0, start)
+        end = min(end, start + DEFAULT_MAX_BYTES)
+        return self._decode(self._mapped()[start:end]) if end > start else ""
+
+    def head(self, lines: int = 20, max_bytes: int = DEFAULT_MAX_BYTES) -> str:
+        """First `lines` lines (or up to max_bytes)"""
+        data = self._mapped()
+        end, found = 0, 0
+        limit = min(self.size, max_bytes)
+        while found < lines and end < limit:
+            newline = data.find(b"\n", end, limit)
+            if newline < 0:
+                end = limit
+                break
+            end = newline + 1
+            found += 1
+        return self._decode(data[:end]).rstrip("\n")
+
+    def tail(self, lines: int = 20, max_bytes: int = DEFAULT_MAX_BYTES) -> str:
+        """Last `lines` lines (or up to max_bytes)"""
+        if lines <= 0:
+            return ""
+        data = self._mapped()
+        floor = max(0, self.size - max_bytes)
+        end = self.size
+        if end and data[end - 1:end] == b"\n":
+            end -= 1  # a trailing newline ends the last line, it doesn't start a new one
+
+        start = end
+        for _ in range(lines):
+            newline = data.rfind(b"\n", floor, start)
+            if newline < 0:
+                start = floor
+                break
+            start = newline
+        else:
+            start += 1
+        return self._decode(data[start:end])
+
+    def _blocks(self, lines: bool = False):
+        """Yield (offset, bytes) read in CHUNK-sized pieces; with lines=True each piece ends on a newline"""
+        with (io.BytesIO(self._data) if self._data is not None else open(self.path, "rb")) as f:
+            offset, carry = 0, b""
+            while True:
+                block = f.read(CHUNK)
+                if not block:
+                    if carry:
+                        yield offset, carry
+                    return
+                if not lines:
+                    yield offset, block
+                    offset += len(block)
+                    continue
+                data = carry + block
+                cut = data.rfind(b"\n") + 1
+                if cut == 0 and len(data) < 16 * CHUNK:
+                    carry = data  # keep reading until the line ends
+                    continue
+                cut = cut or len(data)  # pathological single line: split it anyway
+                yield offset, data[:cut]
+                offset += cut
+                carry = data[cut:]
+
+    def line_count(self) -> int:
+        """Number of lines (a last line without a newline counts)"""
+        if self._lines is None:
+            count, last = 0, b"\n"
+            for _, block in self._blocks():
+                count += block.count(b"\n")
+                last = block[-1:]
+            self._lines = count + (0 if last == b"\n" else 1)
+        return self._lines
+
+    def search(self, pattern: str, max_results: int = 20, ignore_case: bool = True,
+               regex: bool = False) -> list:
+        """(line number, line) for lines matching pattern; only matching lines are decoded"""
+        needle = pattern.encode(self.encoding)
+        compiled = re.compile(needle, re.IGNORECASE if ignore_case else 0) if regex else None
+        if ignore_case and not regex:
+            needle = needle.lower()  # literal search: lowercase each block once, then bytes.find
+
+        def find(block, haystack, start):
+            if compiled is None:
+                return haystack.find(needle, start)
+            match = compiled.search(block, start)
+            return match.start() if match else -1
+
+        results = []
+        lines_before = 0  # newlines in all earlier blocks
+        for _, block in self._blocks(lines=True):
+            haystack = block.lower() if (ignore_case and not regex) else block
+            position, counted_to, line_no = 0, 0, lines_before + 1
+            while len(results) < max_results:
+                hit = find(block, haystack, position)
+                if hit < 0:
+                    break
+                line_start = block.rfind(b"\n", 0, hit) + 1
+                line_end = block.find(b"\n", hit)
+                line_end = len(block) if line_end < 0 else line_end
+
+                line_no += block.count(b"\n", counted_to, line_start)
+                counted_to = line_start
+                results.append((line_no, self._decode(block[line_start:min(line_end, line_start + DEFAULT_MAX_BYTES)])))
+                position = line_end + 1
+            if len(results) >= max_results:
+                break
+            lines_before += block.count(b"\n")
+        return results
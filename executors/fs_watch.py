@@ -0,0 +1,342 @@
+"""
+Filesystem watcher keeping an in-memory map of a folder tree
+
+Maps every regular file under a root to its (size, mtime_ns) and indexes
+them by lowercase name, so "where is notes.txt" is a dictionary lookup
+instead of os.walk/exists probes. On Linux the map follows inotify events
+(ctypes, no extra package); elsewhere, or when inotify watches run out, a
+thread rescans every POLL_INTERVAL seconds.
+
+Events only say *that* something changed, so each changed path is re-stat'ed
+and the map updated from what is on disk; a queue overflow triggers a full
+rescan. Name lookups also lstat the paths they return, so a file deleted a
+moment ago is never handed out even before its event is processed. Hidden
+names (atomic-write temp files, the blob store) and symlinks are skipped.
+"""
+
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
+POLL_INTERVAL = 2.0
+SKIP_DIRS = {"__pycache__", "node_modules"}
+
+# inotify(7)
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+_EVENT = struct.Struct("iIII")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+_libc = _load_libc()
+
+
+def _skipped(name: str) -> bool:
+    return name.startswith(".") or name in SKIP_DIRS
+
+
+class FileWatcher:
+    def __init__(self, root: str, poll_interval: float = POLL_INTERVAL, use_inotify: bool = True):
+        self.root = os.path.abspath(root)
+        self.poll_interval = poll_interval
+        self.lock = threading.RLock()
+        self.files = {}  # absolute path -> (size, mtime_ns)
+        self.names = {}  # lowercase file name -> set of absolute paths
+        self.dirs = set()
+        self.version = 0  # bumped when a name is added or removed
+        self._names_list = (None, [])
+        self.listeners = []
+        self.mode = "inotify" if (use_inotify and _libc is not None) else "polling"
+        self.counts = {"events": 0, "rescans": 0, "hits": 0, "misses": 0}
+
+        self._fd = None
+        self._watches = {}  # watch descriptor -> directory
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ================== LIFECYCLE ==================
+    def start(self):
+        if self.mode == "inotify":
+            fd = _libc.inotify_init1(IN_CLOEXEC)
+            if fd < 0:
+                self.mode = "polling"
+            else:
+                self._fd = fd
+        self.rescan()
+        target = self._watch_loop if self.mode == "inotify" else self._poll_loop
+        self._thread = threading.Thread(target=target, name=f"fs-watch-{self.mode}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def subscribe(self, callback):
+        """callback(absolute path) runs whenever a file is added, changed or removed"""
+        with self.lock:
+            self.listeners.append(callback)
+
+    # ================== QUERIES ==================
+    def lookup(self, name: str) -> list:
+        """Existing files with this name (any case), sorted; verified with one lstat each"""
+        with self.lock:
+            paths = sorted(self.names.get(name.lower(), ()))
+        found = []
+        for path in paths:
+            if os.path.isfile(path) and not os.path.islink(path):
+                found.append(path)
+            else:
+                self.refresh(path)  # deleted before its event arrived
+        with self.lock:
+            self.counts["hits" if found else "misses"] += 1
+        return found
+
+    def stat(self, path: str):
+        """(size, mtime_ns) from the map, or None if the path isn't a known file"""
+        with self.lock:
+            return self.files.get(os.path.abspath(path))
+
+    def all_names(self) -> list:
+        """One file name per distinct (case-insensitive) name; cached until the set of names changes"""
+        with self.lock:
+            version, names = self._names_list
+            if version != self.version:
+                names = [os.path.basename(next(iter(paths))) for paths in self.names.values()]
+                self._names_list = (self.version, names)
+            return names
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"mode": self.mode, "files": len(self.files), "dirs": len(self.dirs),
+                    "watches": len(self._watches), **self.counts}
+
+    # ================== MAP UPDATES ==================
+    def _put(self, path: str, stat: tuple) -> bool:
+        if self.files.get(path) == stat:
+            return False
+        if path not in self.files:
+            self.names.setdefault(os.path.basename(path).lower(), set()).add(path)
+            self.version += 1
+        self.files[path] = stat
+        return True
+
+    def _drop(self, path: str) -> list:
+        """Forget a file, or a folder and everything under it; returns the files removed"""
+        removed = []
+        if path in self.files:
+            removed.append(path)
+        if path in self.dirs:
+            prefix = path + os.sep
+            removed.extend(p for p in self.files if p.startswith(prefix))
+            self.dirs.difference_update([d for d in self.dirs if d == path or d.startswith(prefix)])
+        if removed:
+            self.version += 1
+        for p in removed:
+            del self.files[p]
+            key = os.path.basename(p).lower()
+            paths = self.names.get(key)
+            if paths is not None:
+                paths.discard(p)
+                if not paths:
+                    del self.names[key]
+        return removed
+
+    def _scan_tree(self, top: str) -> dict:
+        """path -> (size, mtime_ns) for files under top; adds inotify watches before listing each folder"""
+        found = {}
+        stack = [top]
+        while stack:
+            folder = stack.pop()
+            self.dirs.add(folder)
+            self._add_watch(folder)
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                if _skipped(entry.name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        found[entry.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue  # removed while we were listing
+        return found
+
+    def rescan(self):
+        """Rebuild the map from disk, telling listeners about every difference"""
+        with self.lock:
+            self.dirs.clear()
+            found = self._scan_tree(self.root) if os.path.isdir(self.root) else {}
+            changed = [p for p in list(self.files) if p not in found]
+            for path in changed:
+                self._drop(path)
+            changed.extend(p for p, st in found.items() if self._put(p, st))
+            self.counts["rescans"] += 1
+        self._notify(changed)
+
+    def refresh(self, path: str):
+        """Re-stat one path (file or folder) and update the map to match the disk"""
+        path = os.path.abspath(path)
+        if path != self.root and not path.startswith(self.root + os.sep):
+            return
+        changed = []
+        with self.lock:
+            try:
+                st = os.lstat(path)
+            except OSError:
+                st = None
+            name_skipped = any(_skipped(part) for part in os.path.relpath(path, self.root).split(os.sep) if part != ".")
+            if st is None or name_skipped or os.path.islink(path):
+                changed = self._drop(path)
+            elif os.path.isdir(path):
+                if path not in self.dirs:
+                    changed = [p for p, s in self._scan_tree(path).items() if self._put(p, s)]
+            else:
+                if path in self.dirs:  # a folder replaced by a file
+                    changed = self._drop(path)
+                if self._put(path, (st.st_size, st.st_mtime_ns)):
+                    changed.append(path)
+        self._notify(changed)
+
+    def _notify(self, paths: list):
+        if not paths:
+            return
+        with self.lock:
+            listeners = list(self.listeners)
+        for callback in listeners:
+            try:
+                callback(*paths)
+            except Exception as e:
+                log.warning("File watcher listener failed: %s", e)
+
+    # ================== INOTIFY ==================
+    def _add_watch(self, folder: str):
+        if self._fd is None:
+            return
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:  # fs.inotify.max_user_watches exhausted
+                log.warning("Out of inotify watches, file watcher falling back to polling")
+                self.mode = "polling"
+            return
+        self._watches[wd] = folder
+
+    def _watch_loop(self):
+        while not self._stop.is_set():
+            if self.mode != "inotify":
+                self._poll_loop()
+                return
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except OSError:
+                continue
+            self._handle_events(data)
+
+    def _handle_events(self, data: bytes):
+        paths, overflow = [], False
+        offset = 0
+        with self.lock:
+            while offset + _EVENT.size <= len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                raw = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                self.counts["events"] += 1
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                folder = self._watches.get(wd)
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                if folder is None:
+                    continue
+                paths.append(os.path.join(folder, os.fsdecode(raw)) if raw else folder)
+
+        if overflow:
+            self.rescan()
+            return
+        for path in dict.fromkeys(paths):  # each path re-stat'ed once per batch
+            self.refresh(path)
+
+    # ================== POLLING ==================
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.rescan()
+
+
+# ================== SHARED WATCHERS ==================
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def get_watcher(root: str) -> FileWatcher:
+    """The running watcher for root (started, with an initial scan, on first use)"""
+    root = os.path.abspath(root)
+    with _watchers_lock:
+        watcher = _watchers.get(root)
+        if watcher is None:
+            watcher = _watchers[root] = FileWatcher(root).start()
+        return watcher
+
+
+def forget(root: str):
+    """Stop and drop the watcher for root (e.g. before deleting a temporary tree)"""
+    with _watchers_lock:
+        watcher = _watchers.pop(os.path.abspath(root), None)
+    if watcher is not None:
+        watcher.stop()
+
+
+def touch(*paths):
+    """Update running watchers right away after our own writes (events may lag behind)"""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+    for watcher in watchers:
+        for path in paths:
+            if path.startswith(watcher.root + os.sep):
+                watcher.refresh(path)
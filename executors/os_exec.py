@@ -1,6 +1,9 @@
-import subprocess
+import os
 import sys
-import shutil
+
+from log_setup import get_logger
+
+log = get_logger(__name__)
 
 # Known friendly aliases
 APP_ALIASES = {
@@ -26,96 +29,64 @@ APP_ALIASES = {
 }
 
 def open_app(app_name: str) -> bool:
-    """Open an application on Windows"""
-    app = app_name.lower().strip()
-    
-    # Alias resolution
-    command = APP_ALIASES.get(app, app)
-    
-    if not sys.platform.startswith("win"):
-        print("⚠️ This resolver is Windows-only")
+    """Open an application (resolved through the cached app index, launched without a shell)"""
+    from executors.app_index import get_index, launch, normalize
+
+    index = get_index()
+    app = index.resolve(app_name)
+    if app is None:
+        if sys.platform.startswith("win"):
+            # Let Windows resolve it (App Paths, registered apps) like 'start' did, minus the cmd.exe
+            try:
+                os.startfile(APP_ALIASES.get(normalize(app_name), app_name))
+                log.info("Opened via Windows shell: %s", app_name)
+                return True
+            except OSError as e:
+                log.warning("Windows could not open it either: %s", e)
+        log.warning("Could not find application: %s", app_name)
         return False
 
-    print(f"🔄 Attempting to open: {app_name} (command: {command})")
-    
+    log.info("Opening %s → %s (%s)", app_name, app.name, app.source)
     try:
-        # 1. Try direct execution
-        if shutil.which(command):
-            print(f"✅ Found in PATH: {command}")
-            subprocess.Popen(command, shell=True)
-            return True
-        
-        # 2. Try Windows 'start' command
-        print(f"🔄 Trying Windows 'start' command...")
-        try:
-            subprocess.Popen(f'start "" "{command}"', shell=True)
-            print(f"✅ Opened via 'start' command")
-            return True
-        except Exception as e:
-            print(f"⚠️ 'start' failed: {e}")
-        
-        # 3. Try PowerShell
-        print(f"🔄 Trying PowerShell...")
-        try:
-            subprocess.Popen(
-                ["powershell", "-Command", f"Start-Process '{command}'"],
-                shell=True
-            )
-            print(f"✅ Opened via PowerShell")
-            return True
-        except Exception as e:
-            print(f"⚠️ PowerShell failed: {e}")
-        
-        # 4. Try common Windows applications with paths
-        windows_apps = {
-            "chrome": [
-                "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
-                "C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe"
-            ],
-            "notepad": ["notepad.exe"],
-            "calc": ["calc.exe"],
-            "mspaint": ["mspaint.exe"],
-            "cmd": ["cmd.exe"],
-            "powershell": ["powershell.exe"],
-            "explorer": ["explorer.exe"],
-            "edge": ["C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe"]
-        }
-        
-        if app in windows_apps:
-            for path in windows_apps[app]:
-                try:
-                    if os.path.exists(path):
-                        subprocess.Popen(path, shell=True)
-                        print(f"✅ Opened via direct path: {path}")
-                        return True
-                except Exception as e:
-                    print(f"⚠️ Path {path} failed: {e}")
-        
-        # 5. Last resort: try just the name
-        print(f"🔄 Trying raw command...")
-        try:
-            subprocess.Popen(command, shell=True)
-            print(f"✅ Opened via raw command")
-            return True
-        except Exception as e:
-            print(f"❌ All methods failed: {e}")
-        
-        print(f"❌ Could not open application: {app_name}")
-        return False
-        
-    except Exception as e:
-        print(f"❌ Error opening app: {e}")
+        process = launch(app)
+    except OSError as e:
+        log.error("Error opening app: %s", e)
         return False
+    if process is not None:
+        from executors.process_registry import exe_name, get_registry
+        get_registry().add(process, normalize(app_name), normalize(app.name), exe_name(app.argv[0]))
+
+    exact = normalize(app_name) in index.apps or normalize(app_name) in APP_ALIASES
+    if not exact:
+        index.learn(app_name, app)  # a guess that launched; next time it is a lookup
+    return True
 
 def close_app(app_name: str) -> bool:
-    """Close an application (simplified)"""
+    """Close an application: the processes open_app started for it, else any running instance"""
+    from executors.app_index import get_index, normalize
+    from executors.process_registry import exe_name, get_registry, psutil, taskkill
+
+    names = [normalize(app_name)]
+    exe_names = []
+    app = get_index().resolve(app_name)
+    if app is not None:
+        names.append(normalize(app.name))
+        if app.argv:
+            exe_names.append(exe_name(app.argv[0]))
+    alias = APP_ALIASES.get(names[0])
+    if alias:
+        exe_names.append(alias)
+
     try:
-        if sys.platform.startswith("win"):
-            subprocess.run(["taskkill", "/f", "/im", f"{app_name}.exe"], 
-                          capture_output=True, shell=True)
-            print(f"✅ Attempted to close: {app_name}")
+        count = get_registry().close(names, exe_names)
+        if count:
+            log.info("Asked %d process(es) to close: %s", count, app_name)
             return True
+        if psutil is None and taskkill(exe_names[0] if exe_names else names[0]):
+            log.info("Attempted to close: %s", app_name)
+            return True
+        log.warning("No running process found for: %s", app_name)
         return False
     except Exception as e:
-        print(f"❌ Error closing app: {e}")
-        return False
\ No newline at end of file
+        log.error("Error closing app: %s", e)
+        return False
@@ -0,0 +1,253 @@
+"""
+Registry of the processes open_app started, for close_app
+
+Every launch is recorded (PID, start time, the app it was resolved to), so
+"close firefox" terminates the processes we started - and their children -
+instead of every process with a similar name. Apps that weren't started by
+us (or that handed off to an already running instance) are found in a
+cached psutil process table by executable name.
+
+close() only sends the termination request and returns; a background
+reaper thread waits on the launched Popen objects (no zombies, handles
+released), drops entries whose process is gone and kills whatever ignored
+the request after GRACE_PERIOD seconds.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+GRACE_PERIOD = 3.0  # seconds between terminate and kill
+REAP_INTERVAL = 1.0
+TABLE_TTL = 2.0  # seconds a process table snapshot is reused
+
+
+@dataclass
+class Launched:
+    pid: int
+    names: set  # normalized names this launch answers to ("crome", "google chrome", "google-chrome-stable")
+    popen: Optional[subprocess.Popen]
+    started: float = field(default_factory=time.time)
+    create_time: Optional[float] = None  # psutil's, to tell our process from a reused PID
+
+
+@dataclass
+class Closing:
+    process: object  # psutil.Process or subprocess.Popen
+    kill_at: float
+
+
+def exe_name(path: str) -> str:
+    name = os.path.basename(path).lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class ProcessTable:
+    """psutil process list grouped by executable name, refreshed at most every TABLE_TTL seconds"""
+
+    def __init__(self, ttl: float = TABLE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._snapshot = (0.0, {})
+        self.scans = 0
+
+    def invalidate(self):
+        with self.lock:
+            self._snapshot = (0.0, {})
+
+    def by_name(self) -> dict:
+        """lowercase executable name -> [psutil.Process]"""
+        with self.lock:
+            taken, table = self._snapshot
+            if time.monotonic() - taken < self.ttl:
+                return table
+            table = {}
+            for proc in psutil.process_iter(["name", "exe"]):
+                for name in {exe_name(proc.info["name"] or ""), exe_name(proc.info["exe"] or "")} - {""}:
+                    table.setdefault(name, []).append(proc)
+            self._snapshot = (time.monotonic(), table)
+            self.scans += 1
+            return table
+
+    def find(self, names) -> list:
+        table = self.by_name()
+        found = {}
+        for name in names:
+            for proc in table.get(name, ()):
+                found[proc.pid] = proc
+        return list(found.values())
+
+
+class ProcessRegistry:
+    def __init__(self, grace_period: float = GRACE_PERIOD, reap_interval: float = REAP_INTERVAL):
+        self.grace_period = grace_period
+        self.reap_interval = reap_interval
+        self.lock = threading.Lock()
+        self.launched = {}  # pid -> Launched
+        self.closing = {}  # pid -> Closing
+        self.table = ProcessTable() if psutil is not None else None
+        self.counts = {"launched": 0, "terminated": 0, "killed": 0, "reaped": 0}
+        self._wake = threading.Event()
+        self._reaper = None
+
+    # ================== RECORDING ==================
+    def add(self, popen: subprocess.Popen, *names) -> Launched:
+        """Record a process open_app started, under the names it may be closed by"""
+        create_time = None
+        if psutil is not None:
+            try:
+                create_time = psutil.Process(popen.pid).create_time()
+            except psutil.Error:
+                pass
+        entry = Launched(popen.pid, {n for n in names if n}, popen, create_time=create_time)
+        with self.lock:
+            self.launched[popen.pid] = entry
+            self.counts["launched"] += 1
+        self._ensure_reaper()
+        return entry
+
+    def running(self, name: str = None) -> list:
+        """Launched entries still alive (answering to name, if given), oldest first"""
+        with self.lock:
+            entries = sorted(self.launched.values(), key=lambda e: e.started)
+        return [e for e in entries if (name is None or name in e.names) and self._alive(e)]
+
+    def _alive(self, entry: Launched) -> bool:
+        if entry.popen is not None and entry.popen.poll() is not None:
+            return False
+        if psutil is None:
+            return entry.popen is not None
+        try:
+            proc = psutil.Process(entry.pid)
+            return proc.is_running() and (entry.create_time is None or proc.create_time() == entry.create_time)
+        except psutil.Error:
+            return False
+
+    # ================== CLOSING ==================
+    def close(self, names, exe_names=()) -> int:
+        """Ask processes to exit (ours first, else any with a matching executable); returns how many"""
+        names = [n for n in names if n]
+        targets = {}
+        for name in names:
+            for entry in self.running(name):
+                for proc in self._with_children(entry):
+                    targets[proc.pid] = proc
+
+        if not targets and self.table is not None:
+            # Not started by us, or handed off to an instance that was already running
+            for proc in self.table.find(list(names) + list(exe_names)):
+                if proc.pid != os.getpid():
+                    targets[proc.pid] = proc
+
+        signalled = 0
+        for pid, proc in targets.items():
+            try:
+                proc.terminate()
+            except Exception:
+                continue  # already gone, or not ours to signal
+            signalled += 1
+            with self.lock:
+                self.closing[pid] = Closing(proc, time.monotonic() + self.grace_period)
+                self.counts["terminated"] += 1
+        if signalled:
+            if self.table is not None:
+                self.table.invalidate()
+            self._ensure_reaper()
+        return signalled
+
+    def _with_children(self, entry: Launched) -> list:
+        if psutil is None:
+            return [entry.popen]
+        try:
+            proc = psutil.Process(entry.pid)
+            return [proc] + proc.children(recursive=True)
+        except psutil.Error:
+            return [entry.popen] if entry.popen is not None else []
+
+    # ================== REAPER ==================
+    def _ensure_reaper(self):
+        self._wake.set()
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, name="process-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            self._wake.wait()  # sleeps for free while there is nothing to watch
+            self._wake.clear()
+            while self.reap_once():
+                time.sleep(self.reap_interval)
+
+    def reap_once(self) -> bool:
+        """Collect exited children, kill overdue ones; True while anything is left to watch"""
+        now = time.monotonic()
+        with self.lock:
+            launched = list(self.launched.values())
+            closing = list(self.closing.items())
+
+        for entry in launched:
+            if entry.popen is not None and entry.popen.poll() is not None:  # waits on it: no zombie
+                with self.lock:
+                    self.launched.pop(entry.pid, None)
+                    self.counts["reaped"] += 1
+            elif entry.popen is None and not self._alive(entry):
+                with self.lock:
+                    self.launched.pop(entry.pid, None)
+
+        for pid, closing_entry in closing:
+            proc = closing_entry.process
+            try:
+                if isinstance(proc, subprocess.Popen):
+                    done = proc.poll() is not None
+                else:
+                    done = not proc.is_running() or proc.status() == psutil.STATUS_ZOMBIE
+            except Exception:
+                done = True
+            if not done and now >= closing_entry.kill_at:
+                try:
+                    proc.kill()
+                    with self.lock:
+                        self.counts["killed"] += 1
+                except Exception:
+                    pass
+                done = True
+            if done:
+                with self.lock:
+                    self.closing.pop(pid, None)
+
+        with self.lock:
+            return bool(self.launched or self.closing)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"tracked": len(self.launched), "closing": len(self.closing),
+                    "table_scans": self.table.scans if self.table else 0, **self.counts}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ProcessRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ProcessRegistry()
+        return _registry
+
+
+def taskkill(image: str) -> bool:
+    """Windows without psutil: ask taskkill to close every process of an image (no shell, doesn't wait)"""
+    if not sys.platform.startswith("win"):
+        return False
+    subprocess.Popen(["taskkill", "/im", f"{image}.exe"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return True
@@ -6,9 +6,24 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
+import functools
 import time
 import os
 
+from config import get_config
+from log_setup import get_logger
+from resource_governor import get_governor
+
+log = get_logger(__name__)
+
+def uses_browser(method):
+    """Keep the browser from being unloaded as idle while method runs"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with get_governor().use("browser"):
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class WebExecutor:
     def __init__(self, headless=False):  # Default to VISIBLE browser
         self.driver = None
@@ -34,15 +49,24 @@ class WebExecutor:
             options.add_argument('--window-size=1920,1080')
             
             try:
+                start = time.perf_counter()
                 service = Service(ChromeDriverManager().install())
                 self.driver = webdriver.Chrome(service=service, options=options)
-                print(f"✅ Chrome driver initialized (headless: {self.headless})")
+                log.info("Chrome driver initialized (headless: %s)", self.headless)
+                # Under memory pressure an idle browser is closed; the next command starts it again.
+                # A visible one may be showing a page the user is reading, so it must be idle far longer.
+                min_idle = None if self.headless else get_config().VISIBLE_BROWSER_MIN_IDLE_S
+                if min_idle != 0:
+                    get_governor().register("browser", self.close, cost=time.perf_counter() - start,
+                                            pids=lambda: [self.driver.service.process.pid] if self.driver else [],
+                                            min_idle=min_idle)
             except Exception as e:
-                print(f"❌ Failed to initialize Chrome driver: {e}")
+                log.error("Failed to initialize Chrome driver: %s", e)
                 return None
         
         return self.driver
     
+    @uses_browser
     def open_url(self, url):
         """Open a URL in browser"""
         try:
@@ -53,7 +77,7 @@ class WebExecutor:
             if not url.startswith(('http://', 'https://')):
                 url = 'https://' + url
             
-            print(f"🌐 Opening: {url}")
+            log.info("Opening: %s", url)
             driver.get(url)
             
             # Wait for page load
@@ -61,11 +85,11 @@ class WebExecutor:
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
-            print(f"✅ Opened successfully: {url}")
+            log.debug("Opened successfully: %s", url)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to open {url}: {e}")
+            log.error("Failed to open %s: %s", url, e)
             return False
     
     def get_page_content(self, url):
@@ -89,11 +113,11 @@ class WebExecutor:
             chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
             text = '\n'.join(chunk for chunk in chunks if chunk)
             
-            print(f"✅ Extracted {len(text)} chars from {url}")
+            log.info("Extracted %d chars from %s", len(text), url)
             return text[:10000]  # Limit length
             
         except Exception as e:
-            print(f"❌ Failed to get content: {e}")
+            log.error("Failed to get content: %s", e)
             return None
     
     def search_google(self, query, num_results=5):
@@ -123,13 +147,14 @@ class WebExecutor:
                     if len(results) >= num_results:
                         break
             
-            print(f"✅ Found {len(results)} results for '{query}'")
+            log.info("Found %d results for %r", len(results), query)
             return results
             
         except Exception as e:
-            print(f"❌ Search failed: {e}")
+            log.error("Search failed: %s", e)
             return []
     
+    @uses_browser
     def take_screenshot(self, filename="screenshot.png"):
         """Take screenshot of current page"""
         try:
@@ -138,25 +163,27 @@ class WebExecutor:
                 return None
             
             # Ensure AutoBox/AB1 exists
-            screenshot_dir = os.path.join("AutoBox", "AB1")
+            from executors.file_exec import AUTOBOX_DIR
+            screenshot_dir = os.path.join(AUTOBOX_DIR, "AB1")
             os.makedirs(screenshot_dir, exist_ok=True)
             
             filepath = os.path.join(screenshot_dir, filename)
             driver.save_screenshot(filepath)
             
-            print(f"✅ Screenshot saved: {filepath}")
+            log.info("Screenshot saved: %s", filepath)
             return filepath
             
         except Exception as e:
-            print(f"❌ Screenshot failed: {e}")
+            log.error("Screenshot failed: %s", e)
             return None
     
     def close(self):
         """Close driver if open"""
+        get_governor().unregister("browser")
         if self.driver:
             try:
                 self.driver.quit()
                 self.driver = None
-                print("✅ Web driver closed")
+                log.info("Web driver closed")
             except:
                 pass
\ No newline at end of file
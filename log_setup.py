@@ -0,0 +1,149 @@
+"""
+Diagnostic logging for the assistant
+
+What the assistant tells the user goes through say() (console and voice).
+Everything else - progress of file operations, raw LLM output, errors - goes
+to loggers under "assistant". The calling thread only builds the record and
+puts it on a queue; a QueueListener thread does the formatting and I/O:
+
+    LOG_FILE   one JSON object per line: ts, level, logger, msg, thread,
+               exc (traceback) and any fields passed with extra={...}
+    stderr     WARNING and above, prefixed like the old prints (⚠️ / ❌)
+
+Levels below LOG_LEVEL are dropped before a record (or its message) is built,
+so hand values over as arguments instead of f-strings:
+
+    log = get_logger(__name__)
+    log.debug("Raw LLM output: %s", output)
+
+LOG_LEVEL and LOG_FILE come from config.py (ASSISTANT_LOG_LEVEL and
+ASSISTANT_LOG_FILE there too); ASSISTANT_CONSOLE_LOG sets the stderr level.
+They are read once, by setup(). Until setup() runs
+(e.g. when a module is used on its own), warnings and errors still reach
+stderr through logging's last-resort handler.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+from config import get_config
+
+ROOT = "assistant"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAX_LOG_BYTES = 5 * 1024 * 1024  # rotate the JSONL file at this size
+LOG_BACKUPS = 3
+CONSOLE_PREFIX = {"DEBUG": "· ", "INFO": "", "WARNING": "⚠️ ", "ERROR": "❌ ", "CRITICAL": "❌ "}
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_STANDARD = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the assistant root ("controller.llm" -> "assistant.controller.llm")"""
+    return logging.getLogger(name if name == ROOT or name.startswith(ROOT + ".") else f"{ROOT}.{name}")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name[len(ROOT) + 1:] or ROOT,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = CONSOLE_PREFIX.get(record.levelname, "") + record.getMessage()
+        if record.exc_text:
+            text += "\n" + record.exc_text
+        return text
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Freezes the message and traceback in the caller; JSON and file I/O happen on the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _level(value, default: int) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value or "").upper())
+    return level if isinstance(level, int) else default
+
+
+def setup(level=None, log_file: str = None, console_level=None) -> logging.Logger:
+    """Route "assistant" loggers through the queue to LOG_FILE and stderr (safe to call twice)"""
+    global _listener
+    root = logging.getLogger(ROOT)
+    with _setup_lock:
+        if _listener is not None:
+            return root
+
+        cfg = get_config()
+        level = _level(level or cfg.LOG_LEVEL, logging.INFO)
+        console_level = _level(console_level or os.environ.get("ASSISTANT_CONSOLE_LOG"), logging.WARNING)
+        log_file = log_file or cfg.LOG_FILE
+
+        handlers = []
+        if log_file:
+            log_file = log_file if os.path.isabs(log_file) else os.path.join(BASE_DIR, log_file)
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8", delay=True)
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        console = logging.StreamHandler()
+        console.setLevel(console_level)
+        console.setFormatter(ConsoleFormatter())
+        handlers.append(console)
+
+        records = queue.SimpleQueue()
+        root.handlers[:] = [_QueueHandler(records)]
+        root.setLevel(min(level, console_level))  # the file still only gets LOG_LEVEL and up
+        for handler in handlers[:-1]:
+            handler.setLevel(level)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+        return root
+
+
+def shutdown():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
@@ -1,11 +1,17 @@
 import json
 import os
 import difflib
+import threading
+
+from config import get_config
 
 MEMORY_FILE = os.path.join(os.path.dirname(__file__), "state.json")
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-AUTOBOX_DIR = os.path.join(os.path.dirname(BASE_DIR), "AutoBox")
+AUTOBOX_DIR = get_config().autobox_dir
+
+# Serializes read-modify-write of state.json when commands run concurrently
+_state_lock = threading.Lock()
 
 
 def load_memory():
@@ -19,29 +25,33 @@ def load_memory():
 
 
 def update_memory(**kwargs):
-    state = load_memory()
-    state.update({k: v for k, v in kwargs.items() if v is not None})
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+    with _state_lock:
+        state = load_memory()
+        state.update({k: v for k, v in kwargs.items() if v is not None})
+        with open(MEMORY_FILE, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
 
 
 def find_closest_file(name):
     if not name:
         return None
 
-    candidates = []
+    from executors.fs_watch import get_watcher
 
-    # Search base directory
-    for root, _, files in os.walk(BASE_DIR):
-        for f in files:
-            candidates.append(f)
-
-    # Search AutoBox folders
+    # Base directory and AutoBox folders, kept in memory by file watchers
+    watchers = [get_watcher(BASE_DIR)]
     if os.path.exists(AUTOBOX_DIR):
-        for root, _, files in os.walk(AUTOBOX_DIR):
-            for f in files:
-                candidates.append(f)
+        watchers.append(get_watcher(AUTOBOX_DIR))
+
+    # An exact name (any case) is a dictionary hit
+    for watcher in watchers:
+        found = watcher.lookup(name)
+        if found:
+            return os.path.basename(found[0])
 
+    candidates = watchers[0].all_names()
+    for watcher in watchers[1:]:
+        candidates = candidates + watcher.all_names()
     matches = difflib.get_close_matches(name, candidates, n=1, cutoff=0.6)
     return matches[0] if matches else None
 
@@ -0,0 +1,443 @@
+"""
+Full-text index over AutoBox file contents
+
+Each file's name and text are tokenized into an inverted index whose postings
+are two array('I') per term (doc ids and term counts), appended in doc-id
+order. Searches score with BM25 in numpy directly over those buffers, so a
+query only touches the postings of its own words.
+
+Updates are incremental: the file executors mark paths dirty on every
+write/move/delete and the next search re-reads just those files. A changed
+or deleted file leaves a dead doc id behind, and the postings are compacted
+once dead ids pass a quarter of the index. On first use a scandir pass
+compares size/mtime with the saved index, which picks up edits made outside
+the assistant. Capture pointer files (executors/blob_store.py) are indexed by
+the content they point to.
+
+    python -m memory.search_index "meeting notes"
+    python -m memory.search_index --rebuild
+    python -m memory.search_index --bench 50000
+"""
+
+import argparse
+import array
+import atexit
+import math
+import os
+import pickle
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from config import AUTOBOX_FOLDERS, get_config
+from executors.blob_store import BLOB_DIR_NAME, BlobStore, parse_pointer, read_pointer
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+AUTOBOX_DIR = get_config().autobox_dir
+INDEX_FILE = os.path.join(os.path.dirname(__file__), "search_index.pkl")
+INDEXED_FOLDERS = AUTOBOX_FOLDERS
+INDEX_VERSION = 1
+
+MAX_INDEX_BYTES = 1024 * 1024  # only the first MB of a file is indexed
+K1, B = 1.2, 0.75  # BM25 term-frequency saturation and length normalization
+COMPACT_MIN_DEAD = 1000
+COMPACT_RATIO = 0.25
+SAVE_INTERVAL = 30  # seconds between saves of a changed index
+
+WORD_RE = re.compile(r"\w+")
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "at", "for", "is", "it", "this", "that",
+    "with", "was", "be", "are", "as", "by", "from", "i", "my", "me", "we", "you", "file", "files",
+    "about", "where", "which", "wrote", "write", "written", "did", "do", "find", "mention", "mentions",
+}
+
+
+def tokenize(text: str) -> list:
+    """Lowercase words minus stopwords, with a plural 's' stripped ('notes' -> 'note')"""
+    tokens = []
+    for word in WORD_RE.findall(text.lower()):
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class SearchIndex:
+    def __init__(self, root: str = AUTOBOX_DIR, path: str = INDEX_FILE):
+        self.root = root
+        self.path = path
+        self.lock = threading.RLock()
+
+        self.docs = []  # doc id -> relative path (None once dead)
+        self.alive = array.array("B")  # doc id -> 1/0
+        self.doc_len = array.array("I")  # doc id -> token count
+        self.ids = {}  # relative path -> doc id
+        self.meta = {}  # relative path -> (size, mtime_ns) when indexed
+        self.postings = {}  # term -> (array('I') doc ids, array('I') counts)
+        self.total_len = 0  # tokens in live docs
+        self.dead = 0
+
+        self.dirty = set()
+        self.changed = False
+        self.saved_at = time.monotonic()
+
+    # ================== PERSISTENCE ==================
+    def load(self) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return False
+        if state.get("version") != INDEX_VERSION or state.get("root") != self.root:
+            return False
+        with self.lock:
+            for key in ("docs", "alive", "doc_len", "ids", "meta", "postings", "total_len", "dead"):
+                setattr(self, key, state[key])
+        return True
+
+    def save(self):
+        from executors.atomic_write import atomic_write
+
+        with self.lock:
+            state = {key: getattr(self, key) for key in
+                     ("docs", "alive", "doc_len", "ids", "meta", "postings", "total_len", "dead")}
+            state.update(version=INDEX_VERSION, root=self.root)
+            data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+            self.changed = False
+            self.saved_at = time.monotonic()
+        try:
+            atomic_write(self.path, data, durability="none")  # rebuildable, so no fsync
+        except OSError as e:
+            log.warning("Could not save search index: %s", e)
+
+    def _maybe_save(self):
+        if self.changed and time.monotonic() - self.saved_at > SAVE_INTERVAL:
+            self.save()
+
+    # ================== UPDATES ==================
+    def relative(self, path: str):
+        """'AB1/notes.txt' for a file inside the indexed folders, else None"""
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        parts = rel.split("/")
+        if parts[0] not in INDEXED_FOLDERS or len(parts) < 2 or any(p.startswith(".") for p in parts):
+            return None  # outside AutoBox, or hidden (atomic-write temp files, blob store)
+        return rel
+
+    def mark_dirty(self, *paths):
+        """Queue files (absolute paths) to be re-read before the next search"""
+        with self.lock:
+            for path in paths:
+                rel = self.relative(path)
+                if rel:
+                    self.dirty.add(rel)
+
+    def _scan(self) -> dict:
+        """relative path -> (size, mtime_ns) for every indexed file"""
+        found = {}
+        stack = [os.path.join(self.root, folder) for folder in INDEXED_FOLDERS]
+        while stack:
+            folder = stack.pop()
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    found[os.path.relpath(entry.path, self.root).replace(os.sep, "/")] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def sync(self) -> int:
+        """Reconcile with the folders on disk (files changed since the index was saved); returns docs updated"""
+        current = self._scan()
+        with self.lock:
+            gone = [rel for rel in self.meta if rel not in current]
+            for rel in gone:
+                self._remove(rel)
+            stale = [(rel, stat) for rel, stat in current.items() if self.meta.get(rel) != stat]
+            for rel, stat in stale:
+                self._index(rel, stat)
+            self.dirty.difference_update(current)
+            self._maybe_compact()
+            if gone or stale:
+                self.changed = True
+            return len(gone) + len(stale)
+
+    def refresh(self) -> int:
+        """Re-read the files marked dirty; returns how many were updated"""
+        with self.lock:
+            if not self.dirty:
+                return 0
+            dirty, self.dirty = self.dirty, set()
+            for rel in dirty:
+                full = os.path.join(self.root, rel)
+                try:
+                    st = os.stat(full, follow_symlinks=False)
+                except OSError:
+                    st = None
+                if st is None or not os.path.isfile(full) or os.path.islink(full):
+                    self._remove(rel)
+                else:
+                    self._index(rel, (st.st_size, st.st_mtime_ns))
+            self.changed = True
+            self._maybe_compact()
+            self._maybe_save()
+            return len(dirty)
+
+    def _read(self, rel: str) -> str:
+        """Up to MAX_INDEX_BYTES of a file as text ('' for binary files)"""
+        try:
+            with open(os.path.join(self.root, rel), "rb") as f:
+                data = f.read(MAX_INDEX_BYTES)
+        except OSError:
+            return ""
+        pointer = parse_pointer(data)
+        if pointer:  # a capture: index the blob it points to
+            try:
+                data = BlobStore(os.path.join(self.root, BLOB_DIR_NAME)).get(pointer[0])[:MAX_INDEX_BYTES]
+            except OSError:
+                return ""
+        if b"\0" in data[:8192]:
+            return ""
+        return data.decode("utf-8", errors="replace")
+
+    def _index(self, rel: str, stat: tuple):
+        self._remove(rel)
+        name = os.path.splitext(os.path.basename(rel))[0]
+        tokens = tokenize(name.replace("_", " ")) + tokenize(self._read(rel))
+
+        doc = len(self.docs)
+        self.docs.append(rel)
+        self.alive.append(1)
+        self.doc_len.append(len(tokens))
+        self.ids[rel] = doc
+        self.meta[rel] = stat
+        self.total_len += len(tokens)
+        for term, count in Counter(tokens).items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array.array("I"), array.array("I"))
+            entry[0].append(doc)
+            entry[1].append(count)
+
+    def _remove(self, rel: str):
+        doc = self.ids.pop(rel, None)
+        self.meta.pop(rel, None)
+        if doc is None:
+            return
+        self.docs[doc] = None
+        self.alive[doc] = 0
+        self.total_len -= self.doc_len[doc]
+        self.dead += 1
+
+    def _maybe_compact(self):
+        if self.dead >= COMPACT_MIN_DEAD and self.dead > COMPACT_RATIO * len(self.docs):
+            self.compact()
+
+    def compact(self):
+        """Drop dead doc ids from every posting list and renumber the rest"""
+        with self.lock:
+            alive = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+            remap = (np.cumsum(alive) - 1).astype(np.uintc)
+            postings = {}
+            for term, (ids, counts) in self.postings.items():
+                ids_np = np.frombuffer(ids, dtype=np.uintc)
+                keep = alive[ids_np]
+                if keep.any():
+                    postings[term] = (array.array("I", remap[ids_np[keep]].tobytes()),
+                                      array.array("I", np.frombuffer(counts, dtype=np.uintc)[keep].tobytes()))
+
+            self.postings = postings
+            self.doc_len = array.array("I", np.frombuffer(self.doc_len, dtype=np.uintc)[alive].tobytes())
+            self.docs = [rel for rel in self.docs if rel is not None]
+            self.alive = array.array("B", b"\1" * len(self.docs))
+            self.ids = {rel: doc for doc, rel in enumerate(self.docs)}
+            self.dead = 0
+            self.changed = True
+
+    # ================== QUERIES ==================
+    def search(self, query: str, limit: int = 5) -> list:
+        """[(relative path, BM25 score)] best first"""
+        terms = set(tokenize(query))
+        with self.lock:
+            self.refresh()
+            live = len(self.ids)
+            if not terms or not live:
+                return []
+
+            alive = np.frombuffer(self.alive, dtype=np.bool_)
+            doc_len = np.frombuffer(self.doc_len, dtype=np.uintc)
+            avgdl = max(self.total_len / live, 1.0)
+            scores = np.zeros(len(self.docs), dtype=np.float32)
+            for term in terms:
+                entry = self.postings.get(term)
+                if entry is None:
+                    continue
+                ids = np.frombuffer(entry[0], dtype=np.uintc)
+                keep = alive[ids]
+                ids = ids[keep]
+                if not len(ids):
+                    continue
+                tf = np.frombuffer(entry[1], dtype=np.uintc)[keep].astype(np.float32)
+                idf = math.log(1 + (live - len(ids) + 0.5) / (len(ids) + 0.5))
+                scores[ids] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_len[ids] / avgdl))
+
+            hits = np.flatnonzero(scores)
+            if len(hits) > limit:
+                hits = hits[np.argpartition(-scores[hits], limit)[:limit]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+            results = [(self.docs[i], float(scores[i])) for i in hits]
+            del alive, doc_len  # release the buffer exports so the arrays can grow again
+            return results
+
+    def snippet(self, rel: str, query: str) -> str:
+        """First line of the file containing a query word (trimmed), or ''"""
+        from executors.file_view import FileView
+
+        words = [w for w in WORD_RE.findall(query.lower()) if w not in STOPWORDS and len(w) > 1]
+        path = os.path.join(self.root, rel)
+        try:
+            pointer = read_pointer(path)
+            data = BlobStore(os.path.join(self.root, BLOB_DIR_NAME)).get(pointer[0]) if pointer else None
+            with FileView(path, data=data) as view:
+                for word in words:
+                    found = view.search(word.rstrip("s") if len(word) > 3 else word, max_results=1)
+                    if found:
+                        line = found[0][1].strip()
+                        return line[:117] + "..." if len(line) > 120 else line
+        except OSError:
+            pass
+        return ""
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"docs": len(self.ids), "dead": self.dead, "terms": len(self.postings),
+                    "postings": sum(len(ids) for ids, _ in self.postings.values()), "dirty": len(self.dirty)}
+
+
+# ================== SHARED INDEX ==================
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    """The AutoBox index, loaded (or built) and reconciled with the disk on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from executors.fs_watch import get_watcher
+
+            index = SearchIndex()
+            # Edits made by other programs get re-indexed as well (subscribed before
+            # the reconcile pass so nothing changed in between is missed)
+            get_watcher(index.root).subscribe(index.mark_dirty)
+            loaded = index.load()
+            updated = index.sync()
+            if updated or not loaded:
+                index.save()
+            atexit.register(lambda: index.changed and index.save())
+            _index = index
+        return _index
+
+
+def mark_dirty(*paths):
+    """Called by the file executors; a no-op until the index is first used (that load rescans)"""
+    if _index is not None:
+        _index.mark_dirty(*paths)
+
+
+def search(query: str, limit: int = 5) -> list:
+    return get_index().search(query, limit)
+
+
+# ================== CLI ==================
+_VOCAB = [f"w{i}" for i in range(20000)]
+
+
+def _bench(docs: int, queries: int = 200):
+    """Index `docs` synthetic files and time BM25 queries against them"""
+    rng = random.Random(7)
+    weights = [1 / (rank + 1) for rank in range(len(_VOCAB))]  # Zipf-like word frequencies
+    root = tempfile.mkdtemp(prefix="search_bench_")
+    try:
+        for i in range(docs):
+            folder = os.path.join(root, INDEXED_FOLDERS[i % 3], f"sub{i % 50}")
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"doc{i}.txt"), "w", encoding="utf-8") as f:
+                f.write(" ".join(rng.choices(_VOCAB, weights, k=rng.randint(20, 300))))
+
+        index = SearchIndex(root=root, path=os.path.join(root, "index.pkl"))
+        start = time.perf_counter()
+        index.sync()
+        print(f"🗂️  Indexed {docs} files in {time.perf_counter() - start:.1f}s: {index.stats()}")
+
+        times = []
+        for _ in range(queries):
+            query = " ".join(rng.choices(_VOCAB[:2000], k=rng.randint(1, 4)))
+            t0 = time.perf_counter()
+            index.search(query)
+            times.append(time.perf_counter() - t0)
+        # A common word hits most documents: the worst case for postings length
+        t0 = time.perf_counter()
+        index.search("w0 w1 w2")
+        common = time.perf_counter() - t0
+
+        times.sort()
+        print(f"🔍 {queries} queries: p50 {times[len(times) // 2] * 1000:.2f} ms, "
+              f"p95 {times[int(len(times) * 0.95)] * 1000:.2f} ms, common words {common * 1000:.2f} ms")
+
+        start = time.perf_counter()
+        index.save()
+        fresh = SearchIndex(root=root, path=index.path)
+        fresh.load()
+        print(f"💾 Save + load: {time.perf_counter() - start:.2f}s ({os.path.getsize(index.path) / 1024 / 1024:.1f} MB)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over AutoBox files")
+    parser.add_argument("query", nargs="*")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every file from scratch")
+    parser.add_argument("--bench", type=int, metavar="DOCS", help="Benchmark on DOCS synthetic files")
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.bench:
+        _bench(args.bench)
+        return 0
+
+    if args.rebuild:
+        index = SearchIndex()
+        index.sync()
+        index.save()
+        print(f"✅ Rebuilt: {index.stats()}")
+        if not args.query:
+            return 0
+    else:
+        index = get_index()
+
+    query = " ".join(args.query)
+    for rel, score in index.search(query, args.limit):
+        print(f"📄 {rel} ({score:.2f})  {index.snippet(rel, query)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Memory and CPU governor for the heavy local components
+
+Whisper, the Ollama model and Chrome can all be resident at once, which
+pushes small machines into swap. Components that can be dropped and
+loaded again later register here with an unload function and the seconds
+it took to load them (their reload cost):
+
+    governor = get_governor()
+    governor.register("whisper.base", unload, cost=4.2, size=model_bytes)
+    with governor.use("whisper.base"):  # never unloaded while in use
+        ...
+
+A background thread checks memory every CHECK_INTERVAL seconds. When
+system RAM use crosses MEMORY_HIGH_PERCENT (or the assistant and its
+browser exceed RSS_LIMIT_MB), components idle for at least
+UNLOAD_MIN_IDLE_S (a visible browser, which the user may be reading:
+VISIBLE_BROWSER_MIN_IDLE_S) are unloaded, the best candidate first, until use is
+expected to be back under MEMORY_TARGET_PERCENT. LRU with cost: a
+component scores idle seconds x bytes / reload seconds, so a big model
+nobody used for minutes goes before a small browser that was just used
+and is slow to start.
+
+It also splits the CPU cores between Whisper (torch threads) and the
+Ollama runner (num_thread), which otherwise each take every core and
+slow each other down when speculative intent runs them together. The
+split only applies while a Whisper model is loaded and the assistant
+transcribes speculatively; text-only runs leave both at their defaults.
+
+    python -m resource_governor      # RSS per subsystem and thread budget
+"""
+
+import ctypes
+import functools
+import gc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from config import get_config
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
+CHECK_INTERVAL = 5.0  # seconds between memory checks
+LLM_PROCESS_PREFIX = "ollama"  # ollama, ollama_llama_server, ollama.exe
+MB = 1024 * 1024
+
+
+@dataclass
+class Component:
+    name: str
+    unload: Callable[[], object]
+    cost: float = 1.0  # seconds to load it again
+    size: Optional[int] = None  # bytes, when it lives in our process (Whisper weights)
+    pids: Optional[Callable[[], list]] = None  # its own processes (the browser)
+    min_idle: Optional[float] = None  # seconds unused before it may go (None: UNLOAD_MIN_IDLE_S)
+    last_used: float = field(default_factory=time.monotonic)
+    busy: int = 0
+    unloading: bool = False
+
+    def rss(self) -> int:
+        """Bytes it holds: its processes' RSS (with children), else the size it was registered with"""
+        if self.pids is None or psutil is None:
+            return self.size or 0
+        total = 0
+        try:
+            pids = self.pids() or []
+        except Exception:
+            pids = []
+        for pid in pids:
+            try:
+                proc = psutil.Process(pid)
+                for p in [proc] + proc.children(recursive=True):
+                    total += p.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    def score(self, now: float, rss: int) -> float:
+        return (now - self.last_used) * max(rss, 1) / max(self.cost, 0.1)
+
+
+# ================== THREADS ==================
+@functools.lru_cache(maxsize=None)
+def physical_cores() -> int:
+    cores = psutil.cpu_count(logical=False) if psutil is not None else None
+    return cores or os.cpu_count() or 1
+
+
+def thread_budget(whisper_loaded: bool = None) -> dict:
+    """
+    Threads for Whisper and the Ollama runner; None leaves the library default.
+
+    WHISPER_THREADS / LLM_THREADS always apply. Otherwise the cores are only
+    split while both can run at once: a Whisper model is loaded (or about
+    to be) and speculative transcription is on.
+    """
+    cfg = get_config()
+    governor = get_governor()
+    whisper, llm = cfg.WHISPER_THREADS or None, cfg.LLM_THREADS or None
+    if governor.speculative_stt and (whisper_loaded or governor.whisper_loaded()):
+        cores = physical_cores()
+        whisper = whisper or max(1, cores // 2)
+        llm = llm or max(1, cores - whisper)
+    return {"whisper": whisper, "llm": llm}
+
+
+def pin_torch_threads() -> Optional[int]:
+    """Limit torch (Whisper) to its share of the cores; call while loading a model"""
+    threads = thread_budget(whisper_loaded=True)["whisper"]
+    if threads is None:
+        return None
+    try:
+        import torch
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
+            log.debug("torch threads: %d", threads)
+    except Exception as e:
+        log.warning("Couldn't set torch threads: %s", e)
+    return threads
+
+
+def _trim_heap():
+    # Freed model tensors stay in glibc's heap; give the pages back so RSS drops
+    if sys.platform.startswith("linux"):
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+
+# ================== GOVERNOR ==================
+class ResourceGovernor:
+    def __init__(self, interval: float = CHECK_INTERVAL):
+        self.interval = interval
+        self.components = {}  # name -> Component
+        self.cond = threading.Condition()
+        self.counts = {"checks": 0, "unloaded": 0, "freed_mb": 0.0}
+        self.speculative_stt = False  # set by the assistant: LLM runs while Whisper transcribes
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ================== COMPONENTS ==================
+    def register(self, name: str, unload: Callable[[], object], cost: float = 1.0, size: int = None,
+                 pids: Callable[[], list] = None, min_idle: float = None) -> Component:
+        """Track a loaded component; unload() must free it (it's loaded again on next use)"""
+        component = Component(name, unload, cost=cost, size=size, pids=pids, min_idle=min_idle)
+        with self.cond:
+            self.components[name] = component
+        log.debug("Tracking %s (reload %.1fs)", name, cost)
+        return component
+
+    def unregister(self, name: str):
+        """The component unloaded itself (e.g. the browser was closed)"""
+        with self.cond:
+            component = self.components.get(name)
+            if component is not None and not component.unloading:
+                del self.components[name]
+
+    def whisper_loaded(self) -> bool:
+        with self.cond:
+            return any(name.startswith("whisper.") for name in self.components)
+
+    @contextmanager
+    def use(self, name: str):
+        """Keep a component loaded while the block runs (waits if it's being unloaded right now)"""
+        with self.cond:
+            self.cond.wait_for(lambda: name not in self.components or not self.components[name].unloading)
+            component = self.components.get(name)
+            if component is not None:
+                component.busy += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                component = self.components.get(name)
+                if component is not None:
+                    component.busy = max(0, component.busy - 1)
+                    component.last_used = time.monotonic()
+
+    # ================== MEASURING ==================
+    def usage(self) -> dict:
+        """Resident bytes per subsystem: assistant (this process), each component, llm (Ollama)"""
+        if psutil is None:
+            return {}
+        with self.cond:
+            components = list(self.components.values())
+        usage = {"assistant": psutil.Process().memory_info().rss}
+        for component in components:
+            usage[component.name] = component.rss()
+        usage["llm"] = sum(p.info["memory_info"].rss for p in psutil.process_iter(["name", "memory_info"])
+                           if (p.info["name"] or "").lower().startswith(LLM_PROCESS_PREFIX) and p.info["memory_info"])
+        return usage
+
+    def _over_limit(self, cfg, memory, ours: int, freed: int) -> bool:
+        used = memory.total - memory.available - freed
+        if used * 100 / memory.total > (cfg.MEMORY_TARGET_PERCENT if freed else cfg.MEMORY_HIGH_PERCENT):
+            return True
+        return bool(cfg.RSS_LIMIT_MB) and ours - freed > cfg.RSS_LIMIT_MB * MB
+
+    # ================== UNLOADING ==================
+    def check(self) -> list:
+        """Unload idle components while memory is over the limits; returns their names"""
+        if psutil is None:
+            return []
+        cfg = get_config()
+        memory = psutil.virtual_memory()
+        with self.cond:
+            self.counts["checks"] += 1
+            separate = [c.name for c in self.components.values() if c.pids is not None]
+        if not cfg.RSS_LIMIT_MB and memory.percent <= cfg.MEMORY_HIGH_PERCENT:
+            return []  # the common case costs one virtual_memory() call
+        usage = self.usage()
+        # Our process (Whisper included) and the processes we started; Ollama manages its models itself
+        ours = usage["assistant"] + sum(usage.get(name, 0) for name in separate)
+        unloaded, freed = [], 0
+        while self._over_limit(cfg, memory, ours, freed):
+            now = time.monotonic()
+            with self.cond:
+                idle = [c for c in self.components.values()
+                        if not c.busy and not c.unloading
+                        and now - c.last_used >= (cfg.UNLOAD_MIN_IDLE_S if c.min_idle is None else c.min_idle)]
+                if not idle:
+                    break
+                victim = max(idle, key=lambda c: c.score(now, usage.get(c.name, 0)))
+                victim.unloading = True
+            size = usage.get(victim.name, 0)
+            try:
+                victim.unload()
+            except Exception as e:
+                log.warning("Unloading %s failed: %s", victim.name, e)
+            finally:
+                with self.cond:
+                    self.components.pop(victim.name, None)
+                    self.counts["unloaded"] += 1
+                    self.counts["freed_mb"] += size / MB
+                    self.cond.notify_all()
+            freed += size
+            unloaded.append(victim.name)
+            log.info("Unloaded idle %s (%.0f MB, RAM %.0f%% used)", victim.name, size / MB, memory.percent,
+                     extra={"component": victim.name, "rss_mb": round(size / MB, 1)})
+        if unloaded:
+            gc.collect()
+            _trim_heap()
+        return unloaded
+
+    def start(self):
+        """Check memory in a background thread"""
+        if psutil is None:
+            log.warning("psutil not installed; idle components won't be unloaded under memory pressure")
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="resource-governor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                log.exception("Resource check failed")
+
+    def stats(self) -> dict:
+        with self.cond:
+            return {"tracked": sorted(self.components), **self.counts}
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> ResourceGovernor:
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor()
+        return _governor
+
+
+def print_usage(governor: ResourceGovernor = None):
+    governor = governor or get_governor()
+    if psutil is None:
+        print("  psutil not installed (pip install psutil)")
+        return
+    memory = psutil.virtual_memory()
+    print(f"  RAM: {memory.percent:.0f}% used, {memory.available / 1024**3:.1f} of {memory.total / 1024**3:.1f} GB free")
+    for name, rss in governor.usage().items():
+        print(f"  {name:20} {rss / MB:8.0f} MB")
+    budget = thread_budget()
+    print(f"  Threads: whisper {budget['whisper'] or 'default'}, llm {budget['llm'] or 'default'}"
+          f" ({physical_cores()} cores)")
+    stats = governor.stats()
+    if stats["unloaded"]:
+        print(f"  Unloaded {stats['unloaded']} idle component(s), {stats['freed_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    print("💾 Resources:")
+    print_usage()
@@ -6,7 +6,10 @@ Supports: Files, Web, Clipboard, Apps, System operations - ALL ISSUES RESOLVED
 
 import json
 import sys
+import threading
+import time
 import traceback
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Any
 import os
@@ -15,11 +18,20 @@ import os
 sys.path.append('.')
 
 # Import your existing modules
-from controller.llm import ask_llm  # Your working LLM
-from executors.file_exec import create_file, write_file, read_file, move_file
-from voice.stt import listen_and_transcribe
+from controller.llm import ask_llm, learn  # Your working LLM
+from config import generation as config_generation, get_config
+from executors.file_exec import create_file, write_file, move_file
+from executors import file_exec
+from voice.stt import listen_and_transcribe, listen_streaming
 from voice.tts import speak
 from memory.memory import load_memory, update_memory, resolve_reference
+from memory import search_index
+import resource_governor
+from controller.speculative import SpeculativeIntent
+from log_setup import get_logger, setup as setup_logging
+import tracing
+
+log = get_logger("run")
 
 # ================== CRITICAL FIXES ==================
 # Helper function for safe file creation with list handling
@@ -39,7 +51,7 @@ def safe_create_file(path: str, content: any = None) -> bool:
         return success
     except TypeError as e:
         # If that fails, create empty then write
-        print(f"⚠️ create_file() TypeError: {e}, using fallback")
+        log.warning("create_file() TypeError: %s, using fallback", e)
         try:
             # Try with just path
             success = create_file(path)
@@ -48,10 +60,10 @@ def safe_create_file(path: str, content: any = None) -> bool:
                 return write_file(path, content)
             return success
         except Exception as e2:
-            print(f"❌ Fallback also failed: {e2}")
+            log.error("Fallback also failed: %s", e2)
             return False
     except Exception as e:
-        print(f"❌ Create file error: {e}")
+        log.error("Create file error: %s", e)
         return False
 
 # Helper to normalize any content to string
@@ -65,22 +77,6 @@ def normalize_content(content: any) -> str:
         return json.dumps(content, indent=2)
     return str(content)
 
-# Add delete_file function to file_exec.py if missing
-def delete_file(path: str) -> bool:
-    """Delete a file"""
-    try:
-        from executors.file_exec import get_full_path
-        full_path = get_full_path(path)
-        if full_path and os.path.exists(full_path):
-            os.remove(full_path)
-            print(f"✅ Deleted: {full_path}")
-            return True
-        print(f"❌ File not found: {path}")
-        return False
-    except Exception as e:
-        print(f"❌ Delete file error: {e}")
-        return False
-
 # ================== OPTIONAL IMPORTS ==================
 # Try to import optional modules
 try:
@@ -88,39 +84,52 @@ try:
     APP_ENABLED = True
 except ImportError:
     APP_ENABLED = False
-    print("⚠️ App executor not available")
+    log.warning("App executor not available")
 
 try:
     from executors.web_exec import WebExecutor
     WEB_ENABLED = True
 except ImportError:
     WEB_ENABLED = False
-    print("⚠️ Web executor not available")
+    log.warning("Web executor not available")
 
 try:
     from executors.clipboard_exec import ClipboardExecutor
     CLIPBOARD_ENABLED = True
 except ImportError:
     CLIPBOARD_ENABLED = False
-    print("⚠️ Clipboard not available")
+    log.warning("Clipboard not available")
 
 # ================== CONFIGURATION ==================
-# Configuration - UPDATED WITH VISIBLE BROWSER
-CONFIG = {
-    "VOICE_ENABLED": True,
-    "VOICE_OUTPUT": True,
-    "AUTOBOX_PATH": "AutoBox",
-    "LLM_MODEL": "gemma3:1b",  # ⚠️ CORRECTED MODEL NAME
-    "ENABLE_WEB": WEB_ENABLED,
-    "ENABLE_CLIPBOARD": CLIPBOARD_ENABLED,
-    "ENABLE_APPS": APP_ENABLED,
-    "BROWSER_VISIBLE": True,  # ⚠️ NEW: Make browser visible
-}
+# Settings live in config.py (defaults, config/assistant.json, ASSISTANT_* env);
+# callers like daemon.py and batch_run.py override single keys on top.
+def default_settings() -> Dict[str, Any]:
+    cfg = get_config()
+    return {
+        "VOICE_ENABLED": cfg.VOICE_ENABLED,
+        "VOICE_OUTPUT": cfg.VOICE_OUTPUT,
+        "AUTOBOX_PATH": file_exec.AUTOBOX_DIR,  # SANDBOX_PATH, resolved the way the executors use it
+        "LLM_MODEL": " → ".join(cfg.model_tiers),  # Router: small model first, escalate on low confidence
+        "ENABLE_WEB": WEB_ENABLED,
+        "ENABLE_CLIPBOARD": CLIPBOARD_ENABLED,
+        "ENABLE_APPS": APP_ENABLED,
+        "BROWSER_VISIBLE": not cfg.HEADLESS_BROWSER,
+        "SPECULATIVE_INTENT": cfg.SPECULATIVE_INTENT,
+        "WAKE_WORD_ENABLED": cfg.WAKE_WORD_ENABLED,
+        "INTERACTIVE": cfg.INTERACTIVE,
+        "BULK_CONFIRM_OVER": cfg.BULK_CONFIRM_OVER,
+        "READ_PREVIEW_BYTES": cfg.READ_PREVIEW_BYTES,
+        "READ_PREVIEW_LINES": cfg.READ_PREVIEW_LINES,
+        "SEARCH_RESULTS": cfg.SEARCH_RESULTS,
+        "CLIPBOARD_MONITOR": cfg.CLIPBOARD_MONITOR,
+    }
 
 # ================== MAIN ASSISTANT CLASS ==================
 class AdvancedAssistant:
-    def __init__(self):
-        self.config = CONFIG
+    def __init__(self, config: Dict[str, Any] = None):
+        self.overrides = dict(config or {})
+        self.config = {**default_settings(), **self.overrides}
+        self.config_generation = config_generation()
         print("🤖 Advanced AI Assistant Initializing...")
         print("=" * 70)
         
@@ -133,7 +142,7 @@ class AdvancedAssistant:
             print(f"⚠️ AutoBox not found at: {autobox_path}")
             print("Creating AutoBox folders...")
             os.makedirs(autobox_path, exist_ok=True)
-            for folder in ["AB1", "AB2", "AB3"]:
+            for folder in file_exec.AUTOBOX_FOLDERS:
                 os.makedirs(os.path.join(autobox_path, folder), exist_ok=True)
             print("✅ AutoBox created successfully")
         else:
@@ -151,15 +160,36 @@ class AdvancedAssistant:
         else:
             self.web = None
         
+        self.clipboard = None
         if self.config["ENABLE_CLIPBOARD"]:
-            self.clipboard = ClipboardExecutor()
-            print("✅ Clipboard: Ready")
-        else:
-            self.clipboard = None
+            try:
+                self.clipboard = ClipboardExecutor()
+                if self.config["CLIPBOARD_MONITOR"]:
+                    self.clipboard.start_monitor()
+                print(f"✅ Clipboard: Ready ({self.clipboard.backend.name}"
+                      f"{', history of copies in any app' if self.config['CLIPBOARD_MONITOR'] else ''})")
+            except ImportError as e:
+                print(f"⚠️ Clipboard not available: {e}")
         
         if self.config["ENABLE_APPS"]:
             print("✅ Apps: Ready")
         
+        # Unloads idle Whisper models / the browser when memory runs low, and splits
+        # the cores between Whisper and the LLM when speculative intent runs them together
+        self.governor = resource_governor.get_governor()
+        self.governor.speculative_stt = bool(self.config["SPECULATIVE_INTENT"])
+        self.governor.start()
+        
+        # Intent computed speculatively while the user was speaking: (text, json_response)
+        self.prefetched = None
+        
+        # Commands can come from the prompt or the wake word thread
+        self.command_lock = threading.Lock()
+        self.wake_listener = None
+        
+        # Per-thread message collectors (daemon clients get what was said to them)
+        self._local = threading.local()
+        
         print("✅ Voice: Ready (TTS & STT)")
         print(f"✅ LLM: Ready (using {self.config['LLM_MODEL']})")
         print("=" * 70)
@@ -171,9 +201,29 @@ class AdvancedAssistant:
         
         print(f"\n🤖 {text}")
         
+        messages = getattr(self._local, "messages", None)
+        if messages is not None:
+            messages.append(text)
+        
         if self.config["VOICE_OUTPUT"]:
             speak(text)
     
+    @contextmanager
+    def collect_messages(self):
+        """Collect everything said from the current thread into a list"""
+        messages = []
+        self._local.messages = messages
+        try:
+            yield messages
+        finally:
+            self._local.messages = None
+    
+    def confirm(self, question: str) -> bool:
+        """Ask a y/n question (always 'no' when running headless)"""
+        if not self.config.get("INTERACTIVE", True):
+            return False
+        return input(question).lower() == 'y'
+    
     def get_user_input(self) -> str:
         """Get input from text or voice"""
         print("\n" + "=" * 70)
@@ -188,9 +238,11 @@ class AdvancedAssistant:
             return 'exit'
         
         if mode.lower() == 'v':
-            self.say("Listening... Speak now")
-            user_input = listen_and_transcribe()
-            self.say(f"You said: {user_input}")
+            # Same lock as the wake word handler, so only one of them opens the mic
+            with self.command_lock:
+                self.say("Listening... Speak now")
+                user_input = self.listen_voice()
+                self.say(f"You said: {user_input}")
             return user_input
         
         if mode.lower() == 'multi':
@@ -211,6 +263,15 @@ class AdvancedAssistant:
             self.show_status()
             return ""
         
+        if mode.lower() == 'clips' or mode.lower().startswith('clips '):
+            self.show_clipboard_history(mode[6:].strip())
+            return ""
+        
+        if mode.lower() == 'trace':
+            jsonl_path, chrome_path = tracing.export()
+            print(f"📈 Trace written to {jsonl_path} and {chrome_path} (open in chrome://tracing)")
+            return ""
+        
         if mode.lower() == 'clear':
             import os
             os.system('cls' if os.name == 'nt' else 'clear')
@@ -218,6 +279,53 @@ class AdvancedAssistant:
         
         return mode
     
+    def listen_voice(self) -> str:
+        """Record a voice command, speculatively running the LLM on partial transcripts"""
+        # The wake word thread pauses itself before calling us; the 'v' prompt path must free the mic too
+        if self.wake_listener:
+            self.wake_listener.pause()
+        
+        try:
+            if not self.config.get("SPECULATIVE_INTENT"):
+                return listen_and_transcribe()
+            
+            speculation = SpeculativeIntent()
+            user_input = listen_streaming(on_partial=speculation.feed)
+            
+            json_response = speculation.commit(user_input)
+            if json_response:
+                log.info("Using intent prefetched while you were speaking")
+                self.prefetched = (user_input, json_response)
+            return user_input
+        finally:
+            if self.wake_listener and threading.current_thread() is not self.wake_listener.worker:
+                self.wake_listener.resume()
+    
+    def start_wake_word(self):
+        """Start the always-on wake word listener if wake word recordings exist"""
+        if not self.config.get("WAKE_WORD_ENABLED"):
+            return
+        
+        try:
+            from wake_word.wake import load_detector, WakeWordListener
+            detector = load_detector()
+            if detector is None:
+                print("⚠️ Wake word: no recordings in wake_word/templates (type 'v' to talk)")
+                return
+            self.wake_listener = WakeWordListener(detector, on_wake=self.on_wake_word)
+            self.wake_listener.start()
+        except Exception as e:
+            print(f"⚠️ Wake word not available: {e}")
+            self.wake_listener = None
+    
+    def on_wake_word(self):
+        """Wake word heard: record the voice command and run it"""
+        with self.command_lock:
+            self.say("Yes? Listening...")
+            user_input = self.listen_voice()
+            self.say(f"You said: {user_input}")
+            self.process_command(user_input)
+    
     def execute_intent(self, intent: Dict[str, Any], original_input: str = "") -> bool:
         """Execute validated intent with ALL FIXES"""
         steps = intent.get("steps", [])
@@ -243,6 +351,7 @@ class AdvancedAssistant:
             
             # Map actions to handlers
             success = False
+            step_start = time.perf_counter()
             
             # FILE OPERATIONS (WITH LIST HANDLING FIX)
             if action in ["create_file", "file_create"]:
@@ -255,6 +364,18 @@ class AdvancedAssistant:
                 success = self.handle_move_file(target, content)
             elif action in ["delete_file", "file_delete"]:
                 success = self.handle_delete_file(target)
+            elif action in ["search_files", "find_in_files"]:
+                success = self.handle_search_files(target or content)
+            
+            # BULK FILE OPERATIONS (range/glob patterns like day1..day30.txt or *.log)
+            elif action == "create_files":
+                success = self.handle_bulk_files("create", target, content)
+            elif action == "write_files":
+                success = self.handle_bulk_files("write", target, content)
+            elif action == "move_files":
+                success = self.handle_bulk_files("move", target, content)
+            elif action == "delete_files":
+                success = self.handle_bulk_files("delete", target)
             
             # WEB OPERATIONS (WITH VISIBLE BROWSER FIX)
             elif action in ["open_url", "web_open"]:
@@ -269,6 +390,8 @@ class AdvancedAssistant:
                 success = self.handle_copy_clipboard(target or content)
             elif action in ["paste_clipboard", "clip_paste", "paste"]:
                 success = self.handle_paste_clipboard()
+            elif action in ["paste_link", "clip_link"]:
+                success = self.handle_paste_link(target)
             
             # APP OPERATIONS
             elif action in ["open_app", "app_open"]:
@@ -289,6 +412,9 @@ class AdvancedAssistant:
                 self.say(f"⚠️ Unknown action: '{action}'")
                 success = False
             
+            tracing.record(f"handle.{action or 'unknown'}", time.perf_counter() - step_start, step_start,
+                           success=bool(success))
+            
             if not success:
                 all_success = False
                 self.say(f"❌ Step {i+1} failed")
@@ -345,23 +471,38 @@ class AdvancedAssistant:
     def handle_read_file(self, target: str) -> bool:
         try:
             target = resolve_reference(target) or target
-            content = read_file(target)
+            view = file_exec.open_view(target)
             
-            if content is None:
+            if view is None:
+                # "read the file about India": fall back to the best content match
+                hits = search_index.search(os.path.splitext(target)[0], limit=1)
+                if hits:
+                    self.say(f"🔍 No file named {target}, reading best match {hits[0][0]}")
+                    target = hits[0][0]
+                    view = file_exec.open_view(target)
+            if view is None:
                 self.say(f"❌ File not found: {target}")
                 return False
             
-            self.say(f"📖 Contents of {target}:")
-            print("\n" + "="*60)
-            print(content)
-            print("="*60 + "\n")
+            # Only the part that is shown gets read and decoded (large logs stay on disk)
+            with view:
+                self.say(f"📖 Contents of {target}:")
+                print("\n" + "="*60)
+                if view.size <= self.config["READ_PREVIEW_BYTES"]:
+                    content = view.text(self.config["READ_PREVIEW_BYTES"])
+                    print(content)
+                else:
+                    content = None
+                    lines = self.config["READ_PREVIEW_LINES"]
+                    print(view.head(lines))
+                    print(f"... ({view.size / 1024 / 1024:.1f} MB, showing the first {lines} lines)")
+                print("="*60 + "\n")
             
             update_memory(last_read_file=target)
             
             # Ask if user wants to copy to clipboard
-            if self.clipboard and len(content) < 1000:
-                copy = input("📋 Copy to clipboard? (y/n): ").lower()
-                if copy == 'y':
+            if self.clipboard and content is not None and len(content) < 1000:
+                if self.confirm("📋 Copy to clipboard? (y/n): "):
                     self.clipboard.copy(content)
                     self.say("✅ Copied to clipboard")
             
@@ -384,7 +525,7 @@ class AdvancedAssistant:
     def handle_delete_file(self, target: str) -> bool:
         try:
             target = resolve_reference(target) or target
-            success = delete_file(target)
+            success = file_exec.delete_file(target)  # also updates the file map and search index
             
             if success:
                 self.say(f"🗑️  Deleted: {target}")
@@ -396,6 +537,68 @@ class AdvancedAssistant:
             self.say(f"❌ Failed to delete file: {str(e)}")
             return False
     
+    def handle_search_files(self, query: str) -> bool:
+        """Rank AutoBox files by content (BM25) and list the best matches"""
+        if not query:
+            self.say("❌ Nothing to search for")
+            return False
+        
+        index = search_index.get_index()
+        hits = index.search(query, limit=self.config["SEARCH_RESULTS"])
+        if not hits:
+            self.say(f"🔍 No files mention: {query}")
+            return False
+        
+        self.say(f"🔍 {len(hits)} file(s) matching '{query}':")
+        for path, score in hits:
+            snippet = index.snippet(path, query)
+            print(f"   📄 {path} ({score:.1f}){'  — ' + snippet if snippet else ''}")
+        
+        # "read that file" now means the best match
+        update_memory(last_touched_file=hits[0][0])
+        return True
+    
+    def handle_bulk_files(self, operation: str, pattern: str, content: str = None) -> bool:
+        """Create/write/move/delete many files from one range or glob pattern"""
+        if not pattern:
+            self.say("❌ No file pattern given")
+            return False
+        
+        try:
+            if operation == "create":
+                if "/" not in pattern:
+                    pattern = f"{load_memory().get('last_folder', 'AB1')}/{pattern}"
+                result = file_exec.create_files(pattern, content)
+            elif operation == "write":
+                result = file_exec.write_files(pattern, content)
+            elif operation == "move":
+                result = file_exec.move_files(pattern, content)
+            else:
+                matches = file_exec.select_files(pattern)
+                if len(matches) > self.config["BULK_CONFIRM_OVER"] and not self.confirm(
+                        f"🗑️  Delete {len(matches)} files matching {pattern}? (y/n): "):
+                    self.say(f"❌ Not deleting {len(matches)} files without confirmation")
+                    return False
+                result = file_exec.delete_files(pattern)
+        except ValueError as e:
+            self.say(f"❌ {e}")
+            return False
+        
+        done, failed = result["done"], result["failed"]
+        if not done and not failed:
+            self.say(f"❌ No files match: {pattern}")
+            return False
+        
+        verbs = {"create": "📄 Created", "write": "✏️  Wrote to", "move": "🚚 Moved", "delete": "🗑️  Deleted"}
+        self.say(f"{verbs[operation]} {len(done)} file(s) ({pattern})")
+        if failed:
+            path, reason = next(iter(failed.items()))
+            self.say(f"⚠️ {len(failed)} file(s) skipped or failed, e.g. {os.path.basename(path)}: {reason}")
+        if done and operation in ("create", "move"):
+            folder = os.path.basename(os.path.dirname(done[-1]))
+            update_memory(last_folder=folder, last_touched_file=f"{folder}/{os.path.basename(done[-1])}")
+        return not failed
+    
     # ================== WEB HANDLERS (VISIBLE BROWSER) ==================
     def handle_open_url(self, url: str) -> bool:
         if not self.web:
@@ -432,15 +635,13 @@ class AdvancedAssistant:
                 self.say(f"🔍 Searching for: {query}")
                 update_memory(last_search=query)
                 
-                # Ask if user wants to save search
-                save = input("💾 Save search results? (y/n): ").lower()
-                if save == 'y':
-                    import time
-                    from executors.file_exec import write_file
-                    filename = f"AB1/search_{query[:20]}_{int(time.time())}.txt"
-                    content = f"Search query: {query}\nURL: {search_url}\nTimestamp: {datetime.now()}"
-                    write_file(filename, content)
-                    self.say(f"✅ Saved search to {filename}")
+                # Ask if user wants to save search (one file per query; the file's date is when it was first saved)
+                if self.confirm("💾 Save search results? (y/n): "):
+                    import re
+                    slug = re.sub(r"\W+", "_", query.lower()).strip("_")[:20] or "query"
+                    content = f"Search query: {query}\nURL: {search_url}\n"
+                    filename, written = file_exec.save_capture(content, name=f"search_{slug}.txt")
+                    self.say(f"✅ Saved search to {filename}" if written else f"✅ Already saved as {filename}")
             
             return success
         except Exception as e:
@@ -460,13 +661,11 @@ class AdvancedAssistant:
                 print(content[:500] + "..." if len(content) > 500 else content)
                 print("-"*60 + "\n")
                 
-                # Auto-save to AutoBox
+                # Auto-save to AutoBox (stored once per distinct content)
                 import hashlib
                 url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-                filename = f"AB1/web_{url_hash}.txt"
-                from executors.file_exec import write_file
-                write_file(filename, content)
-                self.say(f"💾 Auto-saved to {filename}")
+                filename, written = file_exec.save_capture(content, name=f"web_{url_hash}.txt")
+                self.say(f"💾 Auto-saved to {filename}" if written else f"💾 Unchanged since last save: {filename}")
                 
                 # Copy to clipboard
                 if self.clipboard and len(content) < 1000:
@@ -511,13 +710,9 @@ class AdvancedAssistant:
                 print("="*60 + "\n")
                 
                 # Ask if user wants to save
-                save = input("💾 Save clipboard to file? (y/n): ").lower()
-                if save == 'y':
-                    import time
-                    from executors.file_exec import write_file
-                    filename = f"AB1/clipboard_{int(time.time())}.txt"
-                    write_file(filename, text)
-                    self.say(f"✅ Saved to {filename}")
+                if self.confirm("💾 Save clipboard to file? (y/n): "):
+                    filename, written = file_exec.save_capture(text, prefix="clipboard")
+                    self.say(f"✅ Saved to {filename}" if written else f"✅ Already saved as {filename}")
                 
                 return True
             else:
@@ -527,6 +722,41 @@ class AdvancedAssistant:
             self.say(f"❌ Paste failed: {str(e)}")
             return False
     
+    def handle_paste_link(self, query: str = None) -> bool:
+        """Put a link copied earlier back on the clipboard ('the github link' narrows it down)"""
+        if not self.clipboard:
+            self.say("❌ Clipboard features are disabled")
+            return False
+        
+        query = (query or "").strip()
+        link = self.clipboard.last_link(query or None)
+        if not link and query:
+            # "the link about flights": the words may only be in the copied text
+            for word in query.split():
+                link = self.clipboard.last_link(word)
+                if link:
+                    break
+        if not link:
+            self.say(f"❌ No link {'matching ' + repr(query) + ' ' if query else ''}in clipboard history")
+            return False
+        
+        self.clipboard.copy(link)
+        self.say(f"🔗 {link}")
+        self.say("📋 Link is back on the clipboard, ready to paste")
+        update_memory(last_url=link)
+        return True
+    
+    def show_clipboard_history(self, query: str = ""):
+        """Print past clips, newest first (only those containing query, if given)"""
+        if not self.clipboard:
+            print("❌ Clipboard features are disabled")
+            return
+        entries = self.clipboard.search(query, limit=20)
+        print(f"\n📋 Clipboard history{' matching ' + repr(query) if query else ''} ({len(entries)}):")
+        for entry in entries:
+            text = " ".join(entry.text.split())
+            print(f"   {time.strftime('%H:%M:%S', time.localtime(entry.time))}  {text[:80]}{'...' if len(text) > 80 else ''}")
+    
     # ================== APP HANDLERS ==================
     def handle_open_app(self, app_name: str) -> bool:
         if not APP_ENABLED:
@@ -677,34 +907,55 @@ class AdvancedAssistant:
         return True
     
     # ================== MAIN PROCESSING ==================
-    def process_command(self, user_input: str):
-        """Main processing pipeline"""
+    def refresh_config(self):
+        """Pick up edits to config/assistant.json (AutoBox, web and clipboard stay as started)"""
+        current = config_generation()
+        if current != self.config_generation:
+            self.config_generation = current
+            self.config = {**self.config, **default_settings(), **self.overrides}
+            self.governor.speculative_stt = bool(self.config["SPECULATIVE_INTENT"])
+            log.info("Settings reloaded (LLM: %s)", self.config["LLM_MODEL"])
+    
+    def process_command(self, user_input: str, json_response: str = None) -> bool:
+        """Main processing pipeline (returns True if every step succeeded)"""
         if not user_input or user_input.strip() == "":
-            return
+            return False
+        self.refresh_config()
         
-        # Get intent from LLM
+        # Get intent from LLM (or the one prefetched from partial voice transcripts)
         self.say("🧠 Analyzing command...")
-        json_response = ask_llm(user_input)
+        prefetched, self.prefetched = self.prefetched, None
+        if json_response is not None:
+            pass
+        elif prefetched and prefetched[0] == user_input:
+            json_response = prefetched[1]
+        else:
+            with tracing.span("intent"):
+                json_response = ask_llm(user_input)
         
         # Parse JSON
         try:
-            intent = json.loads(json_response)
-        except json.JSONDecodeError:
+            with tracing.span("parse"):
+                intent = json.loads(json_response)
+        except (TypeError, json.JSONDecodeError):
             self.say("❌ I couldn't understand that command.")
-            print(f"Raw LLM response: {json_response}")
+            log.warning("Unparseable LLM response: %s", json_response)
             
             # Try chat mode as fallback
             if self.is_chat_command(user_input):
-                self.handle_chat_command(user_input)
-            return
+                return self.handle_chat_command(user_input)
+            return False
         
         # Execute intent
         success = self.execute_intent(intent, user_input)
         
         if success:
             self.say("🎉 All tasks completed successfully!")
+            # Model-solved commands become few-shot examples for similar future commands
+            learn(user_input, json_response)
         else:
             self.say("⚠️ Some tasks had issues. Check above for errors.")
+        return success
     
     def show_help(self):
         """Show available commands"""
@@ -718,6 +969,9 @@ class AdvancedAssistant:
   • read [file]                       - Read file content
   • move [file] to [folder]           - Move between AutoBox folders
   • delete [file]                     - Delete file
+  • create day1..day30.txt in ab2     - Create/write/move/delete many files
+  • delete *.log in ab3                 (ranges and * ? wildcards)
+  • find where I wrote [words]        - Search inside AutoBox files
 
 🌐 WEB OPERATIONS:
   • open [url]                        - Open website in VISIBLE browser
@@ -727,6 +981,7 @@ class AdvancedAssistant:
 📋 CLIPBOARD:
   • copy [text]                       - Copy to clipboard
   • paste                             - Show clipboard contents
+  • paste the link I copied earlier   - Put a recent link back on the clipboard
 
 💻 APPLICATIONS:
   • open [app]                        - Open application
@@ -746,7 +1001,9 @@ class AdvancedAssistant:
   • v                                 - Switch to voice input
   • multi                             - Multi-line text input
   • help                              - Show this help
-  • status                            - Show system status
+  • status                            - Show system status and stage latencies
+  • trace                             - Export timing spans (JSONL + Chrome trace)
+  • clips [text]                      - Clipboard history (search with text)
   • clear                             - Clear screen
   • exit                              - Quit assistant
 
@@ -781,6 +1038,10 @@ class AdvancedAssistant:
         for key, value in memory.items():
             if value:
                 print(f"  {key:20}: {value}")
+        print("\n💾 RESOURCES:")
+        resource_governor.print_usage(self.governor)
+        print("\n⏱️ STAGE LATENCIES:")
+        tracing.print_stats()
         print("═" * 50)
     
     def run(self):
@@ -791,6 +1052,8 @@ class AdvancedAssistant:
         self.say("Type 'help' to see all commands")
         print("\n" + "=" * 70)
         
+        self.start_wake_word()
+        
         while True:
             try:
                 user_input = self.get_user_input()
@@ -798,6 +1061,11 @@ class AdvancedAssistant:
                 if user_input == 'exit':
                     self.say("👋 Goodbye! Shutting down...")
                     # Clean up
+                    if self.wake_listener:
+                        self.wake_listener.stop()
+                    if self.clipboard:
+                        self.clipboard.stop_monitor()
+                    self.governor.stop()
                     if self.web:
                         self.web.close()
                     break
@@ -806,19 +1074,20 @@ class AdvancedAssistant:
                     continue
                 
                 # Process the command
-                self.process_command(user_input)
+                with self.command_lock:
+                    self.process_command(user_input)
                 
             except KeyboardInterrupt:
                 self.say("\n⚠️ Interrupted. Type 'exit' to quit.")
                 continue
             except Exception as e:
-                print(f"\n❌ Unexpected error: {e}")
-                traceback.print_exc()
+                log.exception("Unexpected error: %s", e)
                 continue
 
 # ================== ENTRY POINT ==================
 def main():
     """Entry point"""
+    setup_logging()
     print("\n" + "=" * 70)
     print("🤖 ADVANCED AI ASSISTANT - STARTING...")
     print("=" * 70)
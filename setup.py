@@ -191,17 +191,13 @@ def create_config():
     """Create default configuration"""
     print("\n⚙️ Creating configuration...")
     
-    config_content = """# AI Assistant Configuration
-VOICE_ENABLED = True
-LLM_MODEL = "gemma:4b"
-SANDBOX_PATH = "AutoBox"
-LOG_LEVEL = "INFO"
-"""
-    
     try:
-        with open("config.py", "w") as f:
-            f.write(config_content)
-        print("   ✅ Configuration created")
+        # Settings live in config/assistant.json; config.py holds the defaults and is never overwritten
+        import config
+        if config.write_defaults():
+            print(f"   ✅ Configuration created: {config.CONFIG_FILE}")
+        else:
+            print(f"   ✅ Keeping existing configuration: {config.CONFIG_FILE}")
         return True
     except Exception as e:
         print(f"   ❌ Failed to create config: {e}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Every action run.py dispatches must be in config/actions.json
+
+The intent schema's action enum is built from actions.json, so an action
+missing there can never come out of the model. The dispatcher is read with
+ast (importing run.py needs the audio/browser dependencies).
+"""
+
+import ast
+import json
+import os
+import sys
+
+sys.path.append('.')
+
+from controller.llm import build_intent_schema, fallback_parser, load_allowed_actions
+
+RUN_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run.py")
+
+
+def dispatched_actions() -> list:
+    """Names tested by each `action == ...` / `action in [...]` branch of execute_intent"""
+    with open(RUN_PY, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    execute = next(node for node in ast.walk(tree)
+                   if isinstance(node, ast.FunctionDef) and node.name == "execute_intent")
+
+    branches = []
+    for node in ast.walk(execute):
+        if (isinstance(node, ast.Compare) and isinstance(node.left, ast.Name) and node.left.id == "action"
+                and isinstance(node.ops[0], (ast.Eq, ast.In))):
+            names = ast.literal_eval(node.comparators[0])
+            branches.append([names] if isinstance(names, str) else list(names))
+    return branches
+
+
+def test_dispatched_actions_in_schema():
+    enum = set(build_intent_schema()["properties"]["steps"]["items"]["properties"]["action"]["enum"])
+    branches = dispatched_actions()
+    assert branches, "no action branches found in run.py"
+    missing = [names[0] for names in branches if not enum.intersection(names)]
+    assert not missing, f"dispatched but not in config/actions.json: {missing}"
+
+
+def test_fallback_actions_in_schema():
+    allowed = set(load_allowed_actions())
+    for command in ["copy hello", "paste", "system info", "extract https://example.com",
+                    "create notes.txt in ab2", "delete notes.txt", "hello"]:
+        for step in json.loads(fallback_parser(command))["steps"]:
+            assert step["action"] in allowed, (command, step["action"])
+
+
+if __name__ == "__main__":
+    test_dispatched_actions_in_schema()
+    test_fallback_actions_in_schema()
+    print("✅ PASS")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+The AutoBox file map follows our own creates and deletes right away
+
+file_exec updates the fs_watch map synchronously (fs_watch.touch) instead of
+waiting for inotify/polling, so "delete x" followed by "read x" never sees a
+stale entry. Runs in a temporary AutoBox.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append('.')
+
+from executors import file_exec, fs_watch
+
+
+def _in_temp_autobox(check):
+    saved = file_exec.AUTOBOX_DIR
+    with tempfile.TemporaryDirectory() as root:
+        file_exec.AUTOBOX_DIR = root
+        try:
+            check(root, fs_watch.get_watcher(root))
+        finally:
+            file_exec.AUTOBOX_DIR = saved
+            fs_watch.forget(root)
+
+
+def test_delete_drops_map_entry():
+    def check(root, watcher):
+        assert file_exec.create_file("AB2/notes.txt", "hello")
+        path = os.path.join(root, "AB2", "notes.txt")
+        assert file_exec.locate("notes.txt") == path
+
+        assert file_exec.delete_file("AB2/notes.txt")
+        assert not watcher.names.get("notes.txt")  # gone from the map, not just filtered by lstat
+        assert file_exec.locate("notes.txt") is None
+
+    _in_temp_autobox(check)
+
+
+def test_bare_delete_stays_in_ab1():
+    def check(root, watcher):
+        assert file_exec.create_file("AB3/keep.txt", "data")
+        assert not file_exec.delete_file("keep.txt")  # bare names mean AB1
+        assert os.path.exists(os.path.join(root, "AB3", "keep.txt"))
+
+    _in_temp_autobox(check)
+
+
+if __name__ == "__main__":
+    test_delete_drops_map_entry()
+    test_bare_delete_stays_in_ab1()
+    print("✅ PASS")
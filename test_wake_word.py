@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Wake word detector against the WAV fixtures in wake_word/fixtures
+
+The fixtures are synthetic two-syllable sweeps (templates and positives are
+takes of the same "word" at slightly different tempo and pitch); the
+negatives are another sweep, noise and a hum. Run with pytest or directly.
+"""
+
+import os
+import sys
+
+sys.path.append('.')
+
+from wake_word.wake import _wav_files, evaluate, load_detector
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wake_word", "fixtures")
+
+
+def _evaluate():
+    detector = load_detector(os.path.join(FIXTURES, "templates"))
+    assert detector is not None, "no templates in wake_word/fixtures/templates"
+    return evaluate(detector,
+                    _wav_files(os.path.join(FIXTURES, "positive")),
+                    _wav_files(os.path.join(FIXTURES, "negative")))
+
+
+def test_evaluate_fixtures():
+    report = _evaluate()
+    assert report["positives"] == 3 and report["negatives"] == 3
+    assert report["false_reject_rate"] == 0.0
+    assert report["false_accept_rate"] == 0.0
+
+
+def test_silence_never_triggers():
+    import numpy as np
+
+    detector = load_detector(os.path.join(FIXTURES, "templates"))
+    assert not detector.detect(np.zeros(detector.sample_rate * 2, dtype=np.float32))
+    assert detector.stats["checks"] == 0  # the energy gate skipped every block
+
+
+if __name__ == "__main__":
+    print("🧪 Wake word evaluation")
+    for key, value in _evaluate().items():
+        print(f"  {key:24}: {value}")
+    test_evaluate_fixtures()
+    test_silence_never_triggers()
+    print("✅ PASS")
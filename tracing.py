@@ -0,0 +1,207 @@
+"""
+Lightweight tracing for the command pipeline
+
+Each stage records a span (name, start, duration, attributes). Durations are
+aggregated per span name into log-bucketed histograms (constant memory, ~9%
+bucket width) for p50/p95/p99, and the most recent spans are kept so they can
+be exported as JSONL or as a Chrome trace (open in chrome://tracing or
+https://ui.perfetto.dev).
+
+Usage:
+    from tracing import span, record
+
+    with span("llm.total", model="gemma3:1b"):
+        ...
+    record("llm.ttft", seconds)
+
+Set ASSISTANT_TRACE=0 to turn recording off.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("ASSISTANT_TRACE", "1") != "0"
+MAX_SPANS = 10000  # recent spans kept for export
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+# Histogram buckets grow by 2^(1/8) from 1 microsecond
+_BUCKETS_PER_DOUBLING = 8
+_MIN_SECONDS = 1e-6
+
+
+class Histogram:
+    """Log-bucketed latency histogram"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        index = 0
+        if seconds > _MIN_SECONDS:
+            index = int(math.log2(seconds / _MIN_SECONDS) * _BUCKETS_PER_DOUBLING) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (seconds)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_MIN_SECONDS * 2 ** (index / _BUCKETS_PER_DOUBLING), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class Tracer:
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self.spans = deque(maxlen=max_spans)
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.enabled = ENABLED
+        self._local = threading.local()
+        # Chrome traces want microsecond timestamps from a common origin
+        self._origin = time.perf_counter()
+        self._origin_wall = time.time()
+
+    def record(self, name: str, duration: float, start: float = None, **attrs):
+        """Record a finished span; start is a perf_counter() value (default: now - duration)"""
+        if not self.enabled:
+            return
+        if start is None:
+            start = time.perf_counter() - duration
+
+        stack = getattr(self._local, "stack", None)
+        item = {
+            "name": name,
+            "ts": self._origin_wall + (start - self._origin),
+            "dur_ms": round(duration * 1000, 3),
+            "thread": threading.current_thread().name,
+            "tid": threading.get_ident(),
+            "parent": stack[-1] if stack else None,
+        }
+        if attrs:
+            item["attrs"] = attrs
+
+        with self.lock:
+            self.spans.append(item)
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(duration)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time the enclosed block; attributes may be added to the yielded dict"""
+        if not self.enabled:
+            yield attrs
+            return
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        start = time.perf_counter()
+        stack.append(name)
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            self.record(name, time.perf_counter() - start, start, **attrs)
+
+    def stats(self) -> dict:
+        """Per-span-name latency summary"""
+        with self.lock:
+            return {name: h.summary() for name, h in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self.lock:
+            self.spans.clear()
+            self.histograms.clear()
+
+    def export_jsonl(self, path: str) -> int:
+        """Write recent spans, one JSON object per line; returns the number written"""
+        with self.lock:
+            spans = list(self.spans)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for item in spans:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        return len(spans)
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Write recent spans in Chrome trace-event format; returns the number written"""
+        with self.lock:
+            spans = list(self.spans)
+
+        pid = os.getpid()
+        events = []
+        for thread_id, thread_name in {(s["tid"], s["thread"]) for s in spans}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+        for item in spans:
+            events.append({
+                "name": item["name"],
+                "cat": item["name"].split(".")[0],
+                "ph": "X",
+                "ts": round((item["ts"] - self._origin_wall) * 1e6, 1),
+                "dur": round(item["dur_ms"] * 1000, 1),
+                "pid": pid,
+                "tid": item["tid"],
+                "args": item.get("attrs", {}),
+            })
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(spans)
+
+
+tracer = Tracer()
+span = tracer.span
+record = tracer.record
+
+
+def print_stats(stats: dict = None):
+    """Print the latency table (used by the assistant's 'status' command)"""
+    stats = tracer.stats() if stats is None else stats
+    if not stats:
+        print("  (no spans recorded yet)")
+        return
+    print(f"  {'stage':24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, s in stats.items():
+        print(f"  {name:24} {s['count']:>6} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} "
+              f"{s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+
+
+def export(directory: str = TRACE_DIR) -> tuple:
+    """Export recent spans to <directory>/trace.jsonl and trace.json (Chrome); returns the paths"""
+    jsonl_path = os.path.join(directory, "trace.jsonl")
+    chrome_path = os.path.join(directory, "trace.json")
+    tracer.export_jsonl(jsonl_path)
+    tracer.export_chrome_trace(chrome_path)
+    return jsonl_path, chrome_path
@@ -1,30 +1,73 @@
 # voice/stt.py
-import whisper
 import sounddevice as sd
 import numpy as np
 import tempfile
 import wave
+import time
 import os
+import threading
+
+from config import get_config
+from log_setup import get_logger
+from resource_governor import get_governor, pin_torch_threads
+from tracing import span
+
+log = get_logger(__name__)
+
+# Whisper models are loaded on first use and shared, so importing this module is cheap.
+# The resource governor may unload an idle one under memory pressure; it loads again when needed.
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(model_size: str = None):
+    """Load (once) and return the Whisper model of the given size (default WHISPER_MODEL)"""
+    model_size = model_size or get_config().WHISPER_MODEL
+    with _models_lock:
+        if model_size not in _models:
+            import whisper
+            pin_torch_threads()
+            log.info("Loading Whisper model: %s", model_size)
+            start = time.perf_counter()
+            model = whisper.load_model(model_size)
+            size = sum(t.numel() * t.element_size() for t in list(model.parameters()) + list(model.buffers()))
+            _models[model_size] = model
+            get_governor().register(f"whisper.{model_size}", lambda: unload_model(model_size),
+                                    cost=time.perf_counter() - start, size=size)
+        return _models[model_size]
+
+def unload_model(model_size: str) -> bool:
+    """Drop a loaded Whisper model (it's freed once no transcription holds it)"""
+    with _models_lock:
+        return _models.pop(model_size, None) is not None
 
 class SpeechToText:
-    def __init__(self, model_size="base"):
-        """Initialize Whisper model"""
-        self.model = whisper.load_model(model_size)
+    def __init__(self, model_size: str = None):
+        """Initialize speech-to-text (the Whisper model loads on first transcription)"""
+        self._model_size = model_size
         self.sample_rate = 16000
         self.channels = 1
     
+    @property
+    def model(self):
+        return get_model(self.model_size)
+    
+    @property
+    def model_size(self) -> str:
+        return self._model_size or get_config().WHISPER_MODEL  # follows config reloads unless pinned
+    
     def record_audio(self, duration=5):
         """Record audio for specified duration"""
         print(f"🎤 Recording for {duration} seconds...")
         
         # Record audio
-        audio = sd.rec(
-            int(duration * self.sample_rate),
-            samplerate=self.sample_rate,
-            channels=self.channels,
-            dtype=np.float32
-        )
-        sd.wait()  # Wait for recording to complete
+        with span("stt.capture", seconds=duration):
+            audio = sd.rec(
+                int(duration * self.sample_rate),
+                samplerate=self.sample_rate,
+                channels=self.channels,
+                dtype=np.float32
+            )
+            sd.wait()  # Wait for recording to complete
         
         return audio.flatten()
     
@@ -46,12 +89,15 @@ class SpeechToText:
         return filename
     
     def transcribe(self, audio_file):
-        """Transcribe audio file to text"""
+        """Transcribe audio file (or float32 sample array) to text"""
         try:
-            result = self.model.transcribe(audio_file, fp16=False)
+            model_size = self.model_size
+            model = get_model(model_size)  # registers a freshly loaded model, so use() below pins it
+            with span("stt.transcribe", model=model_size), get_governor().use(f"whisper.{model_size}"):
+                result = model.transcribe(audio_file, fp16=False)
             return result["text"].strip()
         except Exception as e:
-            print(f"Transcription error: {e}")
+            log.error("Transcription error: %s", e)
             return ""
     
     def listen(self, duration=5):
@@ -72,11 +118,64 @@ class SpeechToText:
             return text
             
         except Exception as e:
-            print(f"Listening error: {e}")
+            log.error("Listening error: %s", e)
+            return ""
+
+    def listen_streaming(self, duration=5, on_partial=None, interval=1.0):
+        """Record audio and report partial transcripts while the user is speaking"""
+        print(f"🎤 Recording for {duration} seconds (streaming)...")
+        chunks = []
+        worker = None
+        stopped = threading.Event()
+
+        def callback(indata, frames, time_info, status):
+            chunks.append(indata.copy())
+
+        def transcribe_partial(audio):
+            partial = self.transcribe(audio)
+            if partial and not stopped.is_set():
+                on_partial(partial)
+
+        try:
+            start = time.time()
+            with span("stt.capture", seconds=duration, streaming=True), sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=self.channels,
+                dtype=np.float32,
+                callback=callback
+            ):
+                while True:
+                    remaining = duration - (time.time() - start)
+                    if remaining <= 0:
+                        break
+                    time.sleep(min(interval, remaining))
+
+                    # Transcribe everything heard so far on a worker so the recording
+                    # keeps its length; skip this tick while the last partial is running
+                    if on_partial and chunks and (worker is None or not worker.is_alive()):
+                        audio = np.concatenate(list(chunks)).flatten()
+                        worker = threading.Thread(target=transcribe_partial, args=(audio,),
+                                                  name="stt-partial", daemon=True)
+                        worker.start()
+
+            stopped.set()
+            if worker is not None:
+                worker.join()  # one Whisper model can't decode two things at once
+            if not chunks:
+                return ""
+            return self.transcribe(np.concatenate(chunks).flatten())
+
+        except Exception as e:
+            log.error("Listening error: %s", e)
             return ""
 
 # Quick function for backward compatibility
 def listen_and_transcribe(duration=5):
     """Quick function for simple use"""
     stt = SpeechToText()
-    return stt.listen(duration)
\ No newline at end of file
+    return stt.listen(duration)
+
+def listen_streaming(duration=5, on_partial=None):
+    """Quick function: listen and report partial transcripts to on_partial"""
+    stt = SpeechToText()
+    return stt.listen_streaming(duration, on_partial=on_partial)
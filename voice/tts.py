@@ -2,15 +2,37 @@
 import asyncio
 import edge_tts
 import tempfile
+import hashlib
+import threading
 import os
 import playsound
+from collections import OrderedDict
 
-VOICE = "en-US-AriaNeural"  # or "en-US-GuyNeural", "en-IN-PrabhatNeural"
+from config import get_config
+from log_setup import get_logger
+from tracing import span
 
-async def synthesize_speech(text: str, voice: str = VOICE) -> str:
-    """Convert text to speech and save as temp file"""
+log = get_logger(__name__)
+
+# Synthesized phrases are kept on disk so repeated messages skip edge-tts
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "assistant_tts_cache")
+CACHE_MAX_ENTRIES = 200
+_cache = OrderedDict()  # key -> mp3 path, least recently used first
+_cache_lock = threading.Lock()
+
+# Plays an audio file; swappable so benchmarks/headless runs can use a null sink
+_player = playsound.playsound
+
+def set_player(player):
+    """Replace the audio output function (called with the mp3 path)"""
+    global _player
+    _player = player
+
+async def synthesize_speech(text: str, voice: str = None) -> str:
+    """Convert text to speech and save as temp file (voice defaults to TTS_VOICE)"""
     if not text.strip():
         return None
+    voice = voice or get_config().TTS_VOICE
     
     with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as f:
         temp_path = f.name
@@ -20,25 +42,84 @@ async def synthesize_speech(text: str, voice: str = VOICE) -> str:
         await communicate.save(temp_path)
         return temp_path
     except Exception as e:
-        print(f"TTS Error: {e}")
+        log.error("TTS error: %s", e)
         os.unlink(temp_path)
         return None
 
-def speak(text: str, voice: str = VOICE):
+def _cache_key(text: str, voice: str) -> str:
+    return hashlib.sha1(f"{voice}\0{text}".encode("utf-8")).hexdigest()
+
+def _prune_locked():
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _, old_path = _cache.popitem(last=False)
+        try:
+            os.unlink(old_path)
+        except OSError:
+            pass
+
+def _load_index():
+    """Pick up phrases cached by earlier runs (oldest use first) and prune past the limit"""
+    try:
+        names = [n for n in os.listdir(CACHE_DIR) if n.endswith(".mp3")]
+    except OSError:
+        return
+    paths = [os.path.join(CACHE_DIR, n) for n in names]
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.path.getmtime(path)
+        except OSError:
+            pass
+    with _cache_lock:
+        for path in sorted(mtimes, key=mtimes.get):
+            _cache[os.path.basename(path)[:-len(".mp3")]] = path
+        _prune_locked()
+
+def synthesize_cached(text: str, voice: str = None) -> str:
+    """Return an mp3 for text, synthesizing it only if it isn't cached yet"""
+    voice = voice or get_config().TTS_VOICE
+    key = _cache_key(text, voice)
+    with _cache_lock:
+        path = _cache.get(key)
+        if path and os.path.exists(path):
+            _cache.move_to_end(key)
+            try:
+                os.utime(path)  # the next run's index keeps this order
+            except OSError:
+                pass
+            return path
+    
+    with span("tts.synthesize", chars=len(text)):
+        temp_file = asyncio.run(synthesize_speech(text, voice))
+    if not temp_file:
+        return None
+    
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"{key}.mp3")
+    os.replace(temp_file, path)
+    
+    with _cache_lock:
+        _cache[key] = path
+        _cache.move_to_end(key)
+        _prune_locked()
+    return path
+
+_load_index()
+
+def speak(text: str, voice: str = None):
     """Synchronous wrapper for TTS"""
     if not text.strip():
         return
     
     try:
-        # Run async function in sync context
-        temp_file = asyncio.run(synthesize_speech(text, voice))
+        audio_file = synthesize_cached(text, voice)
         
-        if temp_file and os.path.exists(temp_file):
-            playsound.playsound(temp_file)
-            os.unlink(temp_file)  # Clean up
+        if audio_file and os.path.exists(audio_file):
+            with span("tts.playback"):
+                _player(audio_file)
             
     except Exception as e:
-        print(f"Speech Error: {e}")
+        log.error("Speech error: %s", e)
         # Fallback to pyttsx3 if edge_tts fails
         try:
             import pyttsx3
@@ -46,15 +127,15 @@ def speak(text: str, voice: str = VOICE):
             engine.say(text)
             engine.runAndWait()
         except:
-            print("All TTS methods failed")
+            log.error("All TTS methods failed")
 
 # Alternative async version
-async def speak_async(text: str, voice: str = VOICE):
+async def speak_async(text: str, voice: str = None):
     """Async version for use in async contexts"""
     if not text.strip():
         return
     
     temp_file = await synthesize_speech(text, voice)
     if temp_file and os.path.exists(temp_file):
-        playsound.playsound(temp_file)
+        _player(temp_file)
         os.unlink(temp_file)
\ No newline at end of file
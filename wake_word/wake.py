@@ -0,0 +1,465 @@
+# wake_word/wake.py
+"""
+Always-on wake-word detection.
+
+A small streaming keyword spotter: MFCC features (vectorized numpy) are
+matched against enrolled example recordings of the wake word with
+subsequence DTW. Audio is kept in a ring buffer and only analysed when
+the recent signal energy is above a gate, so the listener costs almost
+nothing while the room is quiet. Whisper is not touched here; the
+on_wake callback loads it only after a trigger.
+
+Offline evaluation:
+    python -m wake_word.wake --templates wake_word/fixtures/templates \\
+        --eval-pos wake_word/fixtures/positive --eval-neg wake_word/fixtures/negative
+"""
+
+import os
+import glob
+import time
+import wave
+import queue
+import argparse
+import threading
+
+import numpy as np
+
+from log_setup import get_logger
+
+log = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_LEN = 400        # 25 ms
+HOP_LEN = 160          # 10 ms
+N_FFT = 512
+N_MELS = 26
+N_CEPS = 13
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+DEFAULT_THRESHOLD = 5.0
+
+
+# ================== FEATURES ==================
+def _mel_filterbank(n_mels=N_MELS, n_fft=N_FFT, sr=SAMPLE_RATE):
+    """Triangular mel filters as an (n_mels, n_fft // 2 + 1) matrix"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(0), hz_to_mel(sr / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sr).astype(int)
+
+    fbank = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fbank
+
+
+def _dct_matrix(n_ceps=N_CEPS, n_mels=N_MELS):
+    """Orthonormal DCT-II matrix of shape (n_ceps, n_mels)"""
+    k = np.arange(n_ceps)[:, None]
+    n = np.arange(n_mels)[None, :]
+    dct = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    dct[0] /= np.sqrt(2.0)
+    return dct
+
+
+_WINDOW = np.hamming(FRAME_LEN)
+_FBANK_T = _mel_filterbank().T
+_DCT_T = _dct_matrix().T
+
+
+def mfcc(signal: np.ndarray) -> np.ndarray:
+    """
+    Compute MFCCs, shape (frames, N_CEPS - 1), for a mono float signal.
+
+    c0 (overall log energy) is dropped so matching doesn't depend on loudness.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    if len(signal) < FRAME_LEN:
+        return np.zeros((0, N_CEPS - 1))
+
+    emphasized = np.empty_like(signal)
+    emphasized[0] = signal[0]
+    emphasized[1:] = signal[1:] - 0.97 * signal[:-1]
+
+    n_frames = 1 + (len(emphasized) - FRAME_LEN) // HOP_LEN
+    stride = emphasized.strides[0]
+    frames = np.lib.stride_tricks.as_strided(
+        emphasized, shape=(n_frames, FRAME_LEN), strides=(HOP_LEN * stride, stride)
+    ) * _WINDOW
+
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    ceps = np.log(power @ _FBANK_T + 1e-10) @ _DCT_T
+    return ceps[:, 1:]
+
+
+def dtw_distance(template: np.ndarray, window: np.ndarray) -> float:
+    """
+    Subsequence DTW: best alignment of the whole template anywhere inside the window.
+
+    Steps are restricted to (1, 0), (1, 1), (1, 2) so each template row can be
+    computed with vector ops. Returns the path cost normalized by template length.
+    """
+    n, m = len(template), len(window)
+    if n == 0 or m == 0:
+        return float("inf")
+
+    cost = np.sqrt(((template[:, None, :] - window[None, :, :]) ** 2).sum(axis=-1))
+
+    prev = cost[0].copy()  # the match may start at any window frame
+    for i in range(1, n):
+        best = prev.copy()
+        best[1:] = np.minimum(best[1:], prev[:-1])
+        best[2:] = np.minimum(best[2:], prev[:-2])
+        prev = cost[i] + best
+    return float(prev.min() / n)
+
+
+# ================== STREAMING ==================
+class RingBuffer:
+    """Fixed-size float32 ring buffer holding the most recent audio samples"""
+
+    def __init__(self, size: int):
+        self.data = np.zeros(size, dtype=np.float32)
+        self.size = size
+        self.pos = 0
+        self.filled = 0
+
+    def extend(self, samples: np.ndarray):
+        samples = np.asarray(samples, dtype=np.float32)[-self.size:]
+        n = len(samples)
+        end = self.pos + n
+        if end <= self.size:
+            self.data[self.pos:end] = samples
+        else:
+            split = self.size - self.pos
+            self.data[self.pos:] = samples[:split]
+            self.data[:n - split] = samples[split:]
+        self.pos = end % self.size
+        self.filled = min(self.size, self.filled + n)
+
+    def get(self) -> np.ndarray:
+        """Return the buffered samples oldest-first"""
+        if self.filled < self.size:
+            return self.data[:self.filled].copy()
+        return np.concatenate((self.data[self.pos:], self.data[:self.pos]))
+
+    def clear(self):
+        self.pos = 0
+        self.filled = 0
+
+
+class WakeWordDetector:
+    """Streaming keyword spotter over MFCC templates of the wake word"""
+
+    def __init__(self, templates=None, threshold: float = None, energy_gate: float = 0.01,
+                 check_every: float = 0.1, refractory: float = 1.0, sample_rate: int = SAMPLE_RATE):
+        self.templates = []
+        self.sample_rate = sample_rate
+        self.energy_gate = energy_gate
+        self.check_every = int(check_every * sample_rate)
+        self.refractory = int(refractory * sample_rate)
+        self.threshold = threshold
+        self.buffer = RingBuffer(sample_rate)
+        self.stats = {"samples": 0, "checks": 0, "gated": 0, "triggers": 0}
+        self._pending = 0
+        self._cooldown = 0
+
+        for template in templates or []:
+            self.add_template(template)
+
+    def add_template(self, signal: np.ndarray):
+        """Enroll one recording of the wake word"""
+        feats = mfcc(trim_silence(signal))
+        if len(feats) == 0:
+            return
+        self.templates.append(feats)
+
+        # Window holds the longest template plus slack for slower speech
+        longest = max(len(t) for t in self.templates)
+        window = int((longest * 1.5 * HOP_LEN) + FRAME_LEN)
+        if window > self.buffer.size:
+            self.buffer = RingBuffer(window)
+
+    def calibrated_threshold(self) -> float:
+        """Threshold from enrolled templates: spread between takes of the same word"""
+        if self.threshold is not None:
+            return self.threshold
+        if len(self.templates) < 2:
+            return DEFAULT_THRESHOLD
+        distances = [
+            dtw_distance(a, b)
+            for i, a in enumerate(self.templates)
+            for j, b in enumerate(self.templates) if i != j
+        ]
+        self.threshold = float(np.mean(distances) * 1.3)
+        return self.threshold
+
+    def score(self, signal: np.ndarray) -> float:
+        """Lowest DTW distance between any template and the given audio"""
+        feats = mfcc(signal)
+        return min((dtw_distance(t, feats) for t in self.templates), default=float("inf"))
+
+    def process(self, samples: np.ndarray) -> bool:
+        """Feed new audio; returns True when the wake word was just detected"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self.buffer.extend(samples)
+        self.stats["samples"] += len(samples)
+
+        if self._cooldown > 0:
+            self._cooldown -= len(samples)
+            return False
+
+        self._pending += len(samples)
+        if self._pending < self.check_every:
+            return False
+        recent = self.buffer.get()[-self._pending:]
+        self._pending = 0
+
+        # Energy gate: skip feature extraction entirely while it's quiet
+        if float(np.sqrt(np.mean(recent ** 2))) < self.energy_gate:
+            self.stats["gated"] += 1
+            return False
+
+        self.stats["checks"] += 1
+        if self.score(self.buffer.get()) > self.calibrated_threshold():
+            return False
+
+        self.stats["triggers"] += 1
+        self.buffer.clear()
+        self._cooldown = self.refractory
+        return True
+
+    def reset(self):
+        self.buffer.clear()
+        self._pending = 0
+        self._cooldown = 0
+
+    def detect(self, signal: np.ndarray, block: float = 0.1) -> bool:
+        """Run a whole recording through the streaming path"""
+        self.reset()
+        step = int(block * self.sample_rate)
+        for start in range(0, len(signal), step):
+            if self.process(signal[start:start + step]):
+                return True
+        return False
+
+
+class WakeWordListener:
+    """Microphone listener that runs the detector in a low-priority background thread"""
+
+    def __init__(self, detector: WakeWordDetector, on_wake, block_seconds: float = 0.1):
+        self.detector = detector
+        self.on_wake = on_wake
+        self.block_size = int(block_seconds * detector.sample_rate)
+        self.blocks = queue.Queue(maxsize=50)
+        self.stream = None
+        self.worker = None
+        self.running = False
+        self.cpu_time = 0.0
+        self.wall_time = 0.0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.worker = threading.Thread(target=self._run, name="wake-word", daemon=True)
+        self.worker.start()
+        self.resume()
+        log.info("Wake word listener started")
+
+    def stop(self):
+        self.pause()
+        self.running = False
+        self.blocks.put(None)
+
+    def pause(self):
+        """Release the microphone (e.g. while the command itself is recorded)"""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+        self._drop_queued()
+
+    def resume(self):
+        import sounddevice as sd
+
+        if self.stream is not None:
+            return
+        self._drop_queued()
+        self.detector.reset()
+        self.stream = sd.InputStream(
+            samplerate=self.detector.sample_rate,
+            channels=1,
+            dtype=np.float32,
+            blocksize=self.block_size,
+            callback=self._callback
+        )
+        self.stream.start()
+
+    def _drop_queued(self):
+        # Audio queued before a pause is stale; it must not trigger once we listen again
+        try:
+            while True:
+                self.blocks.get_nowait()
+        except queue.Empty:
+            pass
+
+    def cpu_percent(self) -> float:
+        """CPU used by the detector thread as a percentage of one core"""
+        return 100.0 * self.cpu_time / self.wall_time if self.wall_time else 0.0
+
+    def _callback(self, indata, frames, time_info, status):
+        try:
+            self.blocks.put_nowait(indata[:, 0].copy())
+        except queue.Full:
+            pass  # Detector is behind; dropping audio is better than blocking the driver
+
+    def _run(self):
+        _lower_thread_priority()
+        start_wall, start_cpu = time.monotonic(), time.thread_time()
+
+        while self.running:
+            block = self.blocks.get()
+            if block is None:
+                break
+            triggered = self.detector.process(block)
+            self.cpu_time = time.thread_time() - start_cpu
+            self.wall_time = time.monotonic() - start_wall
+            if triggered:
+                self.pause()
+                try:
+                    self.on_wake()
+                except Exception as e:
+                    log.exception("Wake handler error: %s", e)
+                finally:
+                    if self.running:
+                        self.resume()
+
+
+def _lower_thread_priority(niceness: int = 10):
+    """Best-effort: lower the scheduling priority of the calling thread (Linux)"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+# ================== AUDIO FILES ==================
+def load_wav(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Load a PCM WAV file as mono float32 at the given sample rate"""
+    with wave.open(path, "rb") as wav:
+        width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128.0
+    elif width == 2:
+        audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    elif width == 4:
+        audio = np.frombuffer(raw, dtype=np.int32).astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+
+    if rate != sample_rate and len(audio):
+        duration = len(audio) / rate
+        target = np.linspace(0, duration, int(duration * sample_rate), endpoint=False)
+        audio = np.interp(target, np.arange(len(audio)) / rate, audio).astype(np.float32)
+    return audio
+
+
+def trim_silence(signal: np.ndarray, threshold: float = 0.02) -> np.ndarray:
+    """Cut leading/trailing low-energy audio from an enrollment recording"""
+    signal = np.asarray(signal, dtype=np.float32)
+    if len(signal) < HOP_LEN:
+        return signal
+    n = len(signal) // HOP_LEN
+    energy = np.sqrt(np.mean(signal[:n * HOP_LEN].reshape(n, HOP_LEN) ** 2, axis=1))
+    voiced = np.nonzero(energy >= threshold)[0]
+    if len(voiced) == 0:
+        return signal
+    return signal[voiced[0] * HOP_LEN:(voiced[-1] + 1) * HOP_LEN]
+
+
+def _wav_files(path: str):
+    if path and os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.wav")))
+    return [path] if path and os.path.isfile(path) else []
+
+
+def load_detector(templates_dir: str = TEMPLATES_DIR, **kwargs):
+    """Build a detector from the WAV recordings in templates_dir (None if there are none)"""
+    files = _wav_files(templates_dir)
+    if not files:
+        return None
+    return WakeWordDetector([load_wav(f) for f in files], **kwargs)
+
+
+def evaluate(detector: WakeWordDetector, positive_files, negative_files) -> dict:
+    """Report false-reject rate on positives and false-accept rate on negatives"""
+    misses = sum(1 for f in positive_files if not detector.detect(load_wav(f)))
+
+    false_accepts = 0
+    negative_seconds = 0.0
+    for f in negative_files:
+        audio = load_wav(f)
+        negative_seconds += len(audio) / detector.sample_rate
+        if detector.detect(audio):
+            false_accepts += 1
+
+    return {
+        "positives": len(positive_files),
+        "negatives": len(negative_files),
+        "false_reject_rate": misses / len(positive_files) if positive_files else 0.0,
+        "false_accept_rate": false_accepts / len(negative_files) if negative_files else 0.0,
+        "false_accepts_per_hour": false_accepts / (negative_seconds / 3600) if negative_seconds else 0.0,
+        "threshold": detector.calibrated_threshold(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wake word detector")
+    parser.add_argument("--templates", default=TEMPLATES_DIR, help="Folder of wake word WAV recordings")
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--eval-pos", help="WAV file/folder that contains the wake word")
+    parser.add_argument("--eval-neg", help="WAV file/folder without the wake word")
+    parser.add_argument("--listen", action="store_true", help="Listen on the microphone")
+    args = parser.parse_args()
+
+    detector = load_detector(args.templates, threshold=args.threshold)
+    if detector is None:
+        print(f"❌ No wake word recordings found in {args.templates}")
+        return 1
+
+    if args.eval_pos or args.eval_neg:
+        report = evaluate(detector, _wav_files(args.eval_pos), _wav_files(args.eval_neg))
+        print("📊 WAKE WORD EVALUATION")
+        for key, value in report.items():
+            print(f"  {key:24}: {value:.4f}" if isinstance(value, float) else f"  {key:24}: {value}")
+
+    if args.listen:
+        listener = WakeWordListener(detector, on_wake=lambda: print("🔔 Wake word detected!"))
+        listener.start()
+        try:
+            while True:
+                time.sleep(5)
+                print(f"   CPU: {listener.cpu_percent():.2f}% of one core | {detector.stats}")
+        except KeyboardInterrupt:
+            listener.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())